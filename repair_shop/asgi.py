@@ -2,6 +2,10 @@
 ASGI config for repair_shop project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with ASGI workers so the live events feed holds connections without
+a thread each, e.g.::
+
+    gunicorn repair_shop.asgi -k uvicorn.workers.UvicornWorker -w 4
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
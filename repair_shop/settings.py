@@ -39,6 +39,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "workshop.middleware.RequestMetricsMiddleware",
+    "workshop.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -46,13 +48,14 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "workshop.middleware.TransitionActorMiddleware",
 ]
 
 ROOT_URLCONF = "repair_shop.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "workshop.metrics.InstrumentedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -80,8 +83,77 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default=''),
         'PORT': config('DB_PORT', default=''),
+        # Persistent connections (seconds, None = unlimited); 0 opens one per request
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=lambda v: None if v == 'None' else int(v)),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=False, cast=bool),
     }
 }
+if config('DB_POOL', default=False, cast=bool):
+    # PostgreSQL only (needs psycopg[pool]); the pool owns connection lifetime
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
+    }
+
+# Read replicas: each entry replaces HOST of the primary (NAME for SQLite), e.g.
+# DB_REPLICAS=10.0.0.6,10.0.0.7. They become aliases replica1, replica2, ...
+DATABASE_REPLICAS = []
+for _number, _target in enumerate(config('DB_REPLICAS', default='', cast=lambda v: [t for t in v.split(',') if t]), 1):
+    _key = 'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3') else 'HOST'
+    DATABASES[f'replica{_number}'] = {**DATABASES['default'], _key: _target.strip(), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica{_number}')
+DATABASE_ROUTERS = ['workshop.routers.ReplicaRouter']
+DB_REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=5, cast=int)  # read-your-writes window
+
+# Cutover target for manage.py migrate_to_postgres (alias "target"), e.g.
+# DB_TARGET_NAME=repairshop DB_TARGET_HOST=10.0.0.8. With DUAL_WRITE on, saves of
+# the main models are also applied to it after each commit (see workshop/cutover.py).
+if config('DB_TARGET_NAME', default=''):
+    DATABASES['target'] = {
+        'ENGINE': config('DB_TARGET_ENGINE', default='django.db.backends.postgresql'),
+        'NAME': config('DB_TARGET_NAME'),
+        'USER': config('DB_TARGET_USER', default=''),
+        'PASSWORD': config('DB_TARGET_PASSWORD', default=''),
+        'HOST': config('DB_TARGET_HOST', default=''),
+        'PORT': config('DB_TARGET_PORT', default=''),
+        'TEST': {'MIRROR': 'default'},
+    }
+DUAL_WRITE = config('DUAL_WRITE', default=False, cast=bool)
+
+# Cache: locmem (per process), redis (CACHE_LOCATION=redis://host:6379/1),
+# file (CACHE_LOCATION=directory) or db (run createcachetable first)
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+}
+_cache_backend = config('CACHE_BACKEND', default='locmem')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS.get(_cache_backend, _cache_backend),
+        'LOCATION': config('CACHE_LOCATION', default='workshop_cache' if _cache_backend == 'db' else ''),
+        'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='workshop'),
+    }
+}
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=3600, cast=int)  # seconds; entries are invalidated on change anyway
+ANALYTICS_CACHE_TIMEOUT = config('ANALYTICS_CACHE_TIMEOUT', default=900, cast=int)  # seconds /api/analytics/ results may lag writes
+
+# Async versions of the landing page, work order page and dashboard API; turn on when serving repair_shop.asgi
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Live work order events (/api/workorders/events/, streamed under ASGI)
+EVENTS_POLL_INTERVAL = config('EVENTS_POLL_INTERVAL', default=1.0, cast=float)  # seconds between event log polls per worker
+EVENTS_QUEUE_SIZE = config('EVENTS_QUEUE_SIZE', default=1000, cast=int)  # per client; a slower client is disconnected
+EVENTS_KEEPALIVE_SECONDS = config('EVENTS_KEEPALIVE_SECONDS', default=15, cast=int)
+EVENTS_RETRY_MS = config('EVENTS_RETRY_MS', default=3000, cast=int)  # client reconnect delay (the poll interval under WSGI)
+EVENTS_RETENTION_DAYS = config('EVENTS_RETENTION_DAYS', default=30, cast=int)
+EVENTS_LATE_SECONDS = config('EVENTS_LATE_SECONDS', default=5.0, cast=float)  # how long a skipped event id is waited for
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -121,6 +193,35 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='webmaster@localhost')
+ADMIN_NOTIFICATION_EMAILS = config('ADMIN_NOTIFICATION_EMAILS', default='yourgmail@gmail.com', cast=lambda v: [e.strip() for e in v.split(',') if e.strip()])
+
+# Notification outbox (drained by `manage.py run_outbox`)
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=50, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+OUTBOX_RETRY_BASE_SECONDS = config('OUTBOX_RETRY_BASE_SECONDS', default=30, cast=int)
+OUTBOX_RATE_LIMIT = config('OUTBOX_RATE_LIMIT', default=5, cast=int)  # messages per recipient per window, 0 = off
+OUTBOX_RATE_WINDOW = config('OUTBOX_RATE_WINDOW', default=3600, cast=int)  # seconds
+
+# SLA evaluation (manage.py evaluate_sla)
+SLA_EVALUATION_INTERVAL = config('SLA_EVALUATION_INTERVAL', default=300, cast=int)  # seconds, with --loop
+SLA_ALERT_EMAILS = config('SLA_ALERT_EMAILS', default=','.join(ADMIN_NOTIFICATION_EMAILS), cast=lambda v: [e.strip() for e in v.split(',') if e.strip()])
+SLA_ALERT_TECHNICIANS = config('SLA_ALERT_TECHNICIANS', default=True, cast=bool)  # also email each technician their overdue orders
+
+# Product image derivatives (rendered by `manage.py process_images`)
+IMAGE_DERIVATIVE_FORMAT = config('IMAGE_DERIVATIVE_FORMAT', default='WEBP')  # WEBP or JPEG
+IMAGE_DERIVATIVE_QUALITY = config('IMAGE_DERIVATIVE_QUALITY', default=80, cast=int)
+IMAGE_PROCESSING_BATCH_SIZE = config('IMAGE_PROCESSING_BATCH_SIZE', default=20, cast=int)
+
+# Resumable image uploads (POST/PATCH /api/images/uploads/). Keep the temp dir on
+# the same filesystem as MEDIA_ROOT so finished files are renamed, not copied.
+CHUNKED_UPLOAD_TEMP_DIR = config('CHUNKED_UPLOAD_TEMP_DIR', default=os.path.join(BASE_DIR, 'upload_partial'))
+CHUNKED_UPLOAD_MAX_SIZE = config('CHUNKED_UPLOAD_MAX_SIZE', default=200 * 1024 * 1024, cast=int)  # bytes
+CHUNKED_UPLOAD_EXPIRY_HOURS = config('CHUNKED_UPLOAD_EXPIRY_HOURS', default=24, cast=int)
+
+# Request metrics (scraped from /metrics/)
+METRICS_SAMPLE_RATE = config('METRICS_SAMPLE_RATE', default=1.0, cast=float)  # 0.0 - 1.0
+METRICS_SERVER_TIMING = config('METRICS_SERVER_TIMING', default=False, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')  # bearer token for the scraper; staff can always read
 
 # Twilio (safe defaults: blank)
 TWILIO_ACCOUNT_SID = config('TWILIO_ACCOUNT_SID', default='')
@@ -139,7 +240,7 @@ LOGGING = {
     'loggers': {
         'workshop': {
             'handlers': ['console'],
-            'level': 'DEBUG',
+            'level': config('WORKSHOP_LOG_LEVEL', default='INFO'),
             'propagate': False,
         },
         'django': {
@@ -2,7 +2,10 @@ from django.contrib import admin
 from django.contrib.auth.models import User, Group
 from django.contrib.auth.admin import UserAdmin, GroupAdmin
 from django.urls import reverse
-from .models import Customer, Technician, WorkOrder, ProductImage, RemoteRequest
+from .models import Customer, Technician, WorkOrder, ProductImage, RemoteRequest, OutboundMessage
+from .scheduling import auto_assign
+from .search import search_work_orders
+from .sla import on_time_orders, overdue_orders
 from django.utils import timezone
 from django.db import transaction
 from django.utils.html import format_html
@@ -75,8 +78,13 @@ class CustomGroupAdmin(GroupAdmin):
 class ProductImageInline(admin.TabularInline):
     model = ProductImage
     extra = 1
-    fields = ("image", "uploaded_at")
-    readonly_fields = ("uploaded_at",)
+    fields = ("image", "preview", "uploaded_at")
+    readonly_fields = ("preview", "uploaded_at")
+
+    def preview(self, obj):
+        if obj.thumbnail:
+            return format_html('<img src="{}" width="120" alt="">', obj.thumbnail.url)
+        return obj.processing_error or ("Processing…" if obj.pk else "")
 
 # ─────────────────────────────
 # RemoteRequest Admin
@@ -118,7 +126,7 @@ class CustomerAdmin(admin.ModelAdmin):
 # ─────────────────────────────
 @admin.register(Technician, site=custom_admin_site)
 class TechnicianAdmin(admin.ModelAdmin):
-    list_display = ("first_name", "last_name", "email", "phone_number")
+    list_display = ("first_name", "last_name", "email", "phone_number", "open_jobs", "overdue_jobs")
     search_fields = ("first_name", "last_name", "email", "phone_number")
     ordering = ("first_name",)
 
@@ -133,16 +141,12 @@ class OverdueFilter(admin.SimpleListFilter):
         return (("yes", "Overdue"), ("no", "On time"))
 
     def queryset(self, request, queryset):
-        today = timezone.now().date()
+        # reads the state `manage.py evaluate_sla` maintains instead of comparing dates;
+        # both choices cover active, open orders only
         if self.value() == "yes":
-            return queryset.filter(
-                estimated_completion_date__lt=today,
-                status__in=["pending", "in_progress"],
-            )
+            return overdue_orders(queryset)
         if self.value() == "no":
-            return queryset.filter(
-                estimated_completion_date__gte=today
-            )
+            return on_time_orders(queryset)
         return queryset
 
 # ─────────────────────────────
@@ -150,32 +154,37 @@ class OverdueFilter(admin.SimpleListFilter):
 # ─────────────────────────────
 @admin.register(WorkOrder, site=custom_admin_site)
 class WorkOrderAdmin(admin.ModelAdmin):
-    readonly_fields = ("work_order_number", "created_at", "updated_at")
+    readonly_fields = ("work_order_number", "created_at", "updated_at", "overdue_since")
     list_display = (
         "work_order_number", "customer", "status", "is_active",
         "technician", "product_type", "created_at", "updated_at"
     )
     list_filter = ("status", "created_at", "updated_at", "is_active", OverdueFilter)
-    search_fields = ("work_order_number", "customer__first_name", "customer__last_name")
+    search_fields = ("work_order_number",)  # enables the search box; see get_search_results
     actions = ["mark_as_completed", "mark_as_ready_for_pickup", "assign_to_technician"]
     ordering = ("-created_at",)
     inlines = [ProductImageInline]
 
+    def get_search_results(self, request, queryset, search_term):
+        return search_work_orders(queryset, search_term, ranked=False), False
+
     def mark_as_completed(self, request, queryset):
-        updated = queryset.update(status="completed")
+        updated = len(queryset.transition_status("completed"))
         self.message_user(request, f"{updated} work orders marked as Completed.")
     mark_as_completed.short_description = "Mark selected orders as Completed"
 
     def mark_as_ready_for_pickup(self, request, queryset):
-        updated = queryset.update(status="ready_for_pickup")
+        updated = len(queryset.transition_status("ready_for_pickup"))
         self.message_user(request, f"{updated} work orders marked as Ready for Pickup.")
     mark_as_ready_for_pickup.short_description = "Mark selected orders as Ready for Pickup"
 
     def assign_to_technician(self, request, queryset):
-        tech = Technician.objects.first()
-        updated = queryset.update(technician=tech)
-        self.message_user(request, f"{updated} work orders assigned to {tech}.")
-    assign_to_technician.short_description = "Assign selected orders to first available Technician"
+        assignments = auto_assign(queryset)
+        technicians = Technician.objects.in_bulk(list(assignments))
+        summary = ", ".join(f"{technicians[pk]}: {len(ids)}" for pk, ids in assignments.items())
+        updated = sum(len(ids) for ids in assignments.values())
+        self.message_user(request, f"{updated} work orders assigned ({summary or 'no changes'}).")
+    assign_to_technician.short_description = "Assign selected orders to the least busy Technicians"
 
     def get_fields(self, request, obj=None):
         fields = [
@@ -197,5 +206,23 @@ class WorkOrderAdmin(admin.ModelAdmin):
             "date_collected",
         ]
         if obj:
-            fields = ["work_order_number", "created_at", "updated_at"] + fields
-        return fields
\ No newline at end of file
+            fields = ["work_order_number", "created_at", "updated_at", "overdue_since"] + fields
+        return fields
+
+# ─────────────────────────────
+# Outbound Message Admin
+# ─────────────────────────────
+@admin.register(OutboundMessage, site=custom_admin_site)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    list_display = ("recipient", "channel", "subject", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status", "channel")
+    search_fields = ("recipient", "subject")
+    ordering = ("-created_at",)
+    readonly_fields = ("created_at", "sent_at", "last_error")
+    actions = ["retry_now"]
+
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status="sent").update(status="pending", next_attempt_at=timezone.now())
+        self.message_user(request, f"{updated} message(s) queued for immediate delivery.")
+    retry_now.short_description = "Retry selected messages now"
+
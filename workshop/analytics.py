@@ -0,0 +1,259 @@
+# workshop/analytics.py
+"""
+Owner analytics (``/api/analytics/``): turnaround percentiles, repair success
+rate and estimate accuracy per technician and per brand, plus weekly revenue.
+
+Building a model instance or dict per work order is what makes this slow over
+years of data. ``load_columns()`` pulls only the needed columns with one
+``values_list(...).iterator()`` and packs them into typed ``array``s, a few
+bytes per value instead of an object each. ``analyze()`` walks the columns
+once, adding each row to its technician's and its brand's counts and to
+``Counter`` histograms of turnaround (in tenths of an hour) and estimate
+accuracy (in thousandths). Percentiles are read off those histograms, so rows
+are never sorted.
+
+Turnaround runs from ``created_at`` to the order's last move to ``completed``
+in the transition log, read in the same query; orders completed before the
+log existed fall back to ``updated_at``. Results are cached per parameter set
+for ANALYTICS_CACHE_TIMEOUT seconds.
+"""
+from array import array
+from collections import Counter, defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from . import caching
+from .models import WorkOrder, WorkOrderTransition
+from .transitions import STATUS, STATUS_CODES
+
+COMPLETED = STATUS_CODES["completed"]
+CLOSED = frozenset((COMPLETED, STATUS_CODES["cancelled"]))
+NO_COST = -1
+QUANTILES = (50, 90)
+TURNAROUND_UNIT = 360  # seconds: turnaround is counted in tenths of an hour
+RATIO_UNIT = 1000  # estimate accuracy in thousandths
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _cents(value):
+    return NO_COST if value is None else int(value * 100)
+
+
+def _money(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+# ─────────────────────────────
+# Columns
+# ─────────────────────────────
+class Columns:
+    """The analyzed columns of a set of work orders; row ``i`` is index ``i`` of every array."""
+
+    def __init__(self):
+        self.technician = array("q")  # 0 = unassigned
+        self.brand = array("i")  # index into ``brands``
+        self.status = array("b")  # STATUS_CODES
+        self.repaired = array("b")
+        self.estimate = array("q")  # cents, NO_COST when missing
+        self.total = array("q")
+        self.created = array("d")  # POSIX seconds
+        self.finished = array("d")  # completed orders only, else 0
+        self.finished_day = array("i")  # local date ordinal of ``finished``, else 0
+        self.brands = []
+        self._brand_codes = {}
+
+    def __len__(self):
+        return len(self.status)
+
+    @property
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in vars(self).values() if isinstance(column, array))
+
+    def brand_code(self, name):
+        """Brands are grouped case-insensitively under the first spelling seen."""
+        name = (name or "").strip()
+        key = name.casefold()
+        code = self._brand_codes.get(key)
+        if code is None:
+            code = self._brand_codes[key] = len(self.brands)
+            self.brands.append(name or "unknown")
+        return code
+
+    def append(self, technician_id, brand, status, repaired, estimate, total, created, finished=0, finished_day=0):
+        self.technician.append(technician_id or 0)
+        self.brand.append(self.brand_code(brand))
+        self.status.append(status)
+        self.repaired.append(repaired)
+        self.estimate.append(estimate)
+        self.total.append(total)
+        self.created.append(created)
+        self.finished.append(finished)
+        self.finished_day.append(finished_day)
+
+
+def load_columns(queryset=None, chunk_size=5000):
+    """Active work orders in ``queryset`` (all by default) as ``Columns``, in one streamed query."""
+    queryset = WorkOrder.objects.all() if queryset is None else queryset
+    # latest completion, one lookup per order on wotransition_order_idx
+    completed_at = WorkOrderTransition.objects.filter(
+        work_order_id=OuterRef("pk"), field=STATUS, new_value=COMPLETED,
+    ).order_by("-id").values("at")[:1]
+    rows = queryset.filter(is_active=True).order_by().annotate(completed_at=Subquery(completed_at)).values_list(
+        "technician_id", "product_brand", "status", "is_repaired", "estimated_cost", "total_cost",
+        "created_at", "updated_at", "completed_at",
+    )
+    columns = Columns()
+    for technician_id, brand, status, repaired, estimate, total, created, updated, completed_at in rows.iterator(
+        chunk_size
+    ):
+        status = STATUS_CODES.get(status, 0)
+        if status == COMPLETED:
+            finished = completed_at or updated
+            finished, finished_day = finished.timestamp(), timezone.localdate(finished).toordinal()
+        else:
+            finished = finished_day = 0
+        columns.append(
+            technician_id, brand, status, repaired, _cents(estimate), _cents(total), created.timestamp(),
+            finished, finished_day,
+        )
+    return columns
+
+
+# ─────────────────────────────
+# Analysis
+# ─────────────────────────────
+def _distribution(counts, unit, digits):
+    """Count, mean, p50 and p90 (nearest rank, like ``utils.percentile``) of ``{value: rows}``, in ``unit``s."""
+    total = sum(counts.values())
+    if not total:
+        return {"count": 0, "mean": None, "p50": None, "p90": None}
+    ranks = [min(total - 1, int(total * pct / 100)) for pct in QUANTILES]
+    found, seen = [], 0
+    for value in sorted(counts):
+        seen += counts[value]
+        while len(found) < len(ranks) and ranks[len(found)] < seen:
+            found.append(value)
+    mean = sum(value * rows for value, rows in counts.items()) / total
+    return {
+        "count": total,
+        "mean": round(mean / unit, digits),
+        **{f"p{pct}": round(value / unit, digits) for pct, value in zip(QUANTILES, found)},
+    }
+
+
+class _Group:
+    """Counts, value histograms and cost sums of one technician or brand (or everything, merged)."""
+
+    def __init__(self):
+        self.orders = self.completed = self.closed = self.repaired = self.estimated = self.actual = 0
+        self.turnaround = Counter()  # tenths of an hour -> orders
+        self.accuracy = Counter()  # actual / estimate in thousandths -> orders
+
+    def merge(self, other):
+        for name in ("orders", "completed", "closed", "repaired", "estimated", "actual"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.turnaround.update(other.turnaround)
+        self.accuracy.update(other.accuracy)
+        return self
+
+    def figures(self):
+        return {
+            "orders": self.orders,
+            "completed": self.completed,
+            "repair_success_rate": round(self.repaired / self.closed, 3) if self.closed else None,
+            "turnaround_hours": _distribution(self.turnaround, 10, 1),
+            "estimate_accuracy": {
+                "estimated": _money(self.estimated),
+                "actual": _money(self.actual),
+                # actual / estimate per order: 1.0 is spot on, 1.2 means 20% over the estimate
+                **_distribution(self.accuracy, RATIO_UNIT, 3),
+            },
+        }
+
+
+def _weekly_revenue(orders, revenue):
+    """``orders`` and ``revenue`` (cents) are keyed by weeks since the Monday of date ordinal 1."""
+    if not orders:
+        return []
+    return [
+        {
+            "week": date.fromordinal(week * 7 + 1).isoformat(),
+            "completed_orders": orders.get(week, 0),
+            "revenue": _money(revenue.get(week, 0)),
+        }
+        for week in range(min(orders), max(orders) + 1)
+    ]
+
+
+def analyze(columns):
+    """Per-technician and per-brand figures, overall totals and the weekly revenue series."""
+    by_technician, by_brand = defaultdict(_Group), defaultdict(_Group)
+    weekly_orders, weekly_revenue = Counter(), Counter()
+    rows = zip(
+        columns.technician, columns.brand, columns.status, columns.repaired, columns.estimate, columns.total,
+        columns.created, columns.finished, columns.finished_day,
+    )
+    for technician, brand, status, repaired, estimate, total, created, finished, finished_day in rows:
+        completed = status == COMPLETED
+        closed = status in CLOSED
+        # integers, so they can be counted into histograms
+        turnaround = int((finished - created) / TURNAROUND_UNIT) if completed else None
+        priced = completed and estimate > 0 and total != NO_COST
+        ratio = round(total * RATIO_UNIT / estimate) if priced else None
+        for group in (by_technician[technician], by_brand[brand]):
+            group.orders += 1
+            if closed:
+                group.closed += 1
+                group.repaired += 1 if repaired else 0
+            if completed:
+                group.completed += 1
+                group.turnaround[turnaround] += 1
+            if priced:
+                group.accuracy[ratio] += 1
+                group.estimated += estimate
+                group.actual += total
+        if completed:
+            week = (finished_day - 1) // 7
+            weekly_orders[week] += 1
+            weekly_revenue[week] += max(total, 0)
+
+    overall = _Group()
+    for group in by_technician.values():
+        overall.merge(group)
+    return {
+        "work_orders": len(columns),
+        "overall": overall.figures(),
+        "by_technician": [
+            {"technician_id": technician_id or None, **group.figures()}
+            for technician_id, group in sorted(by_technician.items())
+        ],
+        "by_brand": [
+            {"brand": columns.brands[code], **group.figures()}
+            for code, group in sorted(by_brand.items(), key=lambda item: (-item[1].orders, item[0]))
+        ],
+        "weekly_revenue": _weekly_revenue(weekly_orders, weekly_revenue),
+    }
+
+
+def compute(start_date=None, end_date=None):
+    workorders = WorkOrder.objects.all()
+    if start_date:
+        workorders = workorders.filter(created_at__date__gte=start_date)
+    if end_date:
+        workorders = workorders.filter(created_at__date__lte=end_date)
+    return analyze(load_columns(workorders))
+
+
+def summary(start_date=None, end_date=None):
+    """``compute()`` cached per parameter set (analytics may lag writes by up to ANALYTICS_CACHE_TIMEOUT)."""
+    key = f"analytics:{caching.digest(start_date, end_date)}"
+    return caching.cached(
+        "analytics", key, lambda: compute(start_date, end_date), timeout=_setting("ANALYTICS_CACHE_TIMEOUT", 900)
+    )
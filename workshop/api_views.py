@@ -2,22 +2,31 @@ from rest_framework import viewsets, filters
 from django.db.models import Count, Sum
 from .models import WorkOrder, Customer, ProductImage
 from .serializers import WorkOrderSerializer, CustomerSerializer, ProductImageSerializer
-from rest_framework.decorators import api_view
+from .mixins import EagerLoadingMixin
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from django.utils.dateparse import parse_date
 from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from asgiref.sync import sync_to_async
+from rest_framework.utils.encoders import JSONEncoder
+from . import analytics, asyncdb, caching, sla, stats
 
+DASHBOARD_CACHE_TIMEOUT = 15 * 60
+MAX_CUSTOMER_LIMIT = 100
 
-class WorkOrderViewSet(viewsets.ModelViewSet):
+
+class WorkOrderViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = WorkOrder.objects.all()
     serializer_class = WorkOrderSerializer
     filter_backends = [
         filters.SearchFilter,
         filters.OrderingFilter,
     ]
-    search_fields = ["product_model", "status", "notes"]
-    ordering_fields = ["date_created", "total_cost", "status"]  # allowed order fields
-    ordering = ["-date_created"]  # default: newest first
+    search_fields = ["product_model", "status", "repair_details"]
+    ordering_fields = ["created_at", "total_cost", "status"]  # allowed order fields
+    ordering = ["-created_at"]  # default: newest first
 
 class CustomerViewSet(viewsets.ModelViewSet):
     queryset = Customer.objects.all()
@@ -25,8 +34,8 @@ class CustomerViewSet(viewsets.ModelViewSet):
 
     # Optional: search + ordering
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ["name", "phone", "email"]
-    ordering_fields = ["name", "created_at"]  #  
+    search_fields = ["first_name", "last_name", "phone_number", "email"]
+    ordering_fields = ["first_name", "last_name"]
 
 class ProductImageViewSet(viewsets.ModelViewSet):
     queryset = ProductImage.objects.all()
@@ -36,34 +45,128 @@ class ProductImageViewSet(viewsets.ModelViewSet):
 
 
 
-@api_view(["GET"])
-def dashboard_summary(request):
-    # Parse optional date range from query params
-    start_date = parse_date(request.GET.get("start_date"))
-    end_date = parse_date(request.GET.get("end_date"))
+def dashboard_params(request):
+    """
+    (start_date, end_date, customer_limit, customer_offset) from the query string;
+    ValueError with a message for the client if malformed.
+    """
+    try:
+        start_date = parse_date(request.GET.get("start_date", ""))
+        end_date = parse_date(request.GET.get("end_date", ""))
+    except ValueError:
+        raise ValueError("start_date and end_date must be valid dates (YYYY-MM-DD).")
+    try:
+        # Per-customer breakdown is paginated and limited to the top customers
+        customer_limit = min(int(request.GET.get("customer_limit", 10)), MAX_CUSTOMER_LIMIT)
+        customer_offset = max(int(request.GET.get("customer_offset", 0)), 0)
+    except ValueError:
+        raise ValueError("customer_limit and customer_offset must be integers.")
+    return start_date, end_date, customer_limit, customer_offset
 
-    workorders = WorkOrder.objects.all()
-    if start_date and end_date:
-        workorders = workorders.filter(created_at__date__range=[start_date, end_date])
 
-    total_customers = Customer.objects.count()
-    total_orders = workorders.count()
-    pending_orders = workorders.filter(status="pending").count()
-    completed_orders = workorders.filter(status="completed").count()
-    total_revenue = workorders.aggregate(Sum("total_cost"))["total_cost__sum"] or 0
+def dashboard_cache_key(start_date, end_date, customer_limit, customer_offset):
+    # Cached per stats version: any work order/customer write bumps the version
+    return (
+        f"dashboard_summary:{stats.stats_version()}:{start_date}:{end_date}:"
+        f"{customer_limit}:{customer_offset}"
+    )
+
+
+def dashboard_queries(start_date, end_date, customer_limit, customer_offset):
+    """The independent reads behind the summary, as callables (the async view runs them concurrently)."""
+    workorders = WorkOrder.objects.all()
+    if start_date:
+        workorders = workorders.filter(created_at__date__gte=start_date)
+    if end_date:
+        workorders = workorders.filter(created_at__date__lte=end_date)
 
     # cost per customer (within filtered range if applied)
     cost_per_customer = (
-        workorders.values("customer__first_name", "customer__last_name")
-        .annotate(total_orders=Count("id"))
-        .order_by()
+        workorders.values("customer_id", "customer__first_name", "customer__last_name")
+        .annotate(total_orders=Count("id"), total_cost=Sum("total_cost"))
+        .order_by("-total_orders", "customer_id")[customer_offset:customer_offset + customer_limit]
+    )
+    return (
+        lambda: stats.summarize(start_date, end_date),
+        Customer.objects.count,
+        lambda: list(cost_per_customer),
+        sla.overdue_summary,
     )
 
-    return Response({
+
+def dashboard_data(summary, total_customers, cost_per_customer, overdue, customer_limit, customer_offset):
+    return {
         "total_customers": total_customers,
-        "total_orders": total_orders,
-        "pending_orders": pending_orders,
-        "completed_orders": completed_orders,
-        "total_revenue": total_revenue,
-        "cost_per_customer": list(cost_per_customer),
-    })
\ No newline at end of file
+        "total_orders": summary["total_orders"],
+        "pending_orders": summary["by_status"].get("pending", {}).get("total_orders", 0),
+        "completed_orders": summary["by_status"].get("completed", {}).get("total_orders", 0),
+        "total_revenue": summary["total_revenue"],
+        "orders_by_status": summary["by_status"],
+        "orders_by_technician": [
+            {"technician_id": technician_id, **values}
+            for technician_id, values in summary["by_technician"].items()
+        ],
+        "cost_per_customer": cost_per_customer,
+        # as of the last `evaluate_sla` run, from the per-technician counters
+        "overdue_orders": overdue["total"],
+        "overdue_unassigned": overdue["unassigned"],
+        "overdue_by_technician": [
+            {"technician_id": technician_id, "overdue_orders": count}
+            for technician_id, count in overdue["by_technician"].items()
+        ],
+        "customer_limit": customer_limit,
+        "customer_offset": customer_offset,
+    }
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def dashboard_summary(request):
+    """Order, revenue and per-customer totals (staff only)."""
+    try:
+        params = dashboard_params(request)
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=400)
+
+    def compute():
+        results = [query() for query in dashboard_queries(*params)]
+        return dashboard_data(*results, *params[2:])
+
+    data = caching.cached("dashboard_summary", dashboard_cache_key(*params), compute, timeout=DASHBOARD_CACHE_TIMEOUT)
+    return Response(data)
+
+
+@require_GET
+async def dashboard_summary_async(request):
+    """``dashboard_summary`` for ASGI: the reads overlap instead of running back to back."""
+    user = await request.auser()
+    if not user.is_authenticated:
+        # same answers as IsAdminUser on the sync view
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=403)
+    if not user.is_staff:
+        return JsonResponse({"detail": "You do not have permission to perform this action."}, status=403)
+    try:
+        params = dashboard_params(request)
+    except ValueError as exc:
+        return JsonResponse({"detail": str(exc)}, status=400)
+
+    async def compute():
+        results = await asyncdb.gather(*dashboard_queries(*params))
+        return dashboard_data(*results, *params[2:])
+
+    key = await sync_to_async(dashboard_cache_key)(*params)
+    data = await caching.acached("dashboard_summary", key, compute, timeout=DASHBOARD_CACHE_TIMEOUT)
+    # DRF's encoder, so decimals come out as in the sync view
+    return JsonResponse(data, encoder=JSONEncoder)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def analytics_summary(request):
+    """Turnaround, repair success and estimate accuracy per technician and brand, and weekly revenue (staff only)."""
+    try:
+        start_date = parse_date(request.GET.get("start_date", ""))
+        end_date = parse_date(request.GET.get("end_date", ""))
+    except ValueError:
+        return Response({"detail": "start_date and end_date must be valid dates (YYYY-MM-DD)."}, status=400)
+    return Response(analytics.summary(start_date, end_date))
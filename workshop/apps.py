@@ -7,4 +7,9 @@ class WorkshopConfig(AppConfig):
 
     def ready(self):
         import workshop.signals
-
+        import workshop.search
+        import workshop.caching
+        import workshop.events
+        import workshop.scheduling
+        import workshop.transitions
+        import workshop.cutover
@@ -0,0 +1,52 @@
+# workshop/asyncdb.py
+"""
+Database helpers for the async views (``ASYNC_VIEWS=True``, served by
+``repair_shop.asgi``).
+
+Django's async ORM methods (``aget``, ``acount``, ``async for``) run every
+query of a request in that request's sync thread, one after another.
+``gather`` runs independent read-only callables in worker threads instead,
+each on its own connection, so they overlap. ``aiterate`` lets an ASGI
+response stream a sync iterator (an export) chunk by chunk; Django would
+otherwise read the whole iterator into memory first.
+"""
+import asyncio
+import contextvars
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+_DONE = object()
+
+
+def _isolated(func):
+    def run():
+        # worker threads outlive requests, so apply CONN_MAX_AGE / health checks here
+        close_old_connections()
+        try:
+            return func()
+        finally:
+            close_old_connections()
+
+    return run
+
+
+async def gather(*funcs):
+    """Call the sync, read-only callables concurrently; results come back in the same order."""
+    return await asyncio.gather(*(sync_to_async(_isolated(func), thread_sensitive=False)() for func in funcs))
+
+
+def aiterate(iterator):
+    """
+    Async iterator over a sync one. Each step runs in the request's thread,
+    so a server-side cursor stays on its connection. It also runs in the
+    context ``aiterate`` was called from, which keeps the replica scope.
+    """
+    context = contextvars.copy_context()
+    step = sync_to_async(context.run, thread_sensitive=True)
+
+    async def chunks():
+        while (chunk := await step(next, iterator, _DONE)) is not _DONE:
+            yield chunk
+
+    return chunks()
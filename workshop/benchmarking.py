@@ -0,0 +1,194 @@
+# workshop/benchmarking.py
+"""
+Endpoint benchmarks for ``manage.py benchmark_endpoints``.
+
+Every endpoint is requested either in-process with the Django test client
+(which also counts SQL queries per request) or over HTTP against a running
+server, from a pool of keep-alive connections. Query counts come from the
+``Server-Timing`` header when the server sets METRICS_SERVER_TIMING. Results
+can be saved as a JSON baseline and compared later. Query counts are
+deterministic, so any increase is a regression. Latency is compared with a
+tolerance, because it varies from run to run.
+"""
+import http.client
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client
+from django.utils import timezone
+
+from .models import Customer, WorkOrder
+from .utils import percentile
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+# ─────────────────────────────
+# Endpoints
+# ─────────────────────────────
+class Sample:
+    """Customers and work orders to vary the URLs with, picked once per run."""
+
+    def __init__(self, size=100, seed=0):
+        rng = random.Random(seed)
+        ids = list(WorkOrder.objects.filter(is_active=True).order_by("-pk").values_list("pk", flat=True)[:size * 20])
+        if not ids:
+            raise ValueError("No work orders to request; run seed_data first.")
+        self.orders = rng.sample(ids, min(size, len(ids)))
+        customer_ids = WorkOrder.objects.filter(pk__in=self.orders).values_list("customer_id", flat=True)
+        self.emails = sorted(Customer.objects.filter(pk__in=customer_ids).values_list("email", flat=True))
+
+
+ENDPOINTS = {
+    "landing": lambda sample: ["/"],
+    "landing_search": lambda sample: [f"/?q={email}" for email in sample.emails],
+    "workorder_page": lambda sample: [f"/workorder/{pk}/" for pk in sample.orders],
+    "api_workorders": lambda sample: ["/api/workorders/"],
+    "api_workorders_pending": lambda sample: ["/api/workorders/?status=pending"],
+    "api_workorders_search": lambda sample: ["/api/workorders/?search=screen", "/api/workorders/?search=galaxy"],
+    "api_workorder_detail": lambda sample: [f"/api/workorders/{pk}/" for pk in sample.orders],
+    "dashboard_summary": lambda sample: ["/api/dashboard-summary/"],
+}
+
+
+def staff_cookie():
+    """
+    ``Cookie`` header with a session of the first active staff user, so staff-only
+    endpoints (the dashboard) can be timed; None if there is no such user.
+    """
+    user = User.objects.filter(is_staff=True, is_active=True).order_by("pk").first()
+    if user is None:
+        return None
+    client = Client()
+    client.force_login(user)
+    return client.cookies.output(attrs=[], header="", sep="; ").strip()
+
+
+def summarize(timings, queries, errors, elapsed):
+    known = [count for count in queries if count is not None]
+    return {
+        "requests": len(timings),
+        "rps": round(len(timings) / elapsed, 1) if elapsed else 0,
+        "p50_ms": round(percentile(timings, 50) * 1000, 2),
+        "p95_ms": round(percentile(timings, 95) * 1000, 2),
+        "p99_ms": round(percentile(timings, 99) * 1000, 2),
+        "queries": percentile(known, 50) if known else None,
+        "errors": errors,
+    }
+
+
+# ─────────────────────────────
+# Runners
+# ─────────────────────────────
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_client(urls, iterations, host, cold=False, cookie=None):
+    """Sequential requests through the test client (full middleware stack, no network)."""
+    client = Client(SERVER_NAME=host)
+    if cookie:
+        client.cookies.load(cookie)
+    client.get(urls[0])  # warm up connections and caches
+    timings, queries, errors = [], [], 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        if cold:
+            cache.clear()
+        counter = _QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            request_started = time.perf_counter()
+            response = client.get(urls[i % len(urls)])
+            timings.append(time.perf_counter() - request_started)
+        queries.append(counter.count)
+        errors += response.status_code >= 400
+    return summarize(timings, queries, errors, time.perf_counter() - started)
+
+
+def run_http(base_url, urls, iterations, concurrency, cookie=None):
+    """``iterations`` requests from ``concurrency`` keep-alive connections to a running server."""
+    parts = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    prefix = parts.path.rstrip("/")
+    local = threading.local()
+
+    def one(i):
+        if not hasattr(local, "connection"):
+            local.connection = connection_class(parts.hostname, parts.port, timeout=30)
+        started = time.perf_counter()
+        try:
+            local.connection.request("GET", prefix + urls[i % len(urls)], headers={"Cookie": cookie} if cookie else {})
+            response = local.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            local.connection.close()
+            del local.connection
+            return time.perf_counter() - started, None, True
+        match = SERVER_TIMING_QUERIES.search(response.getheader("Server-Timing") or "")
+        return time.perf_counter() - started, int(match.group(1)) if match else None, response.status >= 400
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(iterations)))
+    elapsed = time.perf_counter() - started
+    return summarize(
+        [timing for timing, _, _ in results], [count for _, count, _ in results],
+        sum(error for _, _, error in results), elapsed,
+    )
+
+
+# ─────────────────────────────
+# Baselines
+# ─────────────────────────────
+def baseline_document(results, mode):
+    return {
+        "created": timezone.now().isoformat(timespec="seconds"),
+        "mode": mode,
+        "work_orders": WorkOrder.objects.count(),
+        "endpoints": results,
+    }
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as stream:
+        return json.load(stream)
+
+
+def save_baseline(path, document):
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump(document, stream, indent=2, sort_keys=True)
+        stream.write("\n")
+
+
+def regressions(results, baseline, tolerance, min_delta_ms=1.0):
+    """
+    Messages for endpoints whose query count grew, or whose p95 grew by more
+    than ``tolerance`` (0.2 = 20%) and by at least ``min_delta_ms``.
+    """
+    problems = []
+    for name, current in results.items():
+        before = baseline["endpoints"].get(name)
+        if not before:
+            continue
+        if current["queries"] is not None and before["queries"] is not None and current["queries"] > before["queries"]:
+            problems.append(f"{name}: {current['queries']} queries per request, baseline {before['queries']}")
+        slower = current["p95_ms"] - before["p95_ms"]
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance) and slower >= min_delta_ms:
+            problems.append(f"{name}: p95 {current['p95_ms']:.1f}ms, baseline {before['p95_ms']:.1f}ms")
+    return problems
@@ -0,0 +1,161 @@
+# workshop/caching.py
+"""
+Versioned caching for the public pages (landing search results and work
+order detail).
+
+Entries are keyed by version numbers that live in the cache too: one per work
+order, one per customer (their list of orders on the landing page) and a
+``lookup`` generation for search text -> customers. The receivers at the
+bottom drop the versions of exactly the rows a save, delete or bulk update
+touched, so stale entries are never read again and simply expire. Drops happen
+immediately and again after commit, so a reader cannot re-cache rows from
+before the commit.
+
+Hits and misses per cache name are counted in the metrics registry. With more
+than one process use a shared backend (``CACHE_BACKEND=redis``, ``file`` or
+``db``); the default local-memory cache is per process.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .metrics import registry
+from .models import Customer, Technician, WorkOrder
+from .signals import work_orders_bulk_updated
+
+_MISSING = object()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def digest(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+# ─────────────────────────────
+# Versions
+# ─────────────────────────────
+def _version_key(kind, pk):
+    return f"version:{kind}:{pk}"
+
+
+def get_versions(kind, ids):
+    """Current version of each id (a missing version gets a fresh, never reused value)."""
+    keys = {_version_key(kind, pk): pk for pk in ids}
+    found = cache.get_many(list(keys))
+    missing = [key for key in keys if key not in found]
+    if missing:
+        seed = time.time_ns()
+        for key in missing:
+            cache.add(key, seed, timeout=None)
+        found.update(cache.get_many(missing))
+    return {keys[key]: value for key, value in found.items()}
+
+
+def _drop(keys):
+    if keys:
+        cache.delete_many(keys)
+
+
+def invalidate(kind, ids):
+    keys = [_version_key(kind, pk) for pk in set(ids) if pk is not None]
+    _drop(keys)
+    transaction.on_commit(lambda: _drop(keys))
+
+
+# ─────────────────────────────
+# Reading
+# ─────────────────────────────
+def cached(name, key, compute, timeout=None):
+    """``cache.get_or_set`` that counts hits/misses under ``name``."""
+    value = cache.get(key, _MISSING)
+    registry.record_cache(name, value is not _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value, timeout or _setting("PAGE_CACHE_TIMEOUT", 3600))
+    return value
+
+
+async def acached(name, key, compute, timeout=None):
+    """``cached`` for async views; ``compute`` is a coroutine function."""
+    value = await cache.aget(key, _MISSING)
+    registry.record_cache(name, value is not _MISSING)
+    if value is _MISSING:
+        value = await compute()
+        await cache.aset(key, value, timeout or _setting("PAGE_CACHE_TIMEOUT", 3600))
+    return value
+
+
+def work_order_key(name, pk):
+    return f"{name}:{pk}:{get_versions('workorder', [pk])[pk]}"
+
+
+def customers_key(name, customer_ids, *parts):
+    versions = get_versions("customer", customer_ids)
+    return f"{name}:{digest(*parts, sorted(versions.items()))}"
+
+
+def lookup_key(name, *parts):
+    return f"{name}:{get_versions('lookup', [0])[0]}:{digest(*parts)}"
+
+
+# ─────────────────────────────
+# Invalidation
+# ─────────────────────────────
+def _orders_touched(ids):
+    ids = list(ids)
+    invalidate("workorder", ids)
+    customers = set()
+    for start in range(0, len(ids), 500):
+        customers.update(
+            WorkOrder.objects.filter(pk__in=ids[start:start + 500]).values_list("customer_id", flat=True).distinct()
+        )
+    invalidate("customer", customers)
+
+
+@receiver(post_save, sender=WorkOrder)
+@receiver(post_delete, sender=WorkOrder)
+def workorder_changed(sender, instance, **kwargs):
+    invalidate("workorder", [instance.pk])
+    previous = instance.previous_value("customer")
+    invalidate("customer", [instance.customer_id, previous if isinstance(previous, int) else None])
+
+
+@receiver(work_orders_bulk_updated, sender=WorkOrder)
+def workorders_bulk_updated(sender, ids, fields, **kwargs):
+    _orders_touched(ids)
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def customer_changed(sender, instance, **kwargs):
+    invalidate("customer", [instance.pk])
+    invalidate("lookup", [0])  # email/phone may now match other searches
+    if instance.pk is not None:
+        invalidate("workorder", WorkOrder.objects.filter(customer_id=instance.pk).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Technician)
+def technician_changed(sender, instance, created, **kwargs):
+    if not created:
+        _orders_touched(WorkOrder.objects.filter(technician_id=instance.pk).values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Technician)
+def technician_deleting(sender, instance, **kwargs):
+    # on_delete=SET_NULL is a plain UPDATE, so remember whose pages change
+    instance._cached_work_order_ids = list(
+        WorkOrder.objects.filter(technician_id=instance.pk).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Technician)
+def technician_deleted(sender, instance, **kwargs):
+    _orders_touched(getattr(instance, "_cached_work_order_ids", []))
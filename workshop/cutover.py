@@ -0,0 +1,411 @@
+# workshop/cutover.py
+"""
+Moving the database to PostgreSQL without downtime (``manage.py migrate_to_postgres``).
+
+The target is the ``target`` database alias (DB_TARGET_* settings); a second
+SQLite file works too, for rehearsals. Every table is copied parents first,
+in primary key order, in chunks read from the source with ``values_list``.
+On PostgreSQL a chunk is streamed with COPY into a temporary table and merged
+with ``INSERT ... ON CONFLICT DO NOTHING``; other backends insert the rows
+directly. The last copied key of each table is saved in the target
+(``cutover_checkpoint``) in the same transaction as its chunk. An interrupted
+run resumes where it stopped, and a later run copies only rows added since.
+
+Verification compares row counts and checksums per chunk of keys between the
+two databases. With ``repair`` a chunk that differs is deleted from the target
+and copied again, which also catches rows updated in place after they were
+copied.
+
+With DUAL_WRITE on, saves, deletes and bulk updates of MIRRORED_MODELS are
+applied to the target as soon as the source transaction commits: the row is
+read back and upserted, or deleted. The work order number counter follows
+``work_order_sequence_changed`` and only moves forward. That keeps the target
+current while the copy runs and until the switch. Mirrored rows keep their ids
+without touching the target's id sequences, so ``reset_sequences()``
+(``migrate_to_postgres --reset-sequences``) runs once at the switch, after the
+last write to the old database. Derived rows that change
+through plain UPDATEs (dashboard rollup, workload counters) are left to the
+final verify-and-repair run and the rebuild commands.
+"""
+import hashlib
+import io
+import json
+import logging
+import time
+from datetime import date, datetime, timedelta
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import WorkOrder, WorkOrderSequence
+from .signals import work_order_sequence_changed, work_orders_bulk_updated
+
+logger = logging.getLogger(__name__)
+
+TARGET = "target"
+CHECKPOINT_TABLE = "cutover_checkpoint"
+MIRRORED_MODELS = (
+    "auth.User",
+    "workshop.Customer",
+    "workshop.Technician",
+    "workshop.WorkOrder",
+    "workshop.ProductImage",
+    "workshop.RemoteRequest",
+    "workshop.WorkOrderSequence",  # changed with update(); mirrored on work_order_sequence_changed
+)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def copied_models():
+    """Every concrete, managed model (including many-to-many tables), parents before children."""
+    models = [
+        model for model in apps.get_models(include_auto_created=True)
+        if model._meta.managed and not model._meta.proxy
+    ]
+    wanted, ordered, seen = set(models), [], set()
+
+    def visit(model):
+        if model in seen:
+            return
+        seen.add(model)
+        for field in model._meta.concrete_fields:
+            related = field.related_model if field.is_relation else None
+            if related in wanted and related is not model:
+                visit(related)
+        ordered.append(model)
+
+    for model in sorted(models, key=lambda model: model._meta.db_table):
+        visit(model)
+    return ordered
+
+
+def _columns(model):
+    fields = model._meta.concrete_fields
+    return fields, [field.attname for field in fields]
+
+
+def _rows(model, using, after=None, upto=None, limit=None):
+    """Rows of ``model`` in key order as value tuples, keys in (``after``, ``upto``]."""
+    _, attnames = _columns(model)
+    rows = model._base_manager.using(using).order_by("pk")
+    if after is not None:
+        rows = rows.filter(pk__gt=after)
+    if upto is not None:
+        rows = rows.filter(pk__lte=upto)
+    rows = rows.values_list(*attnames)
+    return list(rows[:limit] if limit else rows)
+
+
+# ─────────────────────────────
+# Writing to the target
+# ─────────────────────────────
+def _copy_text(value):
+    """One value in PostgreSQL COPY text format."""
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        text = "t" if value else "f"
+    elif isinstance(value, (bytes, memoryview)):
+        text = "\\x" + bytes(value).hex()
+    elif isinstance(value, (datetime, date)):
+        text = value.isoformat()
+    elif isinstance(value, timedelta):
+        text = f"{value.total_seconds()} seconds"
+    elif isinstance(value, (dict, list)):
+        text = json.dumps(value)
+    else:
+        text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy_in(cursor, sql, data):
+    if hasattr(cursor.cursor, "copy_expert"):  # psycopg2
+        cursor.cursor.copy_expert(sql, io.StringIO(data))
+    else:  # psycopg 3
+        with cursor.cursor.copy(sql) as copy:
+            copy.write(data)
+
+
+def _insert(connection, model, rows, on_conflict):
+    """Insert value tuples; ``on_conflict`` is ``"nothing"`` (keep the target's row) or ``"update"``."""
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    fields, _ = _columns(model)
+    table = quote(model._meta.db_table)
+    columns = ", ".join(quote(field.column) for field in fields)
+    if on_conflict == "update":
+        pk = model._meta.pk.column
+        assignments = ", ".join(f"{quote(f.column)} = EXCLUDED.{quote(f.column)}" for f in fields if f.column != pk)
+        conflict = (
+            f"ON CONFLICT ({quote(pk)}) DO UPDATE SET {assignments}"
+            if assignments else "ON CONFLICT DO NOTHING"
+        )
+    else:
+        conflict = "ON CONFLICT DO NOTHING"
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql" and on_conflict == "nothing":
+            stage = quote(f"cutover_stage_{model._meta.db_table}")
+            cursor.execute(f"CREATE TEMPORARY TABLE {stage} (LIKE {table}) ON COMMIT DROP")
+            data = "".join("\t".join(map(_copy_text, row)) + "\n" for row in rows)
+            _copy_in(cursor, f"COPY {stage} ({columns}) FROM STDIN", data)
+            cursor.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {stage} {conflict}")
+            cursor.execute(f"DROP TABLE {stage}")
+            return
+        placeholders = ", ".join(["%s"] * len(fields))
+        cursor.executemany(
+            f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) {conflict}",
+            [
+                [field.get_db_prep_save(value, connection) for field, value in zip(fields, row)]
+                for row in rows
+            ],
+        )
+
+
+def _delete(connection, model, after=None, upto=None, pks=None):
+    """Delete target rows by key range or list, without signals or cascades."""
+    quote = connection.ops.quote_name
+    pk = model._meta.pk
+    conditions, params = [], []
+    if after is not None:
+        conditions.append(f"{quote(pk.column)} > %s")
+        params.append(pk.get_db_prep_value(after, connection))
+    if upto is not None:
+        conditions.append(f"{quote(pk.column)} <= %s")
+        params.append(pk.get_db_prep_value(upto, connection))
+    if pks is not None:
+        conditions.append(f"{quote(pk.column)} IN ({', '.join(['%s'] * len(pks))})")
+        params.extend(pk.get_db_prep_value(value, connection) for value in pks)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {quote(model._meta.db_table)}{where}", params)
+
+
+# ─────────────────────────────
+# Checkpoints
+# ─────────────────────────────
+def _ensure_checkpoints(connection):
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {quote(CHECKPOINT_TABLE)} "
+            f"(table_name varchar(200) PRIMARY KEY, last_key varchar(255) NOT NULL, copied bigint NOT NULL)"
+        )
+
+
+def checkpoints(using=TARGET):
+    """``{table: (last copied key as text, rows copied)}``."""
+    connection = connections[using]
+    _ensure_checkpoints(connection)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT table_name, last_key, copied FROM {connection.ops.quote_name(CHECKPOINT_TABLE)}")
+        return {table: (last_key, copied) for table, last_key, copied in cursor.fetchall()}
+
+
+def _save_checkpoint(connection, table, last_key, copied):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {connection.ops.quote_name(CHECKPOINT_TABLE)} (table_name, last_key, copied) "
+            f"VALUES (%s, %s, %s) ON CONFLICT (table_name) DO UPDATE SET "
+            f"last_key = EXCLUDED.last_key, copied = EXCLUDED.copied",
+            [table, str(last_key), copied],
+        )
+
+
+def reset(using=TARGET):
+    """Empty every copied table in the target and forget the checkpoints."""
+    connection = connections[using]
+    _ensure_checkpoints(connection)
+    tables = [model._meta.db_table for model in copied_models()]
+    statements = connection.ops.sql_flush(no_style(), tables, reset_sequences=True, allow_cascade=True)
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+            cursor.execute(f"DELETE FROM {connection.ops.quote_name(CHECKPOINT_TABLE)}")
+
+
+# ─────────────────────────────
+# Copying
+# ─────────────────────────────
+def copy_table(model, using=TARGET, source=DEFAULT_DB_ALIAS, batch_size=5000):
+    """
+    Copy the rows of ``model`` after its checkpoint, one transaction per
+    chunk. Returns the number of rows read from the source.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    last_key, copied = checkpoints(using).get(table, (None, 0))
+    after = model._meta.pk.to_python(last_key) if last_key is not None else None
+    pk_index = _columns(model)[0].index(model._meta.pk)
+    read = 0
+    while rows := _rows(model, source, after=after, limit=batch_size):
+        after = rows[-1][pk_index]
+        read += len(rows)
+        with transaction.atomic(using=using):
+            _insert(connection, model, rows, on_conflict="nothing")
+            _save_checkpoint(connection, table, after, copied + read)
+    return read
+
+
+def _reset_sequences(connection, models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+    return len(statements)
+
+
+def reset_sequences(using=TARGET):
+    """Move the target's id sequences past the copied ids (PostgreSQL; a no-op on SQLite)."""
+    return _reset_sequences(connections[using], copied_models())
+
+
+def copy_all(using=TARGET, source=DEFAULT_DB_ALIAS, batch_size=5000, progress=None):
+    """Copy every table, then reset sequences. Returns ``{table: rows copied this run}``."""
+    counts = {}
+    for model in copied_models():
+        started = time.perf_counter()
+        counts[model._meta.db_table] = copy_table(model, using, source, batch_size)
+        if progress:
+            progress(model._meta.db_table, counts[model._meta.db_table], time.perf_counter() - started)
+    reset_sequences(using)
+    return counts
+
+
+# ─────────────────────────────
+# Verification
+# ─────────────────────────────
+def _normalized(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    if isinstance(value, memoryview):
+        return bytes(value)
+    return value
+
+
+def _checksum(rows):
+    digest = hashlib.md5()
+    for row in rows:
+        digest.update(repr(tuple(map(_normalized, row))).encode())
+    return digest.hexdigest()
+
+
+def verify_table(model, using=TARGET, source=DEFAULT_DB_ALIAS, batch_size=5000, repair=False):
+    """
+    Compare source and target chunk by chunk of source keys (plus anything
+    past the last one). Returns ``(source rows, target rows, differing chunks,
+    repaired chunks)``; with ``repair`` differing chunks are re-copied.
+    """
+    connection = connections[using]
+    pk_index = _columns(model)[0].index(model._meta.pk)
+    source_total = target_total = differing = repaired = 0
+    after = None
+    while True:
+        rows = _rows(model, source, after=after, limit=batch_size)
+        upto = rows[-1][pk_index] if rows else None  # None: everything after the last source key
+        theirs = _rows(model, using, after=after, upto=upto)
+        source_total += len(rows)
+        target_total += len(theirs)
+        if len(rows) != len(theirs) or _checksum(rows) != _checksum(theirs):
+            differing += 1
+            if repair:
+                with transaction.atomic(using=using):
+                    _delete(connection, model, after=after, upto=upto)
+                    _insert(connection, model, rows, on_conflict="nothing")
+                repaired += 1
+        if not rows:
+            return source_total, target_total, differing, repaired
+        after = upto
+
+
+def verify_all(using=TARGET, source=DEFAULT_DB_ALIAS, batch_size=5000, repair=False):
+    """``{table: verify_table(...)}`` for every copied table; a repair run also resets sequences."""
+    report = {
+        model._meta.db_table: verify_table(model, using, source, batch_size, repair)
+        for model in copied_models()
+    }
+    if repair:
+        reset_sequences(using)
+    return report
+
+
+# ─────────────────────────────
+# Dual writes
+# ─────────────────────────────
+def mirror(model, pks, source=DEFAULT_DB_ALIAS, using=TARGET):
+    """Make the target's rows ``pks`` of ``model`` match the source: upsert those that exist, delete the rest."""
+    pks = list(pks)
+    fields, attnames = _columns(model)
+    pk_index = fields.index(model._meta.pk)
+    rows = []
+    for start in range(0, len(pks), 500):
+        rows += model._base_manager.using(source).filter(pk__in=pks[start:start + 500]).values_list(*attnames)
+    present = {row[pk_index] for row in rows}
+    gone = [pk for pk in pks if pk not in present]
+    connection = connections[using]
+    try:
+        with transaction.atomic(using=using):
+            _insert(connection, model, rows, on_conflict="update")
+            if gone:
+                _delete(connection, model, pks=gone)
+    except DatabaseError:
+        # the source has committed; a later `migrate_to_postgres --repair` fixes the target
+        logger.exception("Dual write of %s %s to %r failed", model._meta.label, pks, using)
+
+
+def mirror_sequence(year, source=DEFAULT_DB_ALIAS, using=TARGET):
+    """
+    Copy the source's work order number counter for ``year`` to the target.
+    It only ever moves forward there, so a callback that runs late cannot
+    hand out numbers again after the switch.
+    """
+    rows = list(
+        WorkOrderSequence._base_manager.using(source).filter(year=year).values_list(*_columns(WorkOrderSequence)[1])
+    )
+    if not rows:
+        return
+    attnames = _columns(WorkOrderSequence)[1]
+    pk, last = rows[0][attnames.index("id")], rows[0][attnames.index("last_number")]
+    target = WorkOrderSequence._base_manager.using(using)
+    try:
+        with transaction.atomic(using=using):
+            if not target.filter(pk=pk).exists():
+                _insert(connections[using], WorkOrderSequence, rows, on_conflict="nothing")
+            target.filter(pk=pk, last_number__lt=last).update(last_number=last)
+    except DatabaseError:
+        logger.exception("Dual write of the %s work order sequence to %r failed", year, using)
+
+
+def _mirrored(model, using):
+    return (
+        _setting("DUAL_WRITE", False) and using == DEFAULT_DB_ALIAS and model._meta.label in MIRRORED_MODELS
+    )
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def model_written(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    if _mirrored(sender, using):
+        transaction.on_commit(partial(mirror, sender, [instance.pk]), using=using)
+
+
+@receiver(work_orders_bulk_updated, sender=WorkOrder)
+def workorders_bulk_updated(sender, ids, fields, **kwargs):
+    if _mirrored(sender, DEFAULT_DB_ALIAS):
+        transaction.on_commit(partial(mirror, sender, list(ids)))
+
+
+@receiver(work_order_sequence_changed, sender=WorkOrderSequence)
+def work_order_sequence_changed_receiver(sender, year, **kwargs):
+    if _mirrored(sender, DEFAULT_DB_ALIAS):
+        transaction.on_commit(partial(mirror_sequence, year))
@@ -0,0 +1,296 @@
+# workshop/events.py
+"""
+Live work order events (status and technician changes) for the server-sent
+events endpoint ``/api/workorders/events/``.
+
+Saves and bulk updates append ``WorkOrderEvent`` rows after their
+transaction commits. In each ASGI worker, one ``Broadcaster`` task polls the
+log every ``EVENTS_POLL_INTERVAL`` seconds and fans new rows out to
+per-connection asyncio queues. Idle clients cost a queue and a suspended
+coroutine, not a thread or a database query. A client that reconnects with
+``Last-Event-ID`` first gets the rows it missed from the table, then live
+events.
+
+Ids do not quite follow commit order: on PostgreSQL an id is taken at insert
+time, so a concurrent commit can make a lower id visible after a higher one.
+The broadcaster keeps asking for ids it skipped for ``EVENTS_LATE_SECONDS``
+and publishes them when they show up (without an SSE id, so the client's
+``Last-Event-ID`` stays at the highest one). A late event that commits while
+a client is disconnected, or between two WSGI polls, is not resent.
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import WorkOrder, WorkOrderEvent
+from .signals import work_orders_bulk_updated
+
+EVENT_FIELDS = (
+    "id", "work_order_id", "work_order_number", "customer_id", "technician_id",
+    "kind", "old_value", "new_value", "created_at",
+)
+MAX_SKIPPED = 1000  # skipped ids waited for at once; a larger jump is a rollback, not a race
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ─────────────────────────────
+# Recording
+# ─────────────────────────────
+def _event(order, kind, old, new):
+    return WorkOrderEvent(
+        work_order_id=order["pk"],
+        work_order_number=order["work_order_number"],
+        customer_id=order["customer_id"],
+        technician_id=order["technician_id"],
+        kind=kind,
+        old_value="" if old is None else str(old),
+        new_value="" if new is None else str(new),
+    )
+
+
+def record(events):
+    """Insert ``events`` once the current transaction commits (immediately outside one)."""
+    if events:
+        transaction.on_commit(lambda: WorkOrderEvent.objects.bulk_create(events))
+
+
+@receiver(post_save, sender=WorkOrder)
+def workorder_saved(sender, instance, created, **kwargs):
+    order = {
+        "pk": instance.pk,
+        "work_order_number": instance.work_order_number,
+        "customer_id": instance.customer_id,
+        "technician_id": instance.technician_id,
+    }
+    if created:
+        record([_event(order, "created", None, instance.status)])
+        return
+    before = getattr(instance, "_previous_state", None)
+    if not before:
+        return
+    events = []
+    if before["status"] != instance.status:
+        events.append(_event(order, "status", before["status"], instance.status))
+    if before["technician_id"] != instance.technician_id:
+        events.append(_event(order, "assignment", before["technician_id"], instance.technician_id))
+    record(events)
+
+
+@receiver(work_orders_bulk_updated, sender=WorkOrder)
+def workorders_bulk_updated(sender, ids, fields, previous=None, **kwargs):
+    if not fields & {"status", "technician_id"}:
+        return
+    previous = previous or {}
+    events = []
+    for start in range(0, len(ids), 500):
+        orders = WorkOrder.objects.filter(pk__in=ids[start:start + 500]).values(
+            "pk", "work_order_number", "customer_id", "technician_id", "status"
+        )
+        for order in orders:
+            if "status" in fields:
+                old = previous.get("status", {}).get(order["pk"])
+                events.append(_event(order, "status", old, order["status"]))
+            if "technician_id" in fields:
+                old = previous.get("technician_id", {}).get(order["pk"])
+                events.append(_event(order, "assignment", old, order["technician_id"]))
+    record(events)
+
+
+def purge_events(days=None):
+    """Delete events older than ``days`` (EVENTS_RETENTION_DAYS). Returns the count."""
+    days = _setting("EVENTS_RETENTION_DAYS", 30) if days is None else days
+    deleted, _ = WorkOrderEvent.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
+
+
+# ─────────────────────────────
+# Reading
+# ─────────────────────────────
+class EventFilter:
+    """Which events a subscriber wants: any combination of work order / customer / technician ids."""
+
+    def __init__(self, work_orders=(), customers=(), technicians=()):
+        self.work_orders = set(work_orders)
+        self.customers = set(customers)
+        self.technicians = set(technicians)
+
+    def matches(self, event):
+        return (
+            (not self.work_orders or event["work_order_id"] in self.work_orders)
+            and (not self.customers or event["customer_id"] in self.customers)
+            and (not self.technicians or event["technician_id"] in self.technicians)
+        )
+
+    def queryset(self):
+        events = WorkOrderEvent.objects.all()
+        if self.work_orders:
+            events = events.filter(work_order_id__in=self.work_orders)
+        if self.customers:
+            events = events.filter(customer_id__in=self.customers)
+        if self.technicians:
+            events = events.filter(technician_id__in=self.technicians)
+        return events
+
+
+def events_after(last_id, event_filter=None, limit=500, skipped=()):
+    """Events after ``last_id``, plus those of the ``skipped`` ids below it that are visible now."""
+    events = event_filter.queryset() if event_filter else WorkOrderEvent.objects.all()
+    after = Q(id__gt=last_id) | Q(id__in=skipped) if skipped else Q(id__gt=last_id)
+    return list(events.filter(after).order_by("id").values(*EVENT_FIELDS)[:limit])
+
+
+def latest_event_id():
+    return WorkOrderEvent.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def format_event(event, with_id=True):
+    """One SSE message. Customer ids are used for filtering but not sent."""
+    data = {
+        "work_order": event["work_order_id"],
+        "work_order_number": event["work_order_number"],
+        "technician": event["technician_id"],
+        "old": event["old_value"],
+        "new": event["new_value"],
+        "at": event["created_at"].isoformat(),
+    }
+    message = f"event: {event['kind']}\ndata: {json.dumps(data)}\n\n"
+    return f"id: {event['id']}\n{message}" if with_id else message
+
+
+# ─────────────────────────────
+# Broadcasting
+# ─────────────────────────────
+class Broadcaster:
+    """
+    One polling task per event loop, running while anyone is subscribed.
+    A subscriber whose queue fills up (a stalled client) gets ``None`` and is
+    expected to close; it resumes from the table when it reconnects.
+    A failed poll is logged and retried on the next one.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.task = None
+        self.started = None  # resolved once the task has read the id it starts after
+        self.last_id = 0
+        self.skipped = {}  # id below last_id not seen yet -> time.monotonic() to stop waiting for it
+
+    async def subscribe(self):
+        queue = asyncio.Queue(maxsize=_setting("EVENTS_QUEUE_SIZE", 1000))
+        loop = asyncio.get_running_loop()
+        if self.task is None or self.task.done() or self.task.get_loop() is not loop:
+            # in place before anything is awaited, so clients connecting together share one task
+            self.started = loop.create_future()
+            self.task = loop.create_task(self.run())
+        self.subscribers.add(queue)
+        try:
+            await asyncio.shield(self.started)
+        except BaseException:
+            self.subscribers.discard(queue)
+            raise
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def run(self):
+        interval = _setting("EVENTS_POLL_INTERVAL", 1.0)
+        fetch = sync_to_async(events_after, thread_sensitive=False)
+        try:
+            self.last_id = await sync_to_async(latest_event_id, thread_sensitive=False)()
+        except Exception as exc:
+            self.started.set_exception(exc)
+            return
+        self.skipped = {}
+        self.started.set_result(None)
+        while self.subscribers:
+            try:
+                found = await fetch(self.last_id, skipped=list(self.skipped))
+            except Exception:
+                logger.exception("Polling work order events failed; retrying.")
+            else:
+                self.receive(found)
+            await asyncio.sleep(interval)
+        self.task = None
+
+    def receive(self, found):
+        now = time.monotonic()
+        until = now + _setting("EVENTS_LATE_SECONDS", 5.0)
+        for event in found:
+            if event["id"] > self.last_id:
+                skipped = range(max(self.last_id + 1, event["id"] - MAX_SKIPPED), event["id"])
+                self.skipped.update(dict.fromkeys(skipped, until))
+                self.last_id = event["id"]
+            elif self.skipped.pop(event["id"], None) is None:
+                continue  # already published
+            self.publish(event)
+        self.skipped = {event_id: deadline for event_id, deadline in self.skipped.items() if deadline > now}
+
+    def publish(self, event):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.subscribers.discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+
+broadcaster = Broadcaster()
+
+
+async def stream(event_filter, last_id=None):
+    """
+    Async iterator of SSE messages for one client: the backlog after
+    ``last_id`` (when given), then live events, with a comment line every
+    EVENTS_KEEPALIVE_SECONDS so proxies keep idle connections open.
+    """
+    keepalive = _setting("EVENTS_KEEPALIVE_SECONDS", 15)
+    queue = await broadcaster.subscribe()  # before the backlog, so nothing falls in between
+    # the queue gets ids above this one and late ones still awaited; the backlog may send them first
+    published, awaited, from_backlog = broadcaster.last_id, set(broadcaster.skipped), set()
+    try:
+        yield f"retry: {int(_setting('EVENTS_RETRY_MS', 3000))}\n\n"
+        if last_id is None:
+            # a fresh client starts at "now"; the id line makes its reconnect resume from here
+            sent = published
+            yield f"id: {sent}\n\n"
+        else:
+            fetch, limit, sent = sync_to_async(events_after, thread_sensitive=False), 500, last_id
+            while True:
+                backlog = await fetch(sent, event_filter, limit)
+                for event in backlog:
+                    sent = event["id"]
+                    if sent > published or sent in awaited:
+                        from_backlog.add(sent)
+                    yield format_event(event)
+                if len(backlog) < limit:
+                    break
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                return
+            if event["id"] not in from_backlog and event_filter.matches(event):
+                yield format_event(event, with_id=event["id"] > sent)
+                sent = max(sent, event["id"])
+    finally:
+        broadcaster.unsubscribe(queue)
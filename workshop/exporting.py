@@ -0,0 +1,92 @@
+# workshop/exporting.py
+"""
+Streaming work order export (NDJSON / CSV) shared by the API and the export command.
+Rows are read with ``values()`` + ``iterator()``, so memory stays flat however
+many rows are written.
+"""
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# (output column, ORM lookup)
+EXPORT_FIELDS = [
+    ("id", "id"),
+    ("work_order_number", "work_order_number"),
+    ("customer_id", "customer_id"),
+    ("customer_first_name", "customer__first_name"),
+    ("customer_last_name", "customer__last_name"),
+    ("customer_email", "customer__email"),
+    ("customer_phone_number", "customer__phone_number"),
+    ("technician_id", "technician_id"),
+    ("product_type", "product_type"),
+    ("product_brand", "product_brand"),
+    ("product_model", "product_model"),
+    ("serial_number", "serial_number"),
+    ("issue_description", "issue_description"),
+    ("status", "status"),
+    ("is_active", "is_active"),
+    ("is_repaired", "is_repaired"),
+    ("repair_details", "repair_details"),
+    ("reason_for_not_repairing", "reason_for_not_repairing"),
+    ("estimated_cost", "estimated_cost"),
+    ("estimated_completion_date", "estimated_completion_date"),
+    ("total_cost", "total_cost"),
+    ("customer_collected", "customer_collected"),
+    ("date_collected", "date_collected"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+]
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def export_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield one tuple per work order in EXPORT_FIELDS order."""
+    lookups = [lookup for _, lookup in EXPORT_FIELDS]
+    return queryset.values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(rows):
+    columns = [name for name, _ in EXPORT_FIELDS]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + "\n"
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_FIELDS])
+    for row in rows:
+        yield writer.writerow(["" if value is None else value for value in row])
+
+
+def _buffered(lines, buffer_size=64 * 1024):
+    """Group lines into ~64 KB strings; one write per line is slow through WSGI."""
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= buffer_size:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_work_orders(queryset, export_format="ndjson", chunk_size=DEFAULT_CHUNK_SIZE):
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {export_format!r}; use one of {', '.join(EXPORT_FORMATS)}.")
+    rows = export_rows(queryset, chunk_size)
+    return _buffered(csv_lines(rows) if export_format == "csv" else ndjson_lines(rows))
@@ -2,8 +2,8 @@ import django_filters
 from .models import WorkOrder
 
 class WorkOrderFilter(django_filters.FilterSet):
-    date_created_after = django_filters.DateFilter(field_name="date_created", lookup_expr="gte")
-    date_created_before = django_filters.DateFilter(field_name="date_created", lookup_expr="lte")
+    date_created_after = django_filters.DateFilter(field_name="created_at", lookup_expr="date__gte")
+    date_created_before = django_filters.DateFilter(field_name="created_at", lookup_expr="date__lte")
     status = django_filters.CharFilter(field_name="status")
     technician_id = django_filters.NumberFilter(field_name="technician__id")
     customer_id = django_filters.NumberFilter(field_name="customer__id")
@@ -0,0 +1,141 @@
+# workshop/imaging.py
+"""
+Resized derivatives for ProductImage uploads.
+
+Uploads are stored untouched and queued (``processed_at`` is NULL); the
+``process_images`` command renders them off the request path. Each image gets
+a thumbnail and a display-size copy in ``IMAGE_DERIVATIVE_FORMAT`` (WebP by
+default) with EXIF orientation applied and all metadata stripped, plus its
+dimensions and a tiny base64 placeholder (LQIP) to show blurred while the real
+image loads.
+
+``render_derivatives`` only touches bytes and Pillow, so it can run in a
+process pool; everything that needs the database stays in the parent.
+"""
+import base64
+import io
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+# Longest edge in pixels, largest first (each size is resized from the previous one)
+DERIVATIVE_SIZES = {"display": 1280, "thumbnail": 320}
+PLACEHOLDER_SIZE = 16
+FORMATS = {"WEBP": ("webp", "image/webp"), "JPEG": ("jpg", "image/jpeg")}
+ROTATING_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def _encode(image, fmt, quality):
+    if fmt == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, quality=quality, icc_profile=image.info.get("icc_profile"))
+    return buffer.getvalue()
+
+
+def render_derivatives(data, fmt="WEBP", quality=80):
+    """
+    Original image bytes -> dict with ``width``/``height`` (upright), a
+    ``placeholder`` data URI and encoded bytes for every DERIVATIVE_SIZES name.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        width, height = original.size
+        if original.getexif().get(0x0112) in ROTATING_ORIENTATIONS:
+            width, height = height, width
+        # Let the JPEG decoder downscale while decoding; much faster for phone photos
+        largest = max(DERIVATIVE_SIZES.values())
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+    result = {"width": width, "height": height}
+    for name, size in DERIVATIVE_SIZES.items():
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        result[name] = _encode(image, fmt, quality)
+
+    image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BILINEAR)
+    encoded = base64.b64encode(_encode(image, fmt, 40)).decode("ascii")
+    result["placeholder"] = f"data:{FORMATS[fmt][1]};base64,{encoded}"
+    return result
+
+
+# ─────────────────────────────
+# Queue processing
+# ─────────────────────────────
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def pending_images():
+    from .models import ProductImage
+
+    return ProductImage.objects.filter(processed_at__isnull=True).order_by("pk")
+
+
+def _render(executor, data, fmt, quality):
+    if executor is not None:
+        return executor.submit(render_derivatives, data, fmt, quality)
+    future = Future()
+    try:
+        future.set_result(render_derivatives(data, fmt, quality))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+
+def _failed(exc):
+    future = Future()
+    future.set_exception(exc)
+    return future
+
+
+def save_derivatives(image, result, fmt):
+    """Store the rendered files and metadata on ``image`` (a ProductImage)."""
+    extension = FORMATS[fmt][0]
+    for name in DERIVATIVE_SIZES:
+        field = getattr(image, name)
+        if field:
+            field.delete(save=False)
+        field.save(f"{image.pk}-{name}.{extension}", ContentFile(result[name]), save=False)
+    image.width = result["width"]
+    image.height = result["height"]
+    image.placeholder = result["placeholder"]
+    image.processed_at = timezone.now()
+    image.processing_error = None
+    image.save(update_fields=[*DERIVATIVE_SIZES, "width", "height", "placeholder", "processed_at", "processing_error"])
+
+
+def process_batch(batch_size=None, executor=None):
+    """
+    Render one batch of pending images, in ``executor`` (a process pool) when
+    given. Failures are recorded on the row so they are not retried in a loop.
+    Returns a dict of counts per outcome.
+    """
+    batch_size = batch_size or _setting("IMAGE_PROCESSING_BATCH_SIZE", 20)
+    fmt = _setting("IMAGE_DERIVATIVE_FORMAT", "WEBP").upper()
+    quality = _setting("IMAGE_DERIVATIVE_QUALITY", 80)
+    counts = {"processed": 0, "failed": 0}
+
+    jobs = []
+    for image in pending_images()[:batch_size]:
+        try:
+            with image.image.open("rb") as source:
+                jobs.append((image, _render(executor, source.read(), fmt, quality)))
+        except Exception as exc:
+            jobs.append((image, _failed(exc)))
+
+    for image, future in jobs:
+        try:
+            save_derivatives(image, future.result(), fmt)
+            counts["processed"] += 1
+        except Exception as exc:
+            image.processed_at = timezone.now()
+            image.processing_error = str(exc) or exc.__class__.__name__
+            image.save(update_fields=["processed_at", "processing_error"])
+            counts["failed"] += 1
+    return counts
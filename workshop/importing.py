@@ -0,0 +1,276 @@
+# workshop/importing.py
+"""
+Bulk work order import used by ``manage.py import_work_orders``.
+
+Reads the columns ``exporting.EXPORT_FIELDS`` writes (CSV or NDJSON), so an
+export loads into another database as-is. Customers are deduplicated by email
+in memory, rows without a work order number get numbers a block at a time
+(after the sequence has moved past the numbers the batch brings), and each
+batch is one ``bulk_create`` per model inside a transaction. Model signals do
+not run; search documents and technician workloads are refreshed per batch
+and the dashboard rollup once at the end.
+"""
+import csv
+import json
+from contextlib import contextmanager
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import scheduling, search, stats
+from .models import Customer, Technician, WorkOrder, WorkOrderSequence, format_work_order_number
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+TEXT_FIELDS = (
+    "product_type", "product_brand", "product_model", "serial_number", "issue_description",
+    "repair_details", "reason_for_not_repairing",
+)
+BOOLEAN_FIELDS = ("is_active", "is_repaired", "customer_collected")
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+FALSE_VALUES = {"0", "false", "f", "no", "n"}
+
+
+class RowError(ValueError):
+    pass
+
+
+def read_rows(stream, import_format):
+    """Yield one dict per record of a CSV (with header) or NDJSON text stream."""
+    if import_format == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+# ─────────────────────────────
+# Row parsing
+# ─────────────────────────────
+def _value(row, name):
+    value = row.get(name)
+    if isinstance(value, str):
+        value = value.strip()
+    return None if value in ("", None) else value
+
+
+def _boolean(row, name, default):
+    value = _value(row, name)
+    if value is None or isinstance(value, bool):
+        return default if value is None else value
+    if str(value).lower() in TRUE_VALUES:
+        return True
+    if str(value).lower() in FALSE_VALUES:
+        return False
+    raise RowError(f"{name}: {value!r} is not a boolean.")
+
+
+def _decimal(row, name):
+    value = _value(row, name)
+    try:
+        return None if value is None else Decimal(str(value))
+    except InvalidOperation:
+        raise RowError(f"{name}: {value!r} is not a number.")
+
+
+def _datetime(row, name):
+    value = _value(row, name)
+    if value is None:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise RowError(f"{name}: {value!r} is not a date/time.")
+        parsed = timezone.datetime(day.year, day.month, day.day)
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+STATUSES = {value for value, _ in WorkOrder._meta.get_field("status").choices}
+
+
+def _check_lengths(obj):
+    # SQLite ignores max_length, PostgreSQL would fail the whole batch
+    for field in obj._meta.concrete_fields:
+        value = getattr(obj, field.attname)
+        if field.max_length and isinstance(value, str) and len(value) > field.max_length:
+            raise RowError(f"{field.name}: longer than {field.max_length} characters.")
+
+
+@contextmanager
+def historical_timestamps():
+    """
+    Let ``bulk_create`` keep the created_at/updated_at given on the objects
+    instead of stamping "now". Only for single-threaded management commands.
+    """
+    fields = [WorkOrder._meta.get_field("created_at"), WorkOrder._meta.get_field("updated_at")]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+# ─────────────────────────────
+# Importer
+# ─────────────────────────────
+class WorkOrderImporter:
+    def __init__(self, batch_size=1000, max_errors=100, on_error=None):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.on_error = on_error or (lambda line, message: None)
+        self.customers = {
+            email.lower(): pk for email, pk in Customer.objects.values_list("email", "pk").iterator(chunk_size=5000)
+        }
+        self.technicians = set(Technician.objects.values_list("pk", flat=True))
+        self.counts = {"imported": 0, "customers": 0, "skipped": 0, "errors": 0}
+        self.days = set()
+        self.allocated = {}  # number handed out by this import -> order pk
+
+    def run(self, rows, progress=None):
+        rows = enumerate(rows, start=1)
+        while batch := list(islice(rows, self.batch_size)):
+            self.import_batch(batch)
+            if progress:
+                progress(self.counts)
+        self.finish()
+        return self.counts
+
+    def error(self, line, message):
+        self.counts["errors"] += 1
+        self.on_error(line, message)
+        if self.counts["errors"] > self.max_errors:
+            raise RowError(f"Stopped after {self.max_errors} bad rows.")
+
+    def build(self, row, new_customers):
+        email = _value(row, "customer_email")
+        if not email:
+            raise RowError("customer_email is required.")
+        key = email.lower()
+        status = _value(row, "status") or "pending"
+        if status not in STATUSES:
+            raise RowError(f"status: {status!r} is not one of {', '.join(sorted(STATUSES))}.")
+        if not _value(row, "product_brand") or not _value(row, "product_model"):
+            raise RowError("product_brand and product_model are required.")
+        technician_id = _value(row, "technician_id")
+        if technician_id is not None and int(technician_id) not in self.technicians:
+            technician_id = None
+
+        created_at = _datetime(row, "created_at") or timezone.now()
+        order = WorkOrder(
+            work_order_number=_value(row, "work_order_number") or "",
+            technician_id=technician_id,
+            status=status,
+            estimated_cost=_decimal(row, "estimated_cost"),
+            total_cost=_decimal(row, "total_cost"),
+            estimated_completion_date=parse_date(_value(row, "estimated_completion_date") or "") or None,
+            date_collected=_datetime(row, "date_collected"),
+            created_at=created_at,
+            updated_at=_datetime(row, "updated_at") or created_at,
+            **{name: _value(row, name) for name in TEXT_FIELDS},
+            **{name: _boolean(row, name, WorkOrder._meta.get_field(name).default) for name in BOOLEAN_FIELDS},
+        )
+        order.issue_description = order.issue_description or ""
+        _check_lengths(order)
+
+        if key not in self.customers and key not in new_customers:
+            customer = Customer(
+                first_name=_value(row, "customer_first_name") or "",
+                last_name=_value(row, "customer_last_name") or "",
+                email=email,
+                phone_number=_value(row, "customer_phone_number"),
+            )
+            customer.set_lookup_fields()
+            _check_lengths(customer)
+            new_customers[key] = customer
+        order._customer_key = key
+        return order
+
+    def import_batch(self, batch):
+        new_customers, orders = {}, []
+        for line, row in batch:
+            try:
+                orders.append(self.build(row, new_customers))
+            except (RowError, ValueError, TypeError) as exc:
+                self.error(line, str(exc))
+
+        with transaction.atomic():
+            if new_customers:
+                Customer.objects.bulk_create(new_customers.values())
+                self.customers.update({key: customer.pk for key, customer in new_customers.items()})
+                self.counts["customers"] += len(new_customers)
+
+            numbered = [order.work_order_number for order in orders if order.work_order_number]
+            taken = set(
+                WorkOrder.objects.filter(work_order_number__in=numbered).values_list("work_order_number", flat=True)
+            ) if numbered else set()
+            # a number this import gave to an earlier unnumbered row belongs to the row that brings it
+            reclaimed = {number: self.allocated.pop(number) for number in taken & self.allocated.keys()}
+            taken -= reclaimed.keys()
+            seen = set()
+            fresh = []
+            for order in orders:
+                number = order.work_order_number
+                if number and (number in taken or number in seen):
+                    self.counts["skipped"] += 1
+                    continue
+                seen.add(number)
+                order.customer_id = self.customers[order._customer_key]
+                fresh.append(order)
+            allocated, renumbered = self.number(fresh, list(reclaimed.values()))
+
+            with historical_timestamps():
+                WorkOrder.objects.bulk_create(fresh)
+            self.allocated.update((order.work_order_number, order.pk) for order in allocated)
+            search.index_work_orders([order.pk for order in fresh] + renumbered)
+            scheduling.apply_deltas(
+                scheduling.workload_deltas((None, scheduling.workload_state(order)) for order in fresh)
+            )
+
+        self.counts["imported"] += len(fresh)
+        self.days.update(timezone.localdate(order.created_at) for order in fresh)
+
+    def number(self, orders, reclaimed=()):
+        """
+        Move each year's sequence past the numbers ``orders`` bring, then number
+        the unnumbered ones a block per creation year. Earlier imported orders
+        whose number was ``reclaimed`` by a numbered row get new numbers.
+        Returns the orders numbered here and the pks of the renumbered ones.
+        """
+        last_numbers, by_year = {}, {}
+        for order in orders:
+            if not order.work_order_number:
+                by_year.setdefault(order.created_at.year, []).append(order)
+                continue
+            number = order.work_order_number
+            tail = number.replace("-", "")[6:]
+            if number.startswith("WO") and number[2:6].isdigit() and tail.isdigit():
+                year = int(number[2:6])
+                last_numbers[year] = max(last_numbers.get(year, 0), int(tail))
+        for year, last in last_numbers.items():
+            WorkOrderSequence.advance(year, last)
+
+        allocated = []
+        for year, pending in by_year.items():
+            for order, number in zip(pending, WorkOrderSequence.allocate(year, count=len(pending))):
+                order.work_order_number = format_work_order_number(year, number)
+                allocated.append(order)
+        renumbered = []
+        for pk, created_at in WorkOrder.objects.filter(pk__in=reclaimed).values_list("pk", "created_at"):
+            number = format_work_order_number(created_at.year, *WorkOrderSequence.allocate(created_at.year))
+            WorkOrder.objects.filter(pk=pk).update(work_order_number=number)
+            self.allocated[number] = pk
+            renumbered.append(pk)
+        return allocated, renumbered
+
+    def finish(self):
+        if self.days:
+            # a long history is cheaper to rebuild whole than through a huge IN list
+            stats.rebuild_days(self.days if len(self.days) <= 500 else None)
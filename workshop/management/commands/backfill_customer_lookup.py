@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from workshop.models import Customer
+
+
+class Command(BaseCommand):
+    help = "Fill Customer.phone_normalized / email_normalized for rows saved before they existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Recompute every customer, not only rows with an empty lookup key.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        customers = Customer.objects.only("id", "email", "phone_number", "phone_normalized", "email_normalized")
+        if not options["all"]:
+            customers = customers.filter(email_normalized__isnull=True)
+
+        # walk by primary key instead of holding a cursor open while we write
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(customers.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+            if not batch:
+                break
+            for customer in batch:
+                customer.set_lookup_fields()
+            updated += Customer.objects.bulk_update(batch, ["phone_normalized", "email_normalized"])
+            last_pk = batch[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(f"Updated lookup keys for {updated} customer(s)."))
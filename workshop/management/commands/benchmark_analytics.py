@@ -0,0 +1,82 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from workshop.analytics import COMPLETED, NO_COST, Columns, analyze, load_columns
+from workshop.transitions import STATUS_CODES
+
+BRANDS = ("Samsung", "Apple", "Tecno", "Infinix", "HP", "Dell", "Lenovo", "Huawei", "Nokia", "Oppo", "LG", "Sony")
+STATUSES = [COMPLETED] * 7 + [STATUS_CODES["cancelled"], STATUS_CODES["pending"], STATUS_CODES["in_progress"]]
+
+
+def synthetic_columns(rows, technicians=12, years=3, seed=0):
+    """``rows`` generated work orders as ``Columns``, without touching the database."""
+    rng = random.Random(seed)
+    now = time.time()
+    span = years * 365 * 86400
+    columns = Columns()
+    for _ in range(rows):
+        created = now - rng.random() * span
+        status = rng.choice(STATUSES)
+        estimate = rng.randrange(300, 15000, 50) * 100
+        if status == COMPLETED:
+            finished = created + rng.uniform(1, 14) * 86400
+            total = int(estimate * rng.uniform(0.8, 1.2))
+            finished_day = int(finished // 86400) + 719163  # date(1970, 1, 1).toordinal()
+        else:
+            finished, total, finished_day = 0, NO_COST, 0
+        columns.append(
+            rng.randint(0, technicians), rng.choice(BRANDS), status, status == COMPLETED, estimate, total, created,
+            finished, finished_day,
+        )
+    return columns
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the /api/analytics/ computation over synthetic columns (millions of work orders, no database "
+        "needed) and, with --database, the full load from the work order table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2_000_000, help="Synthetic work orders.")
+        parser.add_argument("--technicians", type=int, default=12)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--repeat", type=int, default=3, help="Runs of the analysis; the best is reported.")
+        parser.add_argument(
+            "--database", action="store_true", help="Also load and analyze the work orders in the database.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rows"]:
+            started = time.perf_counter()
+            columns = synthetic_columns(options["rows"], options["technicians"], seed=options["seed"])
+            self.stdout.write(
+                f"Generated {len(columns)} rows in {time.perf_counter() - started:.1f}s "
+                f"({columns.nbytes / 2**20:.1f} MiB of columns)"
+            )
+            self.report("synthetic", columns, options["repeat"])
+
+        if options["database"]:
+            started = time.perf_counter()
+            columns = load_columns()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"\nLoaded {len(columns)} work orders in {elapsed:.2f}s "
+                f"({len(columns) / elapsed if elapsed else 0:.0f} rows/s, {columns.nbytes / 2**20:.1f} MiB)"
+            )
+            self.report("database", columns, options["repeat"])
+
+    def report(self, label, columns, repeat):
+        timings = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            result = analyze(columns)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        self.stdout.write(
+            f"{label}: analyzed {len(columns)} rows in {best:.2f}s "
+            f"({len(columns) / best if best else 0:.0f} rows/s), {len(result['by_technician'])} technicians, "
+            f"{len(result['by_brand'])} brands, {len(result['weekly_revenue'])} weeks"
+        )
@@ -0,0 +1,183 @@
+import asyncio
+import io
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+
+from workshop.benchmarking import staff_cookie
+from workshop.utils import percentile
+from workshop.models import WorkOrder
+
+MODES = ("wsgi", "asgi")
+
+
+def wsgi_get(handler, host, url, cookie=None):
+    path, _, query = url.partition("?")
+    environ = {
+        "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query, "SCRIPT_NAME": "",
+        "SERVER_NAME": host, "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1", "HTTP_HOST": host,
+        "REMOTE_ADDR": "127.0.0.1", "wsgi.input": io.BytesIO(), "wsgi.url_scheme": "http",
+        "wsgi.errors": io.StringIO(), "wsgi.multithread": True, "wsgi.multiprocess": False,
+    }
+    if cookie:
+        environ["HTTP_COOKIE"] = cookie
+    status = []
+    body = handler(environ, lambda line, headers, exc_info=None: status.append(int(line[:3])))
+    try:
+        for _ in body:
+            pass
+    finally:
+        body.close()
+    return status[0]
+
+
+async def asgi_get(handler, host, url, cookie=None):
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", host.encode())], "client": ("127.0.0.1", 0), "server": (host, 80),
+    }
+    if cookie:
+        scope["headers"].append((b"cookie", cookie.encode()))
+    requested = False
+    status = []
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Future()  # no disconnect; Django cancels this once the response is sent
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await handler(scope, receive, send)
+    return status[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the hot read endpoints in-process at high concurrency: the WSGI handler with sync "
+        "views on --threads worker threads vs the ASGI handler with ASYNC_VIEWS on one event loop. "
+        "Reports throughput and p50/p95/p99 latency (including time queued for a worker) per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per mode.")
+        parser.add_argument("--concurrency", type=int, default=100, help="Clients with a request in flight.")
+        parser.add_argument(
+            "--threads", type=int, default=8, help="WSGI worker threads (gunicorn --threads); more requests queue."
+        )
+        parser.add_argument(
+            "--db-latency-ms", type=float, default=0,
+            help="Add this much to every query, to approximate a database across the network.",
+        )
+        parser.add_argument("--mode", choices=[*MODES, "both"], default="both")
+        parser.add_argument(
+            "--path", action="append", default=[],
+            help="URL to request (repeatable); defaults to landing, search, work order page, dashboard and API detail.",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["path"] or self.default_paths()
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+        total, concurrency = options["requests"], options["concurrency"]
+        modes = MODES if options["mode"] == "both" else (options["mode"],)
+        self.cookie = staff_cookie()  # the dashboard is staff only
+
+        if options["db_latency_ms"]:
+            self.add_latency(options["db_latency_ms"] / 1000)
+
+        self.stdout.write(
+            f"{total} requests per mode, concurrency {concurrency}, {options['threads']} WSGI threads, "
+            f"{len(paths)} endpoints, +{options['db_latency_ms']}ms per query"
+        )
+        for mode in modes:
+            with override_settings(ASYNC_VIEWS=mode == "asgi"):
+                if mode == "wsgi":
+                    results = self.run_wsgi(paths, host, total, concurrency, options["threads"])
+                else:
+                    results = asyncio.run(self.run_asgi(paths, host, total, concurrency))
+            self.report(mode, results)
+
+    def add_latency(self, seconds):
+        def delay(execute, sql, params, many, context):
+            time.sleep(seconds)
+            return execute(sql, params, many, context)
+
+        def install(sender, connection, **kwargs):
+            connection.execute_wrappers.append(delay)
+
+        connection_created.connect(install, weak=False)
+        connections.close_all()  # reopened with the delay
+
+    def default_paths(self):
+        order = WorkOrder.objects.select_related("customer").order_by("-pk").first()
+        if order is None:
+            raise CommandError("No work orders to request; seed some data first or pass --path.")
+        return [
+            "/",
+            f"/?q={order.customer.email}",
+            f"/workorder/{order.pk}/",
+            "/api/dashboard-summary/",
+            f"/api/workorders/{order.pk}/",
+        ]
+
+    def run_wsgi(self, paths, host, total, concurrency, threads):
+        handler = WSGIHandler()
+        for url in paths:
+            wsgi_get(handler, host, url, self.cookie)  # warm caches and connections
+
+        def one(i):
+            url = paths[i % len(paths)]
+            started = time.perf_counter()
+            # queued FIFO, like a listen backlog
+            status = server.submit(wsgi_get, handler, host, url, self.cookie).result()
+            return url, status, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as server, ThreadPoolExecutor(max_workers=concurrency) as clients:
+            results = list(clients.map(one, range(total)))
+        return results, time.perf_counter() - started
+
+    async def run_asgi(self, paths, host, total, concurrency):
+        handler = ASGIHandler()
+        for url in paths:
+            await asgi_get(handler, host, url, self.cookie)
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            url = paths[i % len(paths)]
+            async with slots:
+                started = time.perf_counter()
+                status = await asgi_get(handler, host, url, self.cookie)
+                return url, status, time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(total)))
+        return results, time.perf_counter() - started
+
+    def report(self, mode, run):
+        results, elapsed = run
+        by_path = defaultdict(list)
+        errors = 0
+        for url, status, duration in results:
+            by_path[url].append(duration)
+            errors += status >= 400
+
+        self.stdout.write(f"\n{mode.upper()}: {len(results) / elapsed:.0f} req/s, {errors} error(s)")
+        self.stdout.write(f"  {'endpoint':<45} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for url, samples in [*by_path.items(), ("all", [duration for _, _, duration in results])]:
+            p50, p95, p99 = (percentile(samples, pct) * 1000 for pct in (50, 95, 99))
+            self.stdout.write(f"  {url[:45]:<45} {p50:7.1f}ms {p95:7.1f}ms {p99:7.1f}ms")
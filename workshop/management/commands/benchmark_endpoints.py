@@ -0,0 +1,89 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from workshop import benchmarking
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, "benchmarks", "baseline.json")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the key endpoints (landing search, work order pages, API list/detail/search, dashboard) "
+        "and report req/s, p50/p95/p99 and SQL queries per request; save or compare against a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoint", action="append", choices=sorted(benchmarking.ENDPOINTS), default=[],
+            help="Limit to these endpoints (repeatable).",
+        )
+        parser.add_argument("--iterations", type=int, default=200, help="Requests per endpoint.")
+        parser.add_argument(
+            "--url", help="Load-test a running server at this base URL instead of using the test client.",
+        )
+        parser.add_argument("--concurrency", type=int, default=16, help="Connections with --url.")
+        parser.add_argument("--cold", action="store_true", help="Clear the cache before every request (test client).")
+        parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file.")
+        parser.add_argument("--save", action="store_true", help="Store this run as the baseline.")
+        parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 slowdown vs the baseline.")
+        parser.add_argument(
+            "--fail-on-regression", action="store_true", help="Exit with an error when the baseline comparison fails.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sample = benchmarking.Sample()
+        except ValueError as exc:
+            raise CommandError(exc)
+        names = options["endpoint"] or list(benchmarking.ENDPOINTS)
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+        mode = "http" if options["url"] else ("client-cold" if options["cold"] else "client")
+        cookie = benchmarking.staff_cookie()
+        if cookie is None and "dashboard_summary" in names:
+            self.stdout.write(self.style.WARNING(
+                "No staff user: dashboard_summary is staff only and will answer 403 (run createsuperuser)."
+            ))
+
+        results = {}
+        self.stdout.write(f"{'endpoint':<24} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8} {'errors':>7}")
+        for name in names:
+            urls = benchmarking.ENDPOINTS[name](sample)
+            if options["url"]:
+                result = benchmarking.run_http(
+                    options["url"], urls, options["iterations"], options["concurrency"], cookie=cookie,
+                )
+            else:
+                result = benchmarking.run_client(
+                    urls, options["iterations"], host, cold=options["cold"], cookie=cookie,
+                )
+            results[name] = result
+            queries = "-" if result["queries"] is None else result["queries"]
+            self.stdout.write(
+                f"{name:<24} {result['rps']:>8.1f} {result['p50_ms']:>7.1f}ms {result['p95_ms']:>7.1f}ms "
+                f"{result['p99_ms']:>7.1f}ms {queries:>8} {result['errors']:>7}"
+            )
+
+        path = options["baseline"]
+        if options["save"]:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            benchmarking.save_baseline(path, benchmarking.baseline_document(results, mode))
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {path}."))
+            return
+        if not os.path.exists(path):
+            return
+
+        baseline = benchmarking.load_baseline(path)
+        if baseline.get("mode") != mode:
+            self.stdout.write(self.style.WARNING(
+                f"Not comparing: the baseline was recorded in {baseline.get('mode')} mode, this run is {mode}."
+            ))
+            return
+        problems = benchmarking.regressions(results, baseline, options["tolerance"])
+        for problem in problems:
+            self.stdout.write(self.style.ERROR(f"Regression: {problem}"))
+        if not problems:
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {path} ({baseline['created']})."))
+        elif options["fail_on_regression"]:
+            raise CommandError(f"{len(problems)} regression(s) against the baseline.")
@@ -0,0 +1,119 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from workshop.models import Customer, WorkOrder
+from workshop.utils import normalize_phone
+from workshop.views import customer_lookup
+
+
+def legacy_results(q):
+    """The substring search landing() used before the normalized lookup columns."""
+    normalized_phone = normalize_phone(q)
+    phone_variants = [q]
+    if normalized_phone:
+        phone_variants.append(normalized_phone)
+    if q.startswith("+251") and len(q) == 13:
+        phone_variants.append("0" + q[4:])
+
+    phone_filter = Q()
+    for p in phone_variants:
+        phone_filter |= Q(customer__phone_number__icontains=p)
+    return (
+        WorkOrder.objects.select_related("customer", "technician")
+        .filter(Q(customer__email__icontains=q) | phone_filter)
+        .order_by("-created_at")
+    )
+
+
+def indexed_results(q):
+    customers = Customer.objects.filter(customer_lookup(q)).values("pk")
+    return (
+        WorkOrder.objects.select_related("customer", "technician")
+        .filter(customer__in=customers)
+        .order_by("-created_at")
+    )
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = "Compare landing page search latency: legacy substring scan vs normalized lookup columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Insert this many synthetic customers (one work order each) before measuring.",
+        )
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--skip-legacy", action="store_true", help="Only time the indexed search.")
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            self.seed(options["seed"])
+
+        sample = list(
+            Customer.objects.exclude(phone_number=None)
+            .order_by("?")
+            .values_list("email", "phone_number")[: options["queries"]]
+        )
+        if not sample:
+            raise CommandError("No customers to search for; run with --seed N first.")
+
+        queries = []
+        for email, phone in sample:
+            digits = "".join(ch for ch in phone if ch.isdigit())
+            queries.append(random.choice([email, email.split("@")[0], phone, "0" + digits[-9:], "+251" + digits[-9:]]))
+
+        variants = [("indexed", indexed_results)]
+        if not options["skip_legacy"]:
+            variants.insert(0, ("legacy", legacy_results))
+
+        self.stdout.write(f"{Customer.objects.count()} customers, {len(queries)} queries")
+        for label, build in variants:
+            timings = []
+            for q in queries:
+                started = time.perf_counter()
+                list(build(q))
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f"{label:>8}: p50 {statistics.median(timings):8.2f} ms  "
+                f"p95 {percentile(timings, 95):8.2f} ms  p99 {percentile(timings, 99):8.2f} ms"
+            )
+
+    def seed(self, count, batch_size=5000):
+        start = Customer.objects.count()
+        created = 0
+        while created < count:
+            size = min(batch_size, count - created)
+            customers = []
+            for i in range(start + created, start + created + size):
+                customer = Customer(
+                    first_name=f"Bench{i}",
+                    last_name="Customer",
+                    email=f"bench.customer{i}@example.com",
+                    phone_number=f"09{random.randint(0, 99_999_999):08d}",
+                )
+                customer.set_lookup_fields()
+                customers.append(customer)
+            with transaction.atomic():
+                customers = Customer.objects.bulk_create(customers)
+                WorkOrder.objects.bulk_create(
+                    WorkOrder(
+                        customer=customer,
+                        product_brand="Samsung",
+                        product_model="Galaxy",
+                        issue_description="Cracked screen",
+                        work_order_number=f"BENCH-{customer.pk}",
+                    )
+                    for customer in customers
+                )
+            created += size
+            self.stdout.write(f"Seeded {created}/{count} customers")
@@ -0,0 +1,61 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from workshop.models import WorkOrderSequence, format_work_order_number
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer the work order number allocator from several threads and check "
+        "that no number is handed out twice."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--per-thread", type=int, default=200, help="Allocations per thread.")
+        parser.add_argument("--block-size", type=int, default=1, help="Numbers reserved per allocation.")
+        parser.add_argument(
+            "--year", type=int, default=1999,
+            help="Sequence year to use; defaults to a past year so live numbering is untouched.",
+        )
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        per_thread = options["per_thread"]
+        block_size = options["block_size"]
+        year = options["year"]
+
+        if WorkOrderSequence.objects.filter(year=year).exists():
+            raise CommandError(f"A sequence for {year} already exists; pick an unused --year.")
+
+        def worker(_):
+            numbers = []
+            try:
+                for _ in range(per_thread):
+                    numbers.extend(WorkOrderSequence.allocate(year, count=block_size))
+            finally:
+                connection.close()
+            return numbers
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                results = list(pool.map(worker, range(threads)))
+            elapsed = time.perf_counter() - started
+        finally:
+            WorkOrderSequence.objects.filter(year=year).delete()
+
+        allocated = [format_work_order_number(year, n) for numbers in results for n in numbers]
+        collisions = sum(c - 1 for c in Counter(allocated).values() if c > 1)
+        calls = threads * per_thread
+
+        self.stdout.write(f"Backend:      {connection.vendor}")
+        self.stdout.write(f"Allocations:  {calls} calls, {len(allocated)} numbers in {elapsed:.2f}s")
+        self.stdout.write(f"Throughput:   {calls / elapsed:.0f} calls/s, {len(allocated) / elapsed:.0f} numbers/s")
+        if collisions:
+            raise CommandError(f"{collisions} duplicate work order number(s) handed out.")
+        self.stdout.write(self.style.SUCCESS("Collisions:   0"))
@@ -0,0 +1,101 @@
+import io
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.handlers.wsgi import LimitedStream
+from django.test import RequestFactory
+from PIL import Image
+
+from workshop.models import Customer, WorkOrder
+from workshop.views import ProductImageViewSet
+
+
+class BodyStream(io.RawIOBase):
+    """Request body read lazily from a buffer, like a socket would deliver it."""
+
+    def __init__(self, view):
+        self.view = view
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), len(self.view) - self.position)
+        buffer[:size] = self.view[self.position:self.position + size]
+        self.position += size
+        return size
+
+
+class Command(BaseCommand):
+    help = (
+        "Push large images through the chunked upload endpoint and report the "
+        "worker's peak Python memory per upload size (it should stay flat)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size-mb", type=int, action="append", default=[], help="Upload size; repeatable.")
+        parser.add_argument("--chunk-mb", type=int, default=5)
+
+    def handle(self, *args, **options):
+        sizes = options["size_mb"] or [10, 50]
+        chunk = options["chunk_mb"] * 1024 * 1024
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+        factory = RequestFactory(SERVER_NAME=host)
+        start = ProductImageViewSet.as_view({"post": "start_upload"})
+        send = ProductImageViewSet.as_view({"patch": "upload"})
+
+        customer = Customer.objects.create(
+            first_name="Upload", last_name="Benchmark", email=f"upload-benchmark-{time.time_ns()}@example.com"
+        )
+        workorder = WorkOrder.objects.create(
+            customer=customer, product_brand="Bench", product_model="Upload", issue_description="benchmark"
+        )
+        try:
+            for size_mb in sizes:
+                # an uncompressed BMP of about size_mb, built before measuring
+                side = int((size_mb * 1024 * 1024 / 3) ** 0.5)
+                buffer = io.BytesIO()
+                Image.new("RGB", (side, side), (90, 90, 90)).save(buffer, "BMP")
+                body = buffer.getbuffer()
+
+                response = start(factory.post(
+                    "/api/images/uploads/",
+                    {"work_order": workorder.pk, "filename": "bench.bmp", "size": len(body)},
+                    content_type="application/json",
+                ))
+                upload_id = response.data["id"]
+
+                tracemalloc.start()
+                started = time.perf_counter()
+                offset = 0
+                while offset < len(body):
+                    length = min(chunk, len(body) - offset)
+                    request = factory.generic(
+                        "PATCH", f"/api/images/uploads/{upload_id}/",
+                        content_type="application/offset+octet-stream",
+                        HTTP_UPLOAD_OFFSET=str(offset),
+                    )
+                    request.META["CONTENT_LENGTH"] = str(length)
+                    request._stream = LimitedStream(io.BufferedReader(BodyStream(body[offset:offset + length])), length)
+                    response = send(request, upload_id=upload_id)
+                    offset = int(response["Upload-Offset"])
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                status = response.data["status"]
+                self.stdout.write(
+                    f"{len(body) / 1024 / 1024:6.1f} MB in {options['chunk_mb']} MB chunks: {status}, "
+                    f"{elapsed:.2f}s, peak memory allocated while uploading {peak / 1024:.0f} KB"
+                )
+                body.release()
+        finally:
+            for image in workorder.images.all():
+                for field in (image.image, image.thumbnail, image.display):
+                    if field:
+                        field.delete(save=False)
+            workorder.delete()
+            customer.delete()
@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from workshop.sla import evaluate
+
+
+class Command(BaseCommand):
+    help = (
+        "Mark open work orders that are past their estimated completion date as overdue, unmark the ones "
+        "whose date moved, and email one digest of the newly overdue orders. Run it from cron, or with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep evaluating every --interval seconds.")
+        parser.add_argument(
+            "--interval", type=float, default=None, help="Seconds between runs; defaults to SLA_EVALUATION_INTERVAL."
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--no-alerts", action="store_true", help="Do not email anyone (e.g. when first marking a backlog)."
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"] or getattr(settings, "SLA_EVALUATION_INTERVAL", 300)
+        while True:
+            close_old_connections()
+            counts = evaluate(batch_size=options["batch_size"], alert=not options["no_alerts"])
+            self.stdout.write(", ".join(f"{name}: {count}" for name, count in counts.items()))
+            if not options["loop"]:
+                return
+            time.sleep(interval)
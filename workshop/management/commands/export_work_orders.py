@@ -0,0 +1,40 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from workshop.exporting import EXPORT_FORMATS, stream_work_orders
+from workshop.models import WorkOrder
+from workshop.routers import replica_reads
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream every work order to a CSV or NDJSON file that import_work_orders can read back "
+        "(from a read replica when one is configured)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="-", help="File to write, or - for stdout (default).")
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per database round trip.")
+        parser.add_argument("--active-only", action="store_true", help="Skip soft-deleted work orders.")
+
+    def handle(self, *args, **options):
+        queryset = WorkOrder.objects.order_by("pk")
+        if options["active_only"]:
+            queryset = queryset.filter(is_active=True)
+
+        path = options["path"]
+        output = sys.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+        started = time.perf_counter()
+        with replica_reads():
+            try:
+                for chunk in stream_work_orders(queryset, options["format"], options["chunk_size"]):
+                    output.write(chunk)
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+            rows = queryset.count()
+        elapsed = time.perf_counter() - started
+        self.stderr.write(f"Exported {rows} work order(s) in {elapsed:.1f}s ({rows / (elapsed or 1):.0f} rows/s).")
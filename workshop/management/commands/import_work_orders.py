@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from workshop.importing import IMPORT_FORMATS, RowError, WorkOrderImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import customers and work orders from a CSV or NDJSON file (the export_work_orders columns)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, or - for stdin.")
+        parser.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk insert / transaction.")
+        parser.add_argument("--max-errors", type=int, default=100, help="Give up after this many bad rows.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["format"] or os.path.splitext(path)[1].lstrip(".").lower()
+        if import_format == "jsonl":
+            import_format = "ndjson"
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError(f"Pass --format ({', '.join(IMPORT_FORMATS)}).")
+
+        started = time.perf_counter()
+
+        def progress(counts):
+            elapsed = time.perf_counter() - started
+            rate = counts["imported"] / elapsed if elapsed else 0
+            self.stderr.write(f"{counts['imported']} imported ({rate:.0f} rows/s)", ending="\r")
+
+        def on_error(line, message):
+            self.stderr.write(f"row {line}: {message}")
+
+        importer = WorkOrderImporter(options["batch_size"], options["max_errors"], on_error)
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        try:
+            counts = importer.run(read_rows(stream, import_format), progress=progress)
+        except (RowError, ValueError) as exc:
+            raise CommandError(f"{exc} ({importer.counts['imported']} rows were committed before this.)")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write("")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {counts['imported']} work order(s) and {counts['customers']} new customer(s) "
+            f"in {elapsed:.1f}s ({counts['imported'] / elapsed:.0f} rows/s); "
+            f"{counts['skipped']} already present, {counts['errors']} rejected."
+        ))
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from workshop import cutover
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy every table to the target database (DB_TARGET_*) in resumable chunks, then verify checksums. "
+        "Run it while the site is up (with DUAL_WRITE on); run it again with --repair just before switching."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=cutover.TARGET, help="Target alias (default: target).")
+        parser.add_argument("--source", default=DEFAULT_DB_ALIAS, help="Source alias (default: default).")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per chunk and transaction.")
+        parser.add_argument("--reset", action="store_true", help="Empty the target tables and start over.")
+        parser.add_argument("--verify-only", action="store_true", help="Compare the databases without copying.")
+        parser.add_argument("--skip-verify", action="store_true", help="Copy without comparing afterwards.")
+        parser.add_argument("--repair", action="store_true", help="Re-copy chunks whose checksums differ.")
+        parser.add_argument(
+            "--reset-sequences", action="store_true",
+            help="Only move the target's id sequences past its rows; run once the old site has stopped writing.",
+        )
+
+    def handle(self, *args, **options):
+        using, source = options["database"], options["source"]
+        for alias in (using, source):
+            if alias not in connections.settings:
+                raise CommandError(f"No database alias {alias!r}; set DB_TARGET_NAME (and DB_TARGET_*).")
+        tables = set(connections[using].introspection.table_names())
+        missing = [model._meta.db_table for model in cutover.copied_models() if model._meta.db_table not in tables]
+        if missing:
+            raise CommandError(
+                f"{len(missing)} table(s) missing in {using!r} ({', '.join(missing[:3])}, ...); "
+                f"run manage.py migrate --database {using} first."
+            )
+
+        if options["reset_sequences"]:
+            count = cutover.reset_sequences(using)
+            self.stdout.write(self.style.SUCCESS(f"Reset {count} sequence(s) in {using!r}."))
+            return
+
+        if options["reset"]:
+            cutover.reset(using)
+            self.stdout.write(f"Emptied the tables in {using!r}.")
+
+        if not options["verify_only"]:
+            cutover.copy_all(using, source, options["batch_size"], progress=self.copied)
+
+        if options["skip_verify"]:
+            return
+        report = cutover.verify_all(using, source, options["batch_size"], repair=options["repair"])
+        differing = 0
+        for table, (source_rows, target_rows, chunks, repaired) in report.items():
+            if chunks:
+                self.stdout.write(
+                    f"{table}: {source_rows} source / {target_rows} target rows, "
+                    f"{chunks} chunk(s) differ, {repaired} repaired"
+                )
+                differing += chunks - repaired
+        if differing:
+            raise CommandError(f"{differing} chunk(s) differ; run again with --repair.")
+        self.stdout.write(self.style.SUCCESS(f"Verified {len(report)} table(s)."))
+
+    def copied(self, table, rows, elapsed):
+        if rows:
+            rate = f", {rows / elapsed:.0f} rows/s" if elapsed else ""
+            self.stdout.write(f"{table}: copied {rows} row(s){rate}")
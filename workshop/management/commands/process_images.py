@@ -0,0 +1,59 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from workshop.imaging import pending_images, process_batch
+from workshop.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = "Render thumbnails, display copies and placeholders for uploaded product images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process everything queued now and exit (backfill).")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Render in a pool of this many processes (0 = one per CPU).",
+        )
+        parser.add_argument("--retry-failed", action="store_true", help="Queue images that failed before.")
+        parser.add_argument("--reprocess", action="store_true", help="Queue every image again (e.g. new sizes).")
+
+    def handle(self, *args, **options):
+        if options["reprocess"]:
+            ProductImage.objects.update(processed_at=None, processing_error=None)
+        elif options["retry_failed"]:
+            ProductImage.objects.filter(processing_error__isnull=False).update(processed_at=None, processing_error=None)
+
+        self.stdout.write(f"{pending_images().count()} image(s) queued.")
+        workers = options["workers"] or os.cpu_count()
+        executor = None
+        if workers > 1:
+            # workers only run Pillow; don't hand them our database connections
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=workers)
+        batch_size = options["batch_size"] or (workers * 4 if executor else None)
+
+        try:
+            while True:
+                close_old_connections()
+                started = time.perf_counter()
+                counts = process_batch(batch_size, executor=executor)
+                if any(counts.values()):
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"[{timezone.now():%H:%M:%S}] processed: {counts['processed']}, "
+                        f"failed: {counts['failed']} ({elapsed:.1f}s)"
+                    )
+                    continue
+                if options["once"]:
+                    return
+                time.sleep(options["interval"])
+        finally:
+            if executor is not None:
+                executor.shutdown()
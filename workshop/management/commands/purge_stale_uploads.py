@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from workshop.uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete unfinished chunked uploads (and their partial files) that have been idle too long."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=None, help="Idle time; defaults to CHUNKED_UPLOAD_EXPIRY_HOURS.")
+
+    def handle(self, *args, **options):
+        count = purge_stale_uploads(options["hours"])
+        self.stdout.write(self.style.SUCCESS(f"Removed {count} stale upload(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from workshop.events import purge_events
+
+
+class Command(BaseCommand):
+    help = "Delete work order events (the live feed's log) older than the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Age to keep; defaults to EVENTS_RETENTION_DAYS.")
+
+    def handle(self, *args, **options):
+        count = purge_events(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Removed {count} event(s)."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from workshop.stats import rebuild_days
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily work order rollup behind the dashboard summary."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--day", action="append", default=[], help="Only rebuild this day (YYYY-MM-DD); repeatable.")
+
+    def handle(self, *args, **options):
+        days = [parse_date(day) for day in options["day"]] or None
+        count = rebuild_days(days)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} rollup row(s)."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from workshop.models import WorkOrder
+from workshop.search import get_backend, index_queryset
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search document of every work order."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--optimize", action="store_true", help="Merge FTS segments / VACUUM ANALYZE afterwards.")
+
+    def handle(self, *args, **options):
+        count = index_queryset(WorkOrder.objects.all(), batch_size=options["batch_size"])
+        if options["optimize"]:
+            get_backend().optimize()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} work order(s)."))
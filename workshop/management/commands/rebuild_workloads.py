@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from workshop.scheduling import rebuild_workloads
+
+
+class Command(BaseCommand):
+    help = "Recompute every technician's open job count used by automatic assignment."
+
+    def handle(self, *args, **options):
+        count = rebuild_workloads()
+        self.stdout.write(self.style.SUCCESS(f"Updated {count} technician(s)."))
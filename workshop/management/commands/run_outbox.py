@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from workshop.outbox import process_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued emails/SMS from the notification outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain what is due now and exit.")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            counts = process_batch(options["batch_size"])
+            if any(counts.values()):
+                self.stdout.write(", ".join(f"{name}: {count}" for name, count in counts.items()))
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from workshop.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed realistic synthetic data for load tests: customers with Ethiopian phone numbers in mixed "
+        "formats, technicians, work orders spread over several years and statuses, and product images."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=10000)
+        parser.add_argument("--customers", type=int, default=None, help="Distinct customers; defaults to orders / 3.")
+        parser.add_argument("--technicians", type=int, default=12)
+        parser.add_argument("--years", type=float, default=3, help="How far back created_at goes.")
+        parser.add_argument("--images", type=int, default=0, help="Product images to attach to seeded orders.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same data.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def progress(counts):
+            self.stderr.write(f"{counts['imported']}/{options['orders']} work orders", ending="\r")
+
+        counts = seed(
+            options["orders"],
+            options["customers"] or max(1, options["orders"] // 3),
+            options["technicians"],
+            years=options["years"],
+            images=options["images"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            progress=progress,
+        )
+        self.stderr.write("")
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {counts['imported']} work order(s), {counts['customers']} new customer(s), "
+            f"{counts['technicians']} technician(s) and {counts['images']} image(s) "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
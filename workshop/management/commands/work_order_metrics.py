@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from workshop.transitions import transition_metrics
+
+
+def month(value):
+    """YYYY-MM -> YYYYMM"""
+    year, _, number = value.partition("-")
+    if not (year.isdigit() and number.isdigit() and 1 <= int(number) <= 12):
+        raise CommandError(f"Expected a month as YYYY-MM, got {value!r}.")
+    return int(year) * 100 + int(number)
+
+
+class Command(BaseCommand):
+    help = (
+        "Turnaround time (first status to completed) and time spent in each status, "
+        "computed in one pass over the work order history."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="First month to read (YYYY-MM).")
+        parser.add_argument("--until", help="Last month to read (YYYY-MM).")
+        parser.add_argument("--json", action="store_true", help="Print the result as JSON.")
+
+    def handle(self, *args, **options):
+        since = month(options["since"]) if options["since"] else None
+        until = month(options["until"]) if options["until"] else None
+        result = transition_metrics(since, until)
+        if options["json"]:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+
+        self.stdout.write(f"{result['transitions']} status transitions, {result['work_orders']} work orders")
+        self.stdout.write(f"  {'':<14} {'count':>7} {'mean':>9} {'p50':>9} {'p90':>9}")
+        rows = [("turnaround", result["turnaround"]), *result["time_in_status"].items()]
+        for name, hours in rows:
+            if not hours["count"]:
+                self.stdout.write(f"  {name:<14} {0:>7}")
+                continue
+            self.stdout.write(
+                f"  {name:<14} {hours['count']:>7} {hours['mean_hours']:>8.1f}h "
+                f"{hours['p50_hours']:>8.1f}h {hours['p90_hours']:>8.1f}h"
+            )
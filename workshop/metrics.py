@@ -0,0 +1,172 @@
+# workshop/metrics.py
+"""
+Per-view request metrics: request count, total time, DB query count/time and
+template render time, collected by ``RequestMetricsMiddleware`` and exposed in
+Prometheus text format by ``views.metrics``.
+
+Numbers are kept in memory per process; with several gunicorn workers each
+scrape sees the worker that answered it, so aggregate with ``sum by (view)``.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates, Template
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stats of the request being handled on this thread / task, if it is sampled
+current_request = ContextVar("workshop_request_stats", default=None)
+
+
+class RequestStats:
+    """Counters for one request; also used as a DB execute wrapper."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+def record_query(execute, sql, params, many, context):
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # installed on every connection rather than per request, so queries count
+    # in whichever thread runs them (async views use worker threads)
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class _ViewMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.statuses = {}
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._cache = {}
+
+    def record(self, view, method, status, duration, stats):
+        with self._lock:
+            metrics = self._views.get((view, method))
+            if metrics is None:
+                metrics = self._views[(view, method)] = _ViewMetrics()
+            metrics.requests += 1
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            metrics.buckets[bisect_left(DURATION_BUCKETS, duration)] += 1
+            metrics.duration += duration
+            metrics.queries += stats.queries
+            metrics.db_time += stats.db_time
+            metrics.template_time += stats.template_time
+
+    def record_cache(self, name, hit):
+        key = (name, "hit" if hit else "miss")
+        with self._lock:
+            self._cache[key] = self._cache.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+            self._cache = {}
+
+    def render_prometheus(self, sample_rate=1.0):
+        with self._lock:
+            views = sorted(self._views.items())
+            lines = [
+                "# HELP workshop_metrics_sample_rate Fraction of requests that are measured.",
+                "# TYPE workshop_metrics_sample_rate gauge",
+                f"workshop_metrics_sample_rate {sample_rate}",
+                "# HELP workshop_http_requests_total Measured requests by view, method and status.",
+                "# TYPE workshop_http_requests_total counter",
+            ]
+            for (view, method), m in views:
+                for status, count in sorted(m.statuses.items()):
+                    lines.append(
+                        f'workshop_http_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}'
+                    )
+
+            lines += [
+                "# HELP workshop_http_request_duration_seconds Time spent producing the response.",
+                "# TYPE workshop_http_request_duration_seconds histogram",
+            ]
+            for (view, method), m in views:
+                labels = f'view="{view}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS, m.buckets):
+                    cumulative += count
+                    lines.append(f'workshop_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'workshop_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {m.requests}')
+                lines.append(f"workshop_http_request_duration_seconds_sum{{{labels}}} {m.duration:.6f}")
+                lines.append(f"workshop_http_request_duration_seconds_count{{{labels}}} {m.requests}")
+
+            for name, attr, help_text in (
+                ("workshop_db_queries_total", "queries", "SQL queries executed."),
+                ("workshop_db_query_seconds_total", "db_time", "Time spent in SQL queries."),
+                ("workshop_template_render_seconds_total", "template_time", "Time spent rendering templates."),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (view, method), m in views:
+                    value = getattr(m, attr)
+                    value = f"{value:.6f}" if isinstance(value, float) else value
+                    lines.append(f'{name}{{view="{view}",method="{method}"}} {value}')
+
+            lines += [
+                "# HELP workshop_cache_requests_total Cache lookups by cache name and result (hit/miss).",
+                "# TYPE workshop_cache_requests_total counter",
+            ]
+            for (name, result), count in sorted(self._cache.items()):
+                lines.append(f'workshop_cache_requests_total{{cache="{name}",result="{result}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+# ─────────────────────────────
+# Template render timing
+# ─────────────────────────────
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = current_request.get()
+        if stats is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django template backend that adds render time to the current request's metrics."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,164 @@
+# workshop/middleware.py
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics, routers, transitions
+
+
+class RequestMetricsMiddleware:
+    """
+    Record query count, DB time, template render time and total time per view
+    (tagged by the resolved URL name, e.g. ``workshop:landing``).
+
+    ``METRICS_SAMPLE_RATE`` controls the fraction of requests measured;
+    unsampled requests pay only for one ``random()`` call. With
+    ``METRICS_SERVER_TIMING`` on, sampled responses carry a ``Server-Timing``
+    header for the browser's network panel.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "METRICS_SAMPLE_RATE", 1.0)
+        self.server_timing = getattr(settings, "METRICS_SERVER_TIMING", False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        return self.sample_rate >= 1 or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)  # queries are counted by metrics.record_query
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - started)
+
+    def finish(self, request, response, stats, duration):
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name if match else None) or "<unresolved>"
+        metrics.registry.record(view, request.method, response.status_code, duration, stats)
+
+        if self.server_timing:
+            response["Server-Timing"] = (
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+                f"tpl;dur={stats.template_time * 1000:.1f}, "
+                f"total;dur={duration * 1000:.1f}"
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Send the reads of GET/HEAD requests to a read replica (see workshop.routers).
+    A request that writes is pinned to the primary for the rest of the request,
+    and the client gets a cookie keeping it on the primary for
+    ``DB_REPLICA_PIN_SECONDS`` so it does not read stale rows from a lagging replica.
+    Does nothing when no replicas are configured.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+    cookie_name = "db_primary"
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, "DB_REPLICA_PIN_SECONDS", 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not routers.replicas():
+            return self.get_response(request)
+
+        with routers.replica_reads(pinned=self.pinned(request)) as scope:
+            response = self.get_response(request)
+        return self.finish(scope, response)
+
+    async def __acall__(self, request):
+        if not routers.replicas():
+            return await self.get_response(request)
+
+        # the scope is a context variable, so sync_to_async threads see it too
+        with routers.replica_reads(pinned=self.pinned(request)) as scope:
+            response = await self.get_response(request)
+        return self.finish(scope, response)
+
+    def pinned(self, request):
+        return request.method not in self.SAFE_METHODS or self.cookie_name in request.COOKIES
+
+    def finish(self, scope, response):
+        if scope.wrote:
+            response.set_cookie(self.cookie_name, "1", max_age=self.pin_seconds, httponly=True, samesite="Lax")
+        elif response.streaming and not response.is_async and not scope.pinned:
+            # streamed bodies (exports) are read after this returns; keep them on the replica.
+            # Async streams carry their own context (see asyncdb.aiterate; the events feed reads the primary).
+            response.streaming_content = self.stream_from_replica(response.streaming_content)
+        return response
+
+    @staticmethod
+    def stream_from_replica(content):
+        with routers.replica_reads():
+            yield from content
+
+
+class TransitionActorMiddleware:
+    """
+    Expose the request to the work order history receivers, which record
+    whether a change came from the site, the API or the admin, and by whom
+    (see workshop.transitions).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = transitions.current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            transitions.current_request.reset(token)
+
+    async def __acall__(self, request):
+        token = transitions.current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            transitions.current_request.reset(token)
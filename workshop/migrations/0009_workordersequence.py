@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workshop", "0008_remoterequest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkOrderSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField(unique=True)),
+                ("last_number", models.PositiveIntegerField(default=1000)),
+            ],
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workshop", "0009_workordersequence"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(fields=["phone_number"], name="customer_phone_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="remoterequest",
+            index=models.Index(
+                fields=["status", "-created_at"], name="remotereq_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="remoterequest",
+            index=models.Index(fields=["-created_at"], name="remotereq_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="workorder",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["-created_at"],
+                name="wo_active_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workorder",
+            index=models.Index(
+                fields=["status", "estimated_completion_date"], name="wo_status_due_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workshop", "0010_workshop_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customer",
+            name="email_normalized",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=254, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="phone_normalized",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=20, null=True
+            ),
+        ),
+    ]
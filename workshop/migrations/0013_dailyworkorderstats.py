@@ -0,0 +1,72 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:18
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def build_stats(apps, schema_editor):
+    WorkOrder = apps.get_model("workshop", "WorkOrder")
+    DailyWorkOrderStats = apps.get_model("workshop", "DailyWorkOrderStats")
+    db_alias = schema_editor.connection.alias
+    rows = (
+        WorkOrder.objects.using(db_alias).annotate(day=TruncDate("created_at"))
+        .order_by()
+        .values("day", "status", "technician_id")
+        .annotate(order_count=Count("id"), revenue=Sum("total_cost"))
+    )
+    DailyWorkOrderStats.objects.using(db_alias).bulk_create(
+        (
+            DailyWorkOrderStats(
+                day=row["day"],
+                status=row["status"],
+                technician_id=row["technician_id"] or 0,
+                order_count=row["order_count"],
+                revenue=row["revenue"] or 0,
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workshop", "0012_outboundmessage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyWorkOrderStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("status", models.CharField(max_length=50)),
+                ("technician_id", models.BigIntegerField(default=0)),
+                ("order_count", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "daily work order stats",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "status", "technician_id"),
+                        name="daily_stats_bucket_uniq",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
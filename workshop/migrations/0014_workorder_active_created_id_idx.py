@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workshop", "0013_dailyworkorderstats"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="workorder",
+            name="wo_active_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="workorder",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["-created_at", "-id"],
+                name="wo_active_created_idx",
+            ),
+        ),
+    ]
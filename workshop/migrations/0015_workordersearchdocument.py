@@ -0,0 +1,140 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:26
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE workshop_workorder_fts USING fts5("
+    "document, content='workshop_workordersearchdocument', content_rowid='work_order_id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER workshop_search_ai AFTER INSERT ON workshop_workordersearchdocument BEGIN "
+    "INSERT INTO workshop_workorder_fts(rowid, document) VALUES (new.work_order_id, new.document); END",
+    "CREATE TRIGGER workshop_search_ad AFTER DELETE ON workshop_workordersearchdocument BEGIN "
+    "INSERT INTO workshop_workorder_fts(workshop_workorder_fts, rowid, document) "
+    "VALUES ('delete', old.work_order_id, old.document); END",
+    "CREATE TRIGGER workshop_search_au AFTER UPDATE ON workshop_workordersearchdocument BEGIN "
+    "INSERT INTO workshop_workorder_fts(workshop_workorder_fts, rowid, document) "
+    "VALUES ('delete', old.work_order_id, old.document); "
+    "INSERT INTO workshop_workorder_fts(rowid, document) VALUES (new.work_order_id, new.document); END",
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS workshop_search_ai",
+    "DROP TRIGGER IF EXISTS workshop_search_ad",
+    "DROP TRIGGER IF EXISTS workshop_search_au",
+    "DROP TABLE IF EXISTS workshop_workorder_fts",
+]
+POSTGRES_FORWARD = [
+    "ALTER TABLE workshop_workordersearchdocument ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', document)) STORED",
+    "CREATE INDEX workshop_search_vector_gin ON workshop_workordersearchdocument USING GIN (search_vector)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS workshop_search_vector_gin",
+    "ALTER TABLE workshop_workordersearchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD})
+
+
+def drop_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE})
+
+
+# Frozen copy of the document format at the time of this migration (workshop.search
+# may change later; rebuild_search_index brings old documents up to date)
+DOCUMENT_FIELDS = (
+    "work_order_number",
+    "customer__first_name",
+    "customer__last_name",
+    "customer__email",
+    "customer__phone_number",
+    "technician__first_name",
+    "technician__last_name",
+    "product_type",
+    "product_brand",
+    "product_model",
+    "serial_number",
+    "issue_description",
+)
+TERM_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_phone(phone):
+    if not phone:
+        return ""
+    digits = re.sub(r"\D", "", phone)
+    if digits.startswith("0"):
+        return "+251" + digits[1:]
+    elif digits.startswith("251"):
+        return "+" + digits
+    elif digits.startswith("9") and len(digits) == 9:
+        return "+251" + digits
+    return phone
+
+
+def phone_terms(phone):
+    normalized = normalize_phone(phone or "")
+    digits = re.sub(r"\D", "", normalized)
+    if not digits:
+        return []
+    terms = [digits]
+    if normalized.lstrip().startswith("+") and digits.startswith("251"):
+        terms += ["0" + digits[3:], digits[3:]]
+    return terms
+
+
+def document_text(values):
+    row = dict(zip(DOCUMENT_FIELDS, values))
+    text = " ".join(str(value) for value in values if value)
+    return " ".join(TERM_RE.findall(text.lower()) + phone_terms(row["customer__phone_number"]))
+
+
+def build_documents(apps, schema_editor):
+    WorkOrder = apps.get_model("workshop", "WorkOrder")
+    WorkOrderSearchDocument = apps.get_model("workshop", "WorkOrderSearchDocument")
+    db_alias = schema_editor.connection.alias
+    rows = WorkOrder.objects.using(db_alias).order_by().values_list("pk", *DOCUMENT_FIELDS)
+    batch = []
+    for pk, *values in rows.iterator(chunk_size=2000):
+        batch.append(WorkOrderSearchDocument(work_order_id=pk, document=document_text(values)))
+        if len(batch) == 2000:
+            WorkOrderSearchDocument.objects.using(db_alias).bulk_create(batch)
+            batch = []
+    WorkOrderSearchDocument.objects.using(db_alias).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workshop", "0014_workorder_active_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkOrderSearchDocument",
+            fields=[
+                (
+                    "work_order",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="workshop.workorder",
+                    ),
+                ),
+                ("document", models.TextField()),
+            ],
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workshop", "0017_chunkedupload"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customer",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="technician",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
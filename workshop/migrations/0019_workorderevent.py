@@ -0,0 +1,63 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workshop", "0018_customer_technician_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkOrderEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("work_order_number", models.CharField(max_length=50)),
+                ("customer_id", models.BigIntegerField()),
+                ("technician_id", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("status", "Status changed"),
+                            ("assignment", "Technician changed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("old_value", models.CharField(blank=True, default="", max_length=50)),
+                ("new_value", models.CharField(blank=True, default="", max_length=50)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "work_order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="events",
+                        to="workshop.workorder",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["customer_id", "id"], name="workorderevent_customer_idx"
+                    ),
+                    models.Index(
+                        fields=["technician_id", "id"], name="workorderevent_tech_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:11
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_open_jobs(apps, schema_editor):
+    WorkOrder = apps.get_model("workshop", "WorkOrder")
+    Technician = apps.get_model("workshop", "Technician")
+    db_alias = schema_editor.connection.alias
+    open_orders = (
+        WorkOrder.objects.using(db_alias)
+        .filter(technician=OuterRef("pk"), is_active=True, status__in=["pending", "in_progress"])
+        .order_by()
+        .values("technician")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Technician.objects.using(db_alias).update(open_jobs=Coalesce(Subquery(open_orders), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workshop", "0019_workorderevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="technician",
+            name="open_jobs",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_open_jobs, migrations.RunPython.noop),
+    ]
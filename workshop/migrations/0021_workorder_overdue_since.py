@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workshop", "0020_technician_open_jobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="technician",
+            name="overdue_jobs",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="workorder",
+            name="overdue_since",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="workorder",
+            index=models.Index(
+                fields=["status", "overdue_since"], name="wo_status_overdue_idx"
+            ),
+        ),
+    ]
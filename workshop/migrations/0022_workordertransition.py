@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workshop", "0021_workorder_overdue_since"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkOrderTransition",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("month", models.PositiveIntegerField()),
+                ("work_order_id", models.BigIntegerField()),
+                (
+                    "field",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (1, "status"),
+                            (2, "technician"),
+                            (3, "estimated_cost"),
+                            (4, "total_cost"),
+                            (5, "customer_collected"),
+                        ]
+                    ),
+                ),
+                ("old_value", models.BigIntegerField(blank=True, null=True)),
+                ("new_value", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "actor",
+                    models.PositiveSmallIntegerField(
+                        choices=[(0, "system"), (1, "web"), (2, "api"), (3, "admin")],
+                        default=0,
+                    ),
+                ),
+                ("user_id", models.IntegerField(blank=True, null=True)),
+                ("at", models.DateTimeField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["work_order_id", "id"], name="wotransition_order_idx"
+                    ),
+                    models.Index(fields=["month", "id"], name="wotransition_month_idx"),
+                ],
+            },
+        ),
+    ]
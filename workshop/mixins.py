@@ -0,0 +1,84 @@
+# workshop/mixins.py
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class EagerLoadingMixin:
+    """
+    Viewset mixin that applies the serializer's eager-loading needs to the queryset.
+
+    A serializer declares what its nested fields read by defining
+    ``setup_eager_loading(queryset)``; every viewset using it then gets the
+    matching select_related/prefetch_related without repeating it.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        setup_eager_loading = getattr(self.get_serializer_class(), "setup_eager_loading", None)
+        if setup_eager_loading is not None:
+            queryset = setup_eager_loading(queryset)
+        return queryset
+
+
+class ConditionalRequestMixin:
+    """
+    Strong ``ETag`` and ``Last-Modified`` on list/detail responses, 304 for a
+    matching ``If-None-Match`` / ``If-Modified-Since``, and 412 for a stale
+    ``If-Match`` / ``If-Unmodified-Since`` on PUT, PATCH and DELETE.
+
+    Validators come from one aggregate query (row count plus the max of every
+    lookup in ``conditional_timestamps``), so an unchanged resource is answered
+    without loading or serializing rows. List the timestamps of the to-one
+    relations the serializer nests; to-many children should bump their
+    parent's ``updated_at`` instead (joining them would multiply the rows).
+    """
+
+    conditional_timestamps = ("updated_at",)
+
+    def get_validators(self, queryset):
+        aggregates = {"count_pk": Count("pk")}
+        aggregates.update({f"max_{name}": Max(name) for name in self.conditional_timestamps})
+        values = queryset.order_by().aggregate(**aggregates)
+        renderer = getattr(self.request, "accepted_renderer", None)
+        fingerprint = (sorted(values.items()), self.request.get_full_path(), getattr(renderer, "format", None))
+        etag = f'"{hashlib.sha1(repr(fingerprint).encode()).hexdigest()}"'
+        stamps = [values[f"max_{name}"] for name in self.conditional_timestamps if values[f"max_{name}"]]
+        return values["count_pk"], etag, max(stamps) if stamps else None
+
+    def _object_queryset(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+
+    def _conditional(self, queryset, handler, *args, **kwargs):
+        count, etag, last_modified = self.get_validators(queryset)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        if count:  # nothing matched: let the handler answer (404 / empty list)
+            precondition = get_conditional_response(self.request, etag=etag, last_modified=timestamp)
+            if precondition is not None:
+                return precondition
+        response = handler(*args, **kwargs)
+        if self.request.method not in ("GET", "HEAD") and 200 <= response.status_code < 300:
+            count, etag, last_modified = self.get_validators(queryset)  # describe what was just written
+        if count and 200 <= response.status_code < 300 and response.status_code != 204:
+            response["ETag"] = etag
+            if last_modified:
+                response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._conditional(queryset, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(self._object_queryset(), super().retrieve, request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        return self._conditional(self._object_queryset(), super().update, request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        return self._conditional(self._object_queryset(), super().destroy, request, *args, **kwargs)
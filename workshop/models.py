@@ -1,9 +1,16 @@
-from django.db import models
+import os
+import uuid
+
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 from django.conf import settings
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 
+from .tracking import TrackedFieldsMixin
+from .utils import phone_lookup_key
+
 
 # ─────────────────────────────
 # Customer
@@ -13,10 +20,33 @@ class Customer(models.Model):
     last_name = models.CharField(max_length=30)
     email = models.EmailField(unique=True)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
+    # Lookup keys for the landing page search, kept in sync by save()
+    phone_normalized = models.CharField(max_length=20, blank=True, null=True, editable=False, db_index=True)
+    email_normalized = models.CharField(max_length=254, blank=True, null=True, editable=False, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["phone_number"], name="customer_phone_idx"),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    def set_lookup_fields(self):
+        self.phone_normalized = phone_lookup_key(self.phone_number) or None
+        self.email_normalized = self.email.strip().lower() if self.email else None
+
+    def save(self, *args, **kwargs):
+        self.set_lookup_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            extra = {"updated_at"}  # auto_now is only written when listed
+            if {"phone_number", "email"} & set(update_fields):
+                extra |= {"phone_normalized", "email_normalized"}
+            kwargs["update_fields"] = set(update_fields) | extra
+        super().save(*args, **kwargs)
+
 
 # ─────────────────────────────
 # Technician
@@ -26,15 +56,189 @@ class Technician(models.Model):
     last_name = models.CharField(max_length=30)
     email = models.EmailField(unique=True)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # active pending / in-progress orders assigned here (and how many are overdue), kept current by workshop.scheduling
+    open_jobs = models.PositiveIntegerField(default=0, editable=False)
+    overdue_jobs = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
 
+# ─────────────────────────────
+# Work Order Number Sequence
+# ─────────────────────────────
+WORK_ORDER_NUMBER_START = 1000  # first number handed out is 1001
+WORK_ORDER_NUMBER_MAX = 9999
+
+
+def format_work_order_number(year, number):
+    # Pretty format: WOYYYY-#### (e.g., WO2025-1001)
+    return f"WO{year}-{number:04d}"
+
+
+class WorkOrderSequence(models.Model):
+    """
+    Per-year counter backing work order numbers.
+
+    Numbers are handed out with a single atomic ``UPDATE ... SET last_number =
+    last_number + n``, which takes the row lock on PostgreSQL and the write
+    lock on SQLite, so concurrent workers never see the same value.
+    Numbers reserved by a transaction that rolls back are handed out again;
+    when the allocation commits on its own (outside an outer ``atomic()``)
+    they are simply skipped.
+    """
+    year = models.PositiveSmallIntegerField(unique=True)
+    last_number = models.PositiveIntegerField(default=WORK_ORDER_NUMBER_START)
+
+    def __str__(self):
+        return f"{self.year}: {self.last_number}"
+
+    @classmethod
+    def allocate(cls, year=None, count=1):
+        """
+        Reserve ``count`` consecutive numbers for ``year`` and return them as a list.
+        Bulk imports can pass a larger ``count`` to grab a block in one round trip.
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1.")
+        year = year or timezone.now().year
+
+        with transaction.atomic():
+            updated = cls.objects.filter(year=year).update(last_number=F("last_number") + count)
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(year=year, last_number=cls._seed_for_year(year) + count)
+                except IntegrityError:
+                    # another worker created the row first, take our block from it
+                    cls.objects.filter(year=year).update(last_number=F("last_number") + count)
+            last = cls.objects.filter(year=year).values_list("last_number", flat=True).get()
+            if last > WORK_ORDER_NUMBER_MAX:
+                # raised inside the block so the reservation rolls back
+                raise ValueError(f"Maximum work order number reached for this year ({WORK_ORDER_NUMBER_MAX}).")
+            cls._changed(year)
+        return list(range(last - count + 1, last + 1))
+
+    @classmethod
+    def advance(cls, year, last):
+        """Make sure numbers handed out for ``year`` from now on are above ``last`` (e.g. one that was imported)."""
+        with transaction.atomic():
+            if cls.objects.filter(year=year, last_number__lt=last).update(last_number=last):
+                cls._changed(year)
+                return
+            if cls.objects.filter(year=year).exists():
+                return
+            try:
+                with transaction.atomic():
+                    cls.objects.create(year=year, last_number=max(last, cls._seed_for_year(year)))
+            except IntegrityError:
+                cls.objects.filter(year=year, last_number__lt=last).update(last_number=last)
+            cls._changed(year)
+
+    @classmethod
+    def _changed(cls, year):
+        from .signals import work_order_sequence_changed
+
+        work_order_sequence_changed.send(sender=cls, year=year)
+
+    @staticmethod
+    def _seed_for_year(year):
+        """Highest number already used in ``year``, so existing orders are never reissued."""
+        numbers = WorkOrder.objects.filter(
+            work_order_number__startswith=f"WO{year}"
+        ).values_list("work_order_number", flat=True)
+        last_num = WORK_ORDER_NUMBER_START
+        for number in numbers:
+            # formats we accept: WO2025-1234 or WO20251234
+            tail = number.replace("-", "")[6:]  # after WOYYYY
+            if tail.isdigit():
+                last_num = max(last_num, int(tail))
+        return last_num
+
+
 # ─────────────────────────────
 # Work Order
 # ─────────────────────────────
-class WorkOrder(models.Model):
+class WorkOrderQuerySet(models.QuerySet):
+    def transition_status(self, status, notify=True):
+        """
+        Move every matched work order to ``status`` without calling save().
+
+        Returns a list of ``(id, previous_status)`` for the rows that actually
+        changed. On PostgreSQL this is a single ``UPDATE ... RETURNING``; other
+        backends read the affected rows and update them inside one transaction.
+        With ``notify`` the customers are emailed through the outbox in one
+        batched insert, so bulk actions notify without a query per order.
+        """
+        now = timezone.now()
+        candidates = self.exclude(status=status).order_by()
+
+        with transaction.atomic(using=self.db):
+            conn = connections[self.db]
+            if conn.vendor == "postgresql":
+                inner_sql, inner_params = candidates.values_list("pk", "status").query.sql_with_params()
+                table = conn.ops.quote_name(self.model._meta.db_table)
+                with conn.cursor() as cursor:
+                    # the status check makes a concurrent change win instead of being reported wrongly
+                    cursor.execute(
+                        f"UPDATE {table} AS wo SET status = %s, updated_at = %s "
+                        f"FROM ({inner_sql}) AS old (id, status) "
+                        f"WHERE wo.id = old.id AND wo.status = old.status "
+                        f"RETURNING wo.id, old.status",
+                        [status, now, *inner_params],
+                    )
+                    changed = cursor.fetchall()
+            else:
+                changed = list(candidates.values_list("pk", "status"))
+                ids = [pk for pk, _ in changed]
+                for start in range(0, len(ids), 500):
+                    self.model._base_manager.using(self.db).filter(
+                        pk__in=ids[start:start + 500]
+                    ).update(status=status, updated_at=now)
+
+            if changed:
+                from .signals import work_orders_bulk_updated
+
+                work_orders_bulk_updated.send(
+                    sender=self.model, ids=[pk for pk, _ in changed], fields={"status"},
+                    previous={"status": dict(changed)},
+                )
+
+            if notify and changed:
+                from .utils import send_status_update_emails
+
+                send_status_update_emails(
+                    self.model._base_manager.using(self.db)
+                    .filter(pk__in=[pk for pk, _ in changed])
+                    .select_related("customer")
+                )
+        return changed
+
+    def bulk_change(self, **values):
+        """
+        ``update()`` that also sends ``work_orders_bulk_updated`` so rollups and
+        other derived data follow along. Returns the number of rows updated.
+        """
+        values.setdefault("updated_at", timezone.now())
+        fields = [self.model._meta.get_field(name).attname for name in values]
+        rows = list(self.order_by().values_list("pk", *fields))
+        ids = [row[0] for row in rows]
+        count = 0
+        with transaction.atomic(using=self.db):
+            for start in range(0, len(ids), 500):
+                count += self.model._base_manager.using(self.db).filter(
+                    pk__in=ids[start:start + 500]
+                ).update(**values)
+            if ids:
+                from .signals import work_orders_bulk_updated
+
+                previous = {field: {row[0]: row[i] for row in rows} for i, field in enumerate(fields, 1)}
+                work_orders_bulk_updated.send(sender=self.model, ids=ids, fields=set(fields), previous=previous)
+        return count
+
+
+class WorkOrder(TrackedFieldsMixin, models.Model):
     customer = models.ForeignKey("Customer", on_delete=models.CASCADE)
     product_type = models.CharField(max_length=100, blank=True, null=True)
     product_brand = models.CharField(max_length=100)
@@ -68,31 +272,31 @@ class WorkOrder(models.Model):
     not_repaired_reason = models.TextField(blank=True, null=True)
     customer_collected = models.BooleanField(default=False)
     collected_at = models.DateTimeField(blank=True, null=True)
+    # set by the SLA evaluator (workshop.sla) once an open order is past its estimated completion date
+    overdue_since = models.DateTimeField(blank=True, null=True, editable=False)
+
+    objects = WorkOrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # API list and cursor pagination: active orders, newest first
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=Q(is_active=True),
+                name="wo_active_created_idx",
+            ),
+            # SLA evaluator: open statuses past their due date
+            models.Index(fields=["status", "estimated_completion_date"], name="wo_status_due_idx"),
+            # admin OverdueFilter and the dashboard: orders the evaluator has marked
+            models.Index(fields=["status", "overdue_since"], name="wo_status_overdue_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         # Auto-generate work order number only once
         if not self.work_order_number:
             year = timezone.now().year
-             # find the last WO for this year
-            last_for_year = (
-                WorkOrder.objects
-                .filter(work_order_number__startswith=f"WO{year}")
-                .order_by("-id")
-                .first()
-            )
-            if last_for_year and len(last_for_year.work_order_number) >= 4:
-                # formats we accept: WO2025-1234 or WO20251234
-                tail = last_for_year.work_order_number.replace("-", "")[6:]  # after WOYYYY
-                last_num = int(tail) if tail.isdigit() else 1000
-            else:
-                last_num = 1000  # first becomes 1001
-
-            new_num = last_num + 1
-            if new_num > 9999:
-                raise ValueError("Maximum work order number reached for this year (9999).")
-
-            # Pretty format: WOYYYY-#### (e.g., WO2025-1001)
-            self.work_order_number = f"WO{year}-{new_num:04d}"
+            new_num = WorkOrderSequence.allocate(year)[0]
+            self.work_order_number = format_work_order_number(year, new_num)
 
         super().save(*args, **kwargs)
 
@@ -101,7 +305,7 @@ class WorkOrder(models.Model):
 # ─────────────────────────────
 # Product Image
 # ─────────────────────────────
-class ProductImage(models.Model):
+class ProductImage(TrackedFieldsMixin, models.Model):
     work_order = models.ForeignKey(
         WorkOrder,
         on_delete=models.CASCADE,
@@ -110,9 +314,65 @@ class ProductImage(models.Model):
     image = models.ImageField(upload_to="workorder_images/")
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    # Derivatives rendered by `manage.py process_images` (see workshop.imaging)
+    thumbnail = models.ImageField(upload_to="workorder_images/derived/", blank=True, null=True, editable=False)
+    display = models.ImageField(upload_to="workorder_images/derived/", blank=True, null=True, editable=False)
+    width = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    height = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    placeholder = models.TextField(blank=True, default="", editable=False)  # tiny base64 data URI
+    processed_at = models.DateTimeField(blank=True, null=True, editable=False)  # NULL = queued
+    processing_error = models.TextField(blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["id"], condition=Q(processed_at__isnull=True), name="productimage_pending_idx"),
+        ]
+
     def __str__(self):
         return f"Image for {self.work_order.work_order_number} ({self.id})"
-    
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and self.has_changed("image"):
+            # new upload: queue it again; the worker replaces the old derivative files
+            self.width = self.height = self.processed_at = self.processing_error = None
+            self.placeholder = ""
+        super().save(*args, **kwargs)
+
+
+# ─────────────────────────────
+# Chunked (resumable) image upload
+# ─────────────────────────────
+class ChunkedUpload(models.Model):
+    """
+    An image upload in progress. Chunks are written into ``temp_path`` at their
+    offset; once ``offset`` reaches ``size`` the file becomes a ProductImage
+    (see ``workshop.uploads``).
+    """
+    STATUS_CHOICES = [
+        ("uploading", "Uploading"),
+        ("complete", "Complete"),
+        ("failed", "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    work_order = models.ForeignKey(WorkOrder, on_delete=models.CASCADE, related_name="uploads")
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)  # optional, checked when the last chunk arrives
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="uploading")
+    error = models.TextField(blank=True, null=True)
+    product_image = models.ForeignKey(ProductImage, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_TEMP_DIR, f"{self.pk}.part")
+
 class RemoteRequest(models.Model):
     STATUS_CHOICES = [
         ("pending", "Pending Review"),
@@ -153,8 +413,176 @@ class RemoteRequest(models.Model):
         related_name="reviewed_remote_requests"
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-created_at"], name="remotereq_status_created_idx"),
+            models.Index(fields=["-created_at"], name="remotereq_created_idx"),
+        ]
+
     def __str__(self):
         return f"Remote Request from {self.customer_name} ({self.customer_email})"
-    
-    import workshop.signals
 
+
+# ─────────────────────────────
+# Outbound Message (notification outbox)
+# ─────────────────────────────
+class OutboundMessage(models.Model):
+    """
+    Email/SMS waiting to be delivered by the ``run_outbox`` worker.
+    Request code only inserts rows here, so it never waits on SMTP.
+    """
+    CHANNEL_CHOICES = [
+        ("email", "Email"),
+        ("sms", "SMS"),
+    ]
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sending", "Sending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES, default="email")
+    recipient = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_channel_display()} to {self.recipient} ({self.status})"
+
+
+# ─────────────────────────────
+# Daily Work Order Stats (dashboard rollup)
+# ─────────────────────────────
+class DailyWorkOrderStats(models.Model):
+    """
+    Work order count and revenue per creation day, status and technician.
+    Maintained incrementally by the WorkOrder signals (see ``workshop.stats``)
+    and rebuildable with ``manage.py rebuild_dashboard_stats``.
+    """
+    day = models.DateField()
+    status = models.CharField(max_length=50)
+    technician_id = models.BigIntegerField(default=0)  # 0 = unassigned
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "status", "technician_id"], name="daily_stats_bucket_uniq"),
+        ]
+        verbose_name_plural = "daily work order stats"
+
+    def __str__(self):
+        return f"{self.day} {self.status} tech={self.technician_id}: {self.order_count}"
+
+
+# ─────────────────────────────
+# Work Order Search Document
+# ─────────────────────────────
+class WorkOrderSearchDocument(models.Model):
+    """
+    Denormalized search text for one work order. Indexed with FTS5 on SQLite
+    and a tsvector/GIN column on PostgreSQL (both added by migration 0015);
+    kept current by the signals in ``workshop.search``.
+    """
+    work_order = models.OneToOneField(
+        WorkOrder, on_delete=models.CASCADE, primary_key=True, related_name="search_document"
+    )
+    document = models.TextField()
+
+    def __str__(self):
+        return f"Search document for work order {self.work_order_id}"
+
+
+# ─────────────────────────────
+# Work Order Event (live feed log)
+# ─────────────────────────────
+class WorkOrderEvent(models.Model):
+    """
+    Append-only log of status and assignment changes, read by the server-sent
+    events stream (see ``workshop.events``). The id is the SSE event id that
+    clients resume from. Customer and technician ids are copied so subscribers
+    can filter without joins, and so the events outlive a deleted technician.
+    """
+    KIND_CHOICES = [
+        ("created", "Created"),
+        ("status", "Status changed"),
+        ("assignment", "Technician changed"),
+    ]
+
+    work_order = models.ForeignKey(WorkOrder, on_delete=models.CASCADE, related_name="events")
+    work_order_number = models.CharField(max_length=50)
+    customer_id = models.BigIntegerField()
+    technician_id = models.BigIntegerField(null=True, blank=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    old_value = models.CharField(max_length=50, blank=True, default="")
+    new_value = models.CharField(max_length=50, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer_id", "id"], name="workorderevent_customer_idx"),
+            models.Index(fields=["technician_id", "id"], name="workorderevent_tech_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.work_order_number} {self.kind}: {self.old_value} -> {self.new_value}"
+
+
+# ─────────────────────────────
+# Work Order Transition (history)
+# ─────────────────────────────
+class WorkOrderTransition(models.Model):
+    """
+    Append-only history of a work order's status, technician, costs and
+    collection (see ``workshop.transitions``). Values are stored as integers:
+    status codes, technician ids, amounts in cents and 0/1 flags. ``month``
+    (YYYYMM) is the partition key, so reports and archiving can work a month
+    at a time. Rows are never updated, and they outlive a deleted work order.
+    """
+    FIELD_CHOICES = [
+        (1, "status"),
+        (2, "technician"),
+        (3, "estimated_cost"),
+        (4, "total_cost"),
+        (5, "customer_collected"),
+    ]
+    ACTOR_CHOICES = [
+        (0, "system"),  # management commands and workers
+        (1, "web"),
+        (2, "api"),
+        (3, "admin"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    month = models.PositiveIntegerField()
+    work_order_id = models.BigIntegerField()
+    field = models.PositiveSmallIntegerField(choices=FIELD_CHOICES)
+    old_value = models.BigIntegerField(null=True, blank=True)
+    new_value = models.BigIntegerField(null=True, blank=True)
+    actor = models.PositiveSmallIntegerField(choices=ACTOR_CHOICES, default=0)
+    user_id = models.IntegerField(null=True, blank=True)
+    at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["work_order_id", "id"], name="wotransition_order_idx"),
+            models.Index(fields=["month", "id"], name="wotransition_month_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} WO {self.work_order_id} {self.get_field_display()}: {self.old_value} -> {self.new_value}"
+
+import workshop.signals
@@ -0,0 +1,190 @@
+# workshop/outbox.py
+"""
+Database-backed outbox for customer/staff notifications.
+
+Request code calls ``enqueue_email()`` / ``enqueue_sms()``, which only insert a
+row. The ``run_outbox`` management command drains due rows in batches, reusing
+one SMTP connection per batch, retrying failures with exponential backoff and
+deferring recipients that hit the per-recipient rate limit.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundMessage
+
+logger = logging.getLogger(__name__)
+
+# A claimed batch that is not finished within this window is picked up again
+# (e.g. the worker was killed mid-batch).
+CLAIM_LEASE = timedelta(minutes=10)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ─────────────────────────────
+# Enqueue
+# ─────────────────────────────
+def enqueue_email(recipient, subject, body, html_body=None):
+    return OutboundMessage.objects.create(
+        channel="email",
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        html_body=html_body,
+    )
+
+
+def enqueue_sms(recipient, body):
+    return OutboundMessage.objects.create(channel="sms", recipient=recipient, body=body)
+
+
+# ─────────────────────────────
+# Delivery
+# ─────────────────────────────
+def deliver_sms(to, message):
+    """
+    SMS sending is currently disabled.
+    This is a safe stub that just logs to console.
+    """
+    print(f"[SMS DISABLED] Would send SMS to {to}: {message}")
+
+
+def retry_delay(attempts):
+    """Backoff before attempt number ``attempts + 1``: base, 2x base, 4x base, ..."""
+    base = _setting("OUTBOX_RETRY_BASE_SECONDS", 30)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 6 * 60 * 60))
+
+
+def claim_batch(batch_size):
+    """
+    Mark up to ``batch_size`` due messages as "sending" and return them.
+    PostgreSQL workers skip rows locked by each other; on SQLite run a single worker.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = (
+            OutboundMessage.objects
+            .filter(status__in=["pending", "sending"], next_attempt_at__lte=now)
+            .order_by("next_attempt_at")
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        messages = list(due[:batch_size])
+        if messages:
+            OutboundMessage.objects.filter(pk__in=[m.pk for m in messages]).update(
+                status="sending", next_attempt_at=now + CLAIM_LEASE
+            )
+    return messages
+
+
+def _rate_key(message):
+    return f"outbox_rate_{message.channel}_{message.recipient}"
+
+
+def _rate_limited(message):
+    """
+    Reserve a slot in the recipient's quota for the window; True (nothing
+    reserved) once the quota is used up. Unsent messages give theirs back.
+    """
+    limit = _setting("OUTBOX_RATE_LIMIT", 5)
+    if not limit:
+        return False
+    key = _rate_key(message)
+    cache.add(key, 0, timeout=_setting("OUTBOX_RATE_WINDOW", 3600))
+    try:
+        if cache.incr(key) > limit:
+            _release(message)
+            return True
+        return False
+    except ValueError:  # key expired between add() and incr()
+        cache.set(key, 1, timeout=_setting("OUTBOX_RATE_WINDOW", 3600))
+        return False
+
+
+def _release(message):
+    """Give back the slot reserved by ``_rate_limited``: only sent messages count."""
+    if not _setting("OUTBOX_RATE_LIMIT", 5):
+        return
+    try:
+        cache.decr(_rate_key(message))
+    except ValueError:  # the window ended meanwhile
+        pass
+
+
+def process_batch(batch_size=None):
+    """Deliver one batch of due messages. Returns a dict of counts per outcome."""
+    batch_size = batch_size or _setting("OUTBOX_BATCH_SIZE", 50)
+    max_attempts = _setting("OUTBOX_MAX_ATTEMPTS", 5)
+    messages = claim_batch(batch_size)
+    counts = {"sent": 0, "retried": 0, "failed": 0, "deferred": 0}
+    if not messages:
+        return counts
+
+    now = timezone.now()
+    sent, finished = [], []
+    mail_connection = None
+    try:
+        for message in messages:
+            if _rate_limited(message):
+                message.status = "pending"
+                message.next_attempt_at = now + timedelta(seconds=_setting("OUTBOX_RATE_WINDOW", 3600))
+                finished.append(message)
+                counts["deferred"] += 1
+                continue
+
+            try:
+                if message.channel == "sms":
+                    deliver_sms(message.recipient, message.body)
+                else:
+                    if mail_connection is None:
+                        mail_connection = get_connection()
+                        mail_connection.open()
+                    msg = EmailMultiAlternatives(
+                        message.subject,
+                        message.body,
+                        settings.DEFAULT_FROM_EMAIL,
+                        [message.recipient],
+                        connection=mail_connection,
+                    )
+                    if message.html_body:
+                        msg.attach_alternative(message.html_body, "text/html")
+                    msg.send()
+            except Exception as exc:
+                _release(message)
+                message.attempts += 1
+                message.last_error = str(exc)
+                if message.attempts >= max_attempts:
+                    message.status = "failed"
+                    counts["failed"] += 1
+                    logger.error(f"Giving up on outbound message {message.pk} to {message.recipient}: {exc}")
+                else:
+                    message.status = "pending"
+                    message.next_attempt_at = now + retry_delay(message.attempts)
+                    counts["retried"] += 1
+                    logger.warning(f"Outbound message {message.pk} failed, retrying later: {exc}")
+                finished.append(message)
+            else:
+                sent.append(message.pk)
+                counts["sent"] += 1
+    finally:
+        if mail_connection is not None:
+            mail_connection.close()
+
+        if sent:
+            OutboundMessage.objects.filter(pk__in=sent).update(
+                status="sent", sent_at=timezone.now(), attempts=F("attempts") + 1, last_error=None
+            )
+        if finished:
+            OutboundMessage.objects.bulk_update(
+                finished, ["status", "attempts", "next_attempt_at", "last_error"]
+            )
+    return counts
@@ -0,0 +1,35 @@
+# workshop/pagination.py
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class WorkOrderCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (created_at, id): every page is an index range scan
+    instead of an ever-growing OFFSET, which is what bulk syncs want.
+    """
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Page numbers by default (``?page=3``); ``?pagination=cursor`` or a
+    ``?cursor=`` token from a previous page switches to cursor pagination.
+    """
+    cursor_pagination_class = WorkOrderCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if params.get("pagination") == "cursor" or "cursor" in params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
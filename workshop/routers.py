@@ -0,0 +1,73 @@
+# workshop/routers.py
+"""
+Primary/replica database routing.
+
+Reads only go to a replica (``settings.DATABASE_REPLICAS``) inside a
+``replica_reads()`` scope. ReplicaRoutingMiddleware opens one for GET/HEAD
+requests, which covers the read-only API actions, the landing search and the
+reports. The first write in a scope pins the rest of it to the primary, so a
+request reads back what it wrote. A short cookie then keeps the same browser
+on the primary while the replicas catch up. Everything outside a scope
+(commands, workers, POSTs) uses the primary.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_scope = ContextVar("replica_scope", default=None)
+
+
+class ReplicaScope:
+    __slots__ = ("pinned", "wrote")
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def replicas():
+    return getattr(settings, "DATABASE_REPLICAS", ())
+
+
+@contextmanager
+def replica_reads(pinned=False):
+    """Let reads in this block use a replica until the first write (or from the start with ``pinned``)."""
+    scope = ReplicaScope(pinned)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def pin_to_primary():
+    scope = _scope.get()
+    if scope is not None:
+        scope.pinned = scope.wrote = True
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        scope = _scope.get()
+        if scope is None or scope.pinned or not replicas():
+            return DEFAULT_DB_ALIAS
+        # a transaction on the primary must see its own rows (and hold its locks)
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return random.choice(replicas())
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
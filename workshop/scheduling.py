@@ -0,0 +1,198 @@
+# workshop/scheduling.py
+"""
+Technician workload and automatic assignment.
+
+``Technician.open_jobs`` counts the active pending / in-progress work orders
+assigned to each technician, and ``overdue_jobs`` those of them the SLA
+evaluator (``workshop.sla``) has marked overdue. Saves, deletes and bulk
+updates adjust both with ``F()`` increments (receivers at the bottom of this
+module), so reading every technician's load is one small query instead of an
+aggregate over all open orders. ``manage.py rebuild_workloads`` recomputes
+them from scratch.
+
+``auto_assign()`` hands out a batch of work orders in one pass. Orders are
+taken soonest ``estimated_completion_date`` first, and each goes to the
+technician with the fewest open jobs, kept in a min-heap. That is O(n log t)
+for n orders and t technicians. The result is written with one UPDATE per
+technician (per 500 orders) and a single ``work_orders_bulk_updated`` signal,
+instead of a query per order.
+"""
+import heapq
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Technician, WorkOrder
+from .signals import work_orders_bulk_updated
+
+OPEN_STATUSES = ("pending", "in_progress")
+WORKLOAD_FIELDS = ("technician_id", "status", "is_active", "overdue_since")
+
+
+# ─────────────────────────────
+# Counters
+# ─────────────────────────────
+def workload_state(instance):
+    return {name: getattr(instance, name) for name in WORKLOAD_FIELDS}
+
+
+def is_open(state):
+    """Whether a work order state (a dict of WORKLOAD_FIELDS, or None) counts toward a workload."""
+    return bool(state and state["technician_id"] and state["is_active"] and state["status"] in OPEN_STATUSES)
+
+
+def workload_deltas(changes):
+    """
+    ``changes`` is an iterable of ``(before, after)`` states; returns
+    ``{technician_id: (open_jobs delta, overdue_jobs delta)}``.
+    """
+    open_jobs, overdue_jobs = Counter(), Counter()
+    for before, after in changes:
+        for state, sign in ((before, -1), (after, 1)):
+            if is_open(state):
+                open_jobs[state["technician_id"]] += sign
+                if state["overdue_since"]:
+                    overdue_jobs[state["technician_id"]] += sign
+    deltas = {technician_id: (open_jobs[technician_id], overdue_jobs[technician_id]) for technician_id in open_jobs}
+    return {technician_id: delta for technician_id, delta in deltas.items() if any(delta)}
+
+
+def apply_deltas(deltas):
+    """One UPDATE per distinct delta; never below zero if a counter has drifted."""
+    by_delta = defaultdict(list)
+    for technician_id, delta in deltas.items():
+        by_delta[delta].append(technician_id)
+    with transaction.atomic():
+        for (open_delta, overdue_delta), technician_ids in by_delta.items():
+            Technician.objects.filter(pk__in=technician_ids).update(
+                open_jobs=Greatest(F("open_jobs") + open_delta, Value(0)),
+                overdue_jobs=Greatest(F("overdue_jobs") + overdue_delta, Value(0)),
+            )
+
+
+def _count_per_technician(**filters):
+    return Coalesce(
+        Subquery(
+            WorkOrder.objects.filter(
+                technician=OuterRef("pk"), is_active=True, status__in=OPEN_STATUSES, **filters
+            )
+            .order_by()
+            .values("technician")
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def rebuild_workloads():
+    """Recompute both counters for every technician in one UPDATE. Returns the number of technicians."""
+    return Technician.objects.update(
+        open_jobs=_count_per_technician(), overdue_jobs=_count_per_technician(overdue_since__isnull=False)
+    )
+
+
+# ─────────────────────────────
+# Scheduling
+# ─────────────────────────────
+def plan(order_ids, loads):
+    """
+    Spread ``order_ids`` (already in due-date order) over the technicians in
+    ``loads`` (``{technician_id: open jobs}``), least loaded first; ties go to
+    the lower id. Returns ``{technician_id: [order ids]}``. No queries.
+    """
+    heap = [(load, technician_id) for technician_id, load in loads.items()]
+    if not heap:
+        return {}
+    heapq.heapify(heap)
+    assignments = defaultdict(list)
+    for order_id in order_ids:
+        load, technician_id = heap[0]
+        assignments[technician_id].append(order_id)
+        heapq.heapreplace(heap, (load + 1, technician_id))
+    return dict(assignments)
+
+
+def auto_assign(queryset, technician_ids=None):
+    """
+    Assign the active, open orders in ``queryset`` to ``technician_ids`` (all
+    technicians when None). Orders that already have a technician are
+    redistributed too: they stop counting toward their current technician's
+    load while the plan is made. Returns ``{technician_id: [order ids]}`` for
+    the orders whose technician changed.
+    """
+    technicians = Technician.objects.all()
+    if technician_ids is not None:
+        technicians = technicians.filter(pk__in=technician_ids)
+    loads = dict(technicians.values_list("pk", "open_jobs"))
+    if not loads:
+        return {}
+
+    orders = list(
+        queryset.filter(is_active=True, status__in=OPEN_STATUSES)
+        .order_by(F("estimated_completion_date").asc(nulls_last=True), "created_at", "pk")
+        .values_list("pk", "technician_id")
+    )
+    current = dict(orders)
+    for technician_id in current.values():
+        if technician_id in loads:
+            loads[technician_id] = max(loads[technician_id] - 1, 0)
+
+    changed = {}
+    for technician_id, order_ids in plan([pk for pk, _ in orders], loads).items():
+        if moved := [pk for pk in order_ids if current[pk] != technician_id]:
+            changed[technician_id] = moved
+    if not changed:
+        return changed
+
+    # like bulk_change(), but one signal for the whole batch so derived data is refreshed once
+    now = timezone.now()
+    with transaction.atomic():
+        for technician_id, moved in changed.items():
+            for start in range(0, len(moved), 500):
+                WorkOrder._base_manager.filter(pk__in=moved[start:start + 500]).update(
+                    technician_id=technician_id, updated_at=now
+                )
+        ids = [pk for moved in changed.values() for pk in moved]
+        work_orders_bulk_updated.send(
+            sender=WorkOrder, ids=ids, fields={"technician_id", "updated_at"},
+            previous={"technician_id": {pk: current[pk] for pk in ids}},
+        )
+    return changed
+
+
+# ─────────────────────────────
+# Receivers
+# ─────────────────────────────
+@receiver(post_save, sender=WorkOrder)
+def workorder_saved(sender, instance, created, **kwargs):
+    before = None if created else getattr(instance, "_previous_state", None)
+    if not created and before is None:
+        return
+    if deltas := workload_deltas([(before, workload_state(instance))]):
+        apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=WorkOrder)
+def workorder_deleted(sender, instance, **kwargs):
+    if deltas := workload_deltas([(workload_state(instance), None)]):
+        apply_deltas(deltas)
+
+
+@receiver(work_orders_bulk_updated, sender=WorkOrder)
+def workorders_bulk_updated(sender, ids, fields, previous=None, **kwargs):
+    if not fields & set(WORKLOAD_FIELDS):
+        return
+    previous = previous or {}
+    changes = []
+    for start in range(0, len(ids), 500):
+        for order in WorkOrder.objects.filter(pk__in=ids[start:start + 500]).values("pk", *WORKLOAD_FIELDS):
+            before = {name: previous.get(name, {}).get(order["pk"], order[name]) for name in WORKLOAD_FIELDS}
+            changes.append((before, order))
+    if deltas := workload_deltas(changes):
+        apply_deltas(deltas)
@@ -0,0 +1,259 @@
+# workshop/search.py
+"""
+Full-text search over work orders.
+
+Every work order has a ``WorkOrderSearchDocument`` holding one normalized text
+blob: number, customer name/email/phone, technician, product and issue. The
+blob is indexed by FTS5 on SQLite (``workshop_workorder_fts``, synced by
+triggers) and by a generated tsvector column with a GIN index on PostgreSQL.
+Other databases fall back to ``icontains`` on the blob.
+
+``search_work_orders()`` is the single entry point used by the API filter,
+the HTML views and the admin. Documents are refreshed by the receivers at the
+bottom of this module; ``manage.py rebuild_search_index`` rebuilds them all.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from .models import Customer, Technician, WorkOrder, WorkOrderSearchDocument
+from .signals import work_orders_bulk_updated
+from .utils import PHONE_QUERY_RE, phone_lookup_key
+
+FTS_TABLE = "workshop_workorder_fts"
+DOCUMENT_TABLE = WorkOrderSearchDocument._meta.db_table
+
+# Columns that make up a document, in the order document_text() expects them
+DOCUMENT_FIELDS = (
+    "work_order_number",
+    "customer__first_name",
+    "customer__last_name",
+    "customer__email",
+    "customer__phone_number",
+    "technician__first_name",
+    "technician__last_name",
+    "product_type",
+    "product_brand",
+    "product_model",
+    "serial_number",
+    "issue_description",
+)
+# WorkOrder columns whose change requires re-indexing
+WORK_ORDER_DOCUMENT_ATTNAMES = {
+    "work_order_number", "customer_id", "technician_id", "product_type",
+    "product_brand", "product_model", "serial_number", "issue_description",
+}
+
+TERM_RE = re.compile(r"[^\W_]+")
+MAX_TERMS = 8
+
+
+# ─────────────────────────────
+# Documents and queries
+# ─────────────────────────────
+def phone_terms(phone):
+    """Searchable forms of a phone number: +251911223344 -> 251911223344, 0911223344, 911223344."""
+    key = phone_lookup_key(phone or "")
+    if not key:
+        return []
+    digits = key.lstrip("+")
+    terms = [digits]
+    if key.startswith("+251"):
+        terms += ["0" + digits[3:], digits[3:]]
+    return terms
+
+
+def document_text(values):
+    """
+    Normalized document for one row of ``DOCUMENT_FIELDS`` values: lowercase
+    words separated by single spaces, so FTS5 and PostgreSQL tokenize it alike.
+    """
+    row = dict(zip(DOCUMENT_FIELDS, values))
+    text = " ".join(str(value) for value in values if value)
+    return " ".join(TERM_RE.findall(text.lower()) + phone_terms(row["customer__phone_number"]))
+
+
+def query_terms(query):
+    """Words of a user query; a phone number in any format becomes one digit term."""
+    query = query.strip()
+    if PHONE_QUERY_RE.match(query):
+        key = phone_lookup_key(query)
+        if key.startswith("+"):
+            return [key.lstrip("+")]
+    return TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+# ─────────────────────────────
+# Backends
+# ─────────────────────────────
+class SQLiteFTSBackend:
+    def filter(self, queryset, terms):
+        # A join rather than a correlated subquery: bm25() would re-run MATCH per row
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            select={"search_rank": f"-bm25({FTS_TABLE})"},
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE} MATCH %s", f'{FTS_TABLE}.rowid = "{table}"."id"'],
+            params=[" ".join(f'"{term}"*' for term in terms)],
+        )
+
+    def optimize(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+class PostgresBackend:
+    def filter(self, queryset, terms):
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            select={"search_rank": f"ts_rank({DOCUMENT_TABLE}.search_vector, to_tsquery('simple', %s))"},
+            select_params=[tsquery],
+            tables=[DOCUMENT_TABLE],
+            where=[
+                f"{DOCUMENT_TABLE}.search_vector @@ to_tsquery('simple', %s)",
+                f'{DOCUMENT_TABLE}.work_order_id = "{table}"."id"',
+            ],
+            params=[tsquery],
+        )
+
+    def optimize(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"VACUUM ANALYZE {DOCUMENT_TABLE}")
+
+
+class LikeBackend:
+    """Unindexed fallback for databases without a full-text engine."""
+
+    def filter(self, queryset, terms):
+        lookup = Q()
+        for term in terms:
+            lookup &= Q(search_document__document__icontains=term)
+        return queryset.filter(lookup).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def optimize(self):
+        pass
+
+
+BACKENDS = {"sqlite": SQLiteFTSBackend, "postgresql": PostgresBackend}
+
+
+def get_backend():
+    return BACKENDS.get(connection.vendor, LikeBackend)()
+
+
+def search_work_orders(queryset, query, ranked=True):
+    """
+    Filter a WorkOrder queryset to documents containing every word of ``query``
+    (as prefixes) and annotate ``search_rank`` (higher is better). With
+    ``ranked`` the result is ordered by relevance, then by the existing ordering.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return queryset
+    results = get_backend().filter(queryset, terms)
+    if ranked:
+        results = results.order_by("-search_rank", *queryset.query.order_by)
+    return results
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    DRF filter for ``?search=``. Results are ordered by relevance unless the
+    client asks for an explicit ``?ordering=``, so list it after OrderingFilter.
+    """
+
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "")
+        ranked = not request.query_params.get(api_settings.ORDERING_PARAM)
+        return search_work_orders(queryset, query, ranked=ranked)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Full-text search over number, customer, technician, product and issue.",
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+# ─────────────────────────────
+# Index maintenance
+# ─────────────────────────────
+def _upsert(documents):
+    WorkOrderSearchDocument.objects.bulk_create(
+        documents, update_conflicts=True, unique_fields=["work_order"], update_fields=["document"]
+    )
+
+
+def index_queryset(queryset, batch_size=500):
+    """(Re)build the documents of every work order in ``queryset``. Returns the count."""
+    rows = queryset.order_by().values_list("pk", *DOCUMENT_FIELDS).iterator(chunk_size=batch_size)
+    batch, count = [], 0
+    for pk, *values in rows:
+        batch.append(WorkOrderSearchDocument(work_order_id=pk, document=document_text(values)))
+        if len(batch) >= batch_size:
+            _upsert(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        _upsert(batch)
+        count += len(batch)
+    return count
+
+
+def index_work_orders(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), 500):
+        index_queryset(WorkOrder.objects.filter(pk__in=ids[start:start + 500]))
+
+
+@receiver(post_save, sender=WorkOrder)
+def workorder_saved(sender, instance, created, update_fields=None, **kwargs):
+    if not created:
+        if update_fields is not None and not {
+            WorkOrder._meta.get_field(name).attname for name in update_fields
+        } & WORK_ORDER_DOCUMENT_ATTNAMES:
+            return
+    index_work_orders([instance.pk])
+
+
+@receiver(post_save, sender=Customer)
+def customer_saved(sender, instance, created, **kwargs):
+    if not created:
+        index_queryset(WorkOrder.objects.filter(customer_id=instance.pk))
+
+
+@receiver(post_save, sender=Technician)
+def technician_saved(sender, instance, created, **kwargs):
+    if not created:
+        index_queryset(WorkOrder.objects.filter(technician_id=instance.pk))
+
+
+@receiver(pre_delete, sender=Technician)
+def technician_deleting(sender, instance, **kwargs):
+    # on_delete=SET_NULL is a plain UPDATE, so remember whose documents to refresh
+    instance._search_work_order_ids = list(
+        WorkOrder.objects.filter(technician_id=instance.pk).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Technician)
+def technician_deleted(sender, instance, **kwargs):
+    index_work_orders(getattr(instance, "_search_work_order_ids", []))
+
+
+@receiver(work_orders_bulk_updated, sender=WorkOrder)
+def workorders_bulk_updated(sender, ids, fields, **kwargs):
+    if fields & WORK_ORDER_DOCUMENT_ATTNAMES:
+        index_work_orders(ids)
@@ -0,0 +1,176 @@
+# workshop/seeding.py
+"""
+Synthetic data for load tests and benchmarks (``manage.py seed_data``).
+
+Work orders are generated as rows in the export column layout and loaded
+through ``importing.WorkOrderImporter``. Seeding therefore takes the same
+bulk path as a real import: numbers allocated in blocks per year, search
+documents and the dashboard rollup. Everything comes from one seeded
+``random.Random``, so the same ``--seed`` gives the same data set.
+"""
+import io
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image
+
+from .importing import WorkOrderImporter
+from .models import ProductImage, Technician, WorkOrder
+
+FIRST_NAMES = (
+    "Abebe", "Almaz", "Bekele", "Birtukan", "Dawit", "Eleni", "Fikru", "Genet", "Hana", "Haile",
+    "Kebede", "Liya", "Meron", "Mulugeta", "Selam", "Solomon", "Tigist", "Tsion", "Yonas", "Zewdu",
+)
+LAST_NAMES = (
+    "Alemu", "Assefa", "Bekele", "Desta", "Gebre", "Girma", "Hailu", "Kassa", "Mekonnen", "Mulu",
+    "Negash", "Tadesse", "Tesfaye", "Wolde", "Worku", "Yilma",
+)
+PRODUCTS = (
+    ("Phone", "Samsung", ("Galaxy A14", "Galaxy S21", "Galaxy A54")),
+    ("Phone", "Apple", ("iPhone 11", "iPhone 12", "iPhone 13")),
+    ("Phone", "Tecno", ("Spark 10", "Camon 20")),
+    ("Laptop", "Lenovo", ("ThinkPad T14", "IdeaPad 3")),
+    ("Laptop", "HP", ("EliteBook 840", "Pavilion 15")),
+    ("Laptop", "Dell", ("Latitude 5420", "XPS 13")),
+    ("TV", "LG", ("43LM5500", "55UQ7500")),
+    ("Appliance", "Samsung", ("RT38 Fridge", "WW70 Washer")),
+)
+ISSUES = (
+    "Cracked screen", "Does not charge", "No power", "Battery drains quickly", "Overheating and fan noise",
+    "Water damage", "Keyboard keys not working", "No display but sound works", "Charging port loose",
+    "Stuck on boot logo", "No cooling", "Drum does not spin",
+)
+NOT_REPAIRED_REASONS = ("Parts not available", "Customer declined the quote", "Board damage beyond repair")
+
+# status weights for orders from the last month and for older ones
+RECENT_STATUSES = (("pending", 35), ("in_progress", 35), ("completed", 25), ("cancelled", 5))
+OLD_STATUSES = (("pending", 3), ("in_progress", 4), ("completed", 83), ("cancelled", 10))
+
+
+def phone_number(rng):
+    """An Ethiopian mobile number written the way customers type it; normalize_phone() handles every form."""
+    subscriber = f"{rng.choice('97')}{rng.randint(0, 99_999_999):08d}"
+    formats = [
+        "0" + subscriber,
+        "+251" + subscriber,
+        "251" + subscriber,
+        f"0{subscriber[:3]} {subscriber[3:5]} {subscriber[5:7]} {subscriber[7:]}",
+        f"251-{subscriber[:3]}-{subscriber[3:6]}-{subscriber[6:]}",
+    ]
+    if subscriber.startswith("9"):
+        formats.append(subscriber)  # without the leading 0 (only recognised for 09 numbers)
+    return rng.choice(formats)
+
+
+def _choose(rng, weighted):
+    return rng.choices([value for value, _ in weighted], [weight for _, weight in weighted])[0]
+
+
+class DataGenerator:
+    def __init__(self, customers=1000, technicians=10, years=3, seed=0):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.customer_count = customers
+        self.technician_count = technicians
+        self.days = max(1, int(years * 365))
+        self.now = timezone.now()
+        self.customers = {}
+
+    def technicians(self):
+        """Create the technicians (idempotent per seed) and return their ids."""
+        rng = self.rng
+        technicians = [
+            Technician(
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                email=f"technician{i}.s{self.seed}@repairshop.example",
+                phone_number="0" + phone_number(rng)[-9:],
+            )
+            for i in range(self.technician_count)
+        ]
+        Technician.objects.bulk_create(technicians, ignore_conflicts=True)
+        emails = [technician.email for technician in technicians]
+        return list(Technician.objects.filter(email__in=emails).values_list("pk", flat=True))
+
+    def customer(self):
+        index = self.rng.randrange(self.customer_count)
+        if index not in self.customers:
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            self.customers[index] = {
+                "customer_first_name": first,
+                "customer_last_name": last,
+                "customer_email": f"{first}.{last}.{index}.s{self.seed}@example.com".lower(),
+                "customer_phone_number": phone_number(self.rng),
+            }
+        return self.customers[index]
+
+    def row(self, technician_ids):
+        rng = self.rng
+        created_at = self.now - timedelta(days=rng.random() * self.days)
+        age = (self.now - created_at).days
+        status = _choose(rng, RECENT_STATUSES if age < 30 else OLD_STATUSES)
+        product_type, brand, models = rng.choice(PRODUCTS)
+        estimate = Decimal(rng.randrange(300, 15000, 50))
+        finished = created_at + timedelta(days=rng.randint(1, 14))
+        if finished > self.now:
+            finished = self.now
+        row = {
+            **self.customer(),
+            "product_type": product_type,
+            "product_brand": brand,
+            "product_model": rng.choice(models),
+            "serial_number": "".join(rng.choices("ABCDEFGHJKLMNPQRSTUVWXYZ0123456789", k=12)),
+            "issue_description": rng.choice(ISSUES),
+            "status": status,
+            "estimated_cost": estimate,
+            "estimated_completion_date": (created_at + timedelta(days=rng.randint(2, 10))).date().isoformat(),
+            "created_at": created_at.isoformat(),
+            "updated_at": (finished if status in ("completed", "cancelled") else created_at).isoformat(),
+        }
+        if technician_ids and not (status == "pending" and rng.random() < 0.5):
+            row["technician_id"] = rng.choice(technician_ids)
+        if status == "completed":
+            row["is_repaired"] = True
+            row["repair_details"] = f"Fixed: {row['issue_description'].lower()}"
+            row["total_cost"] = (estimate * Decimal(rng.uniform(0.8, 1.2))).quantize(Decimal("1"))
+            if age > 7 and rng.random() < 0.9:
+                row["customer_collected"] = True
+                row["date_collected"] = (finished + timedelta(days=rng.randint(0, 5))).isoformat()
+        elif status == "cancelled":
+            row["reason_for_not_repairing"] = rng.choice(NOT_REPAIRED_REASONS)
+        return row
+
+    def rows(self, count, technician_ids):
+        for _ in range(count):
+            yield self.row(technician_ids)
+
+    def images(self, work_order_ids, count):
+        """Attach ``count`` small generated JPEGs to randomly chosen work orders (queued for process_images)."""
+        images = []
+        for work_order_id in self.rng.sample(work_order_ids, min(count, len(work_order_ids))):
+            buffer = io.BytesIO()
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            Image.new("RGB", (64, 48), color).save(buffer, "JPEG")
+            name = default_storage.save(f"workorder_images/seed-{work_order_id}.jpg", ContentFile(buffer.getvalue()))
+            images.append(ProductImage(work_order_id=work_order_id, image=name))
+        ProductImage.objects.bulk_create(images)
+        return len(images)
+
+
+def seed(orders, customers, technicians, years=3, images=0, seed=0, batch_size=2000, progress=None):
+    """Generate and import the data set; returns the importer's counts plus ``technicians`` and ``images``."""
+    generator = DataGenerator(customers, technicians, years, seed)
+    technician_ids = generator.technicians()
+    importer = WorkOrderImporter(batch_size=batch_size, max_errors=0)  # a bad generated row is a bug
+    latest = WorkOrder.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+    counts = importer.run(generator.rows(orders, technician_ids), progress=progress)
+    counts["technicians"] = len(technician_ids)
+    counts["images"] = 0
+    if images:
+        seeded = list(WorkOrder.objects.filter(pk__gt=latest).values_list("pk", flat=True))
+        counts["images"] = generator.images(seeded, images)
+    return counts
@@ -1,5 +1,6 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Customer, Technician, WorkOrder, ProductImage
+from .models import ChunkedUpload, Customer, Technician, WorkOrder, ProductImage
 
 # ─────────────────────────────
 # Customer Serializer
@@ -7,7 +8,7 @@ from .models import Customer, Technician, WorkOrder, ProductImage
 class CustomerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Customer
-        fields = ["id", "first_name", "last_name", "email", "phone_number"]
+        fields = ["id", "first_name", "last_name", "email", "phone_number", "updated_at"]
 
 # ─────────────────────────────
 # Technician Serializer
@@ -15,7 +16,7 @@ class CustomerSerializer(serializers.ModelSerializer):
 class TechnicianSerializer(serializers.ModelSerializer):
     class Meta:
         model = Technician
-        fields = ["id", "first_name", "last_name", "email", "phone_number"]
+        fields = ["id", "first_name", "last_name", "email", "phone_number", "updated_at"]
 
 # ─────────────────────────────
 # ProductImage Serializer
@@ -23,8 +24,30 @@ class TechnicianSerializer(serializers.ModelSerializer):
 class ProductImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductImage
-        fields = ["id", "work_order", "image", "uploaded_at"]
-        read_only_fields = ["uploaded_at"]
+        fields = [
+            "id",
+            "work_order",
+            "image",
+            "uploaded_at",
+            "thumbnail",
+            "display",
+            "width",
+            "height",
+            "placeholder",
+        ]
+        # thumbnail/display stay null until `manage.py process_images` has run; fall back to `image`
+        read_only_fields = ["uploaded_at", "thumbnail", "display", "width", "height", "placeholder"]
+
+# ─────────────────────────────
+# Chunked Upload Serializer
+# ─────────────────────────────
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    product_image = ProductImageSerializer(read_only=True)
+
+    class Meta:
+        model = ChunkedUpload
+        fields = ["id", "work_order", "filename", "size", "sha256", "offset", "status", "error", "product_image"]
+        read_only_fields = ["offset", "status", "error"]
 
 # ─────────────────────────────
 # WorkOrder Serializer
@@ -43,6 +66,13 @@ class WorkOrderSerializer(serializers.ModelSerializer):
         queryset=Technician.objects.all(), source="technician", write_only=True, required=False
     )
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load everything the nested fields read, so a list page costs a fixed number of queries."""
+        return queryset.select_related("customer", "technician").prefetch_related(
+            Prefetch("images", queryset=ProductImage.objects.order_by("uploaded_at"))
+        )
+
     class Meta:
         model = WorkOrder
         fields = [
@@ -71,3 +101,11 @@ class WorkOrderSerializer(serializers.ModelSerializer):
             "images",
         ]
         read_only_fields = ["work_order_number", "created_at", "updated_at"]
+
+# ─────────────────────────────
+# Auto-assign request
+# ─────────────────────────────
+class AutoAssignSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), default=list)
+    # omitted or null: any technician
+    technician_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_null=True)
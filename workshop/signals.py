@@ -1,39 +1,82 @@
 # workshop/signals.py
-from django.db.models.signals import pre_save, post_save
-from django.dispatch import receiver
-from .models import WorkOrder
+import importlib
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal, receiver
+from django.urls import clear_url_caches
+from django.utils import timezone
+from .models import Customer, ProductImage, WorkOrder
+from .tracking import NOT_LOADED
 from .utils import send_status_update_email
+from . import stats
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Sent by WorkOrderQuerySet bulk methods that bypass save(): sender=WorkOrder,
+# ids=list of changed work order ids, fields=set of changed field names,
+# previous={field: {id: value before the update}} for those fields.
+work_orders_bulk_updated = Signal()
+
+# Sent by WorkOrderSequence.allocate()/advance(), which change the counter with
+# update(): sender=WorkOrderSequence, year=the year whose counter moved.
+work_order_sequence_changed = Signal()
+
+# Fields whose previous value post_save handlers need
+PREVIOUS_STATE_FIELDS = (
+    "created_at", "status", "technician_id", "total_cost", "estimated_cost", "customer_collected",
+    "is_active", "overdue_since", "customer_id",
+)
+
+
+def _state(instance):
+    return {name: getattr(instance, name) for name in PREVIOUS_STATE_FIELDS}
+
+
+def _previous_state(instance):
+    """Values of PREVIOUS_STATE_FIELDS as stored in the database before this save."""
+    if instance.is_tracked:
+        values = {name: instance.previous_value(name) for name in PREVIOUS_STATE_FIELDS}
+        if NOT_LOADED not in values.values():
+            return values
+    return WorkOrder.objects.filter(pk=instance.pk).values(*PREVIOUS_STATE_FIELDS).first()
+
 @receiver(pre_save, sender=WorkOrder)
 def workorder_pre_save(sender, instance, **kwargs):
     """Handle pre_save signal to detect status changes"""
-    logger.info(f"✅ PRE_SAVE Signal triggered for WorkOrder {getattr(instance, 'work_order_number', 'NEW')}")
+    logger.debug(f"✅ PRE_SAVE Signal triggered for WorkOrder {getattr(instance, 'work_order_number', 'NEW')}")
     
+    instance._previous_state = None
+    instance._status_changed = False
     if not instance.pk:
         # New instance being created
-        logger.info(f"New WorkOrder being created")
+        logger.debug(f"New WorkOrder being created")
         return
     
-    try:
-        old_instance = WorkOrder.objects.get(pk=instance.pk)
-        logger.info(f"Old status: {old_instance.status}, New status: {instance.status}")
-        
-        if old_instance.status != instance.status:
-            logger.info(f"🚀 STATUS CHANGED: {old_instance.status} -> {instance.status}")
-            # Store the fact that status changed for post_save handling
-            instance._status_changed = True
-            
-    except WorkOrder.DoesNotExist:
+    # Compare against the stored values (tracked snapshot, or a DB read as fallback)
+    previous = _previous_state(instance)
+    if previous is None:
         logger.warning(f"Could not find old instance for WorkOrder {instance.pk}")
+        return
+
+    instance._previous_state = previous
+    logger.debug(f"Old status: {previous['status']}, New status: {instance.status}")
+    instance._status_changed = previous["status"] != instance.status
+    if instance._status_changed:
+        logger.info(f"🚀 STATUS CHANGED: {previous['status']} -> {instance.status}")
 
 @receiver(post_save, sender=WorkOrder)
 def workorder_post_save(sender, instance, created, **kwargs):
     """Handle post_save signal to send emails"""
-    logger.info(f"✅ POST_SAVE Signal triggered for WorkOrder {instance.work_order_number} (created: {created})")
+    logger.debug(f"✅ POST_SAVE Signal triggered for WorkOrder {instance.work_order_number} (created: {created})")
     
+    after = _state(instance)
+    before = getattr(instance, "_previous_state", None)
+    if before != after:
+        stats.record_change(before, after)
+
     if created:
         logger.info(f"New WorkOrder created: {instance.work_order_number}")
         return
@@ -43,4 +86,37 @@ def workorder_post_save(sender, instance, created, **kwargs):
         logger.info(f"🚀 Sending email for status change: {instance.work_order_number}")
         send_status_update_email(instance)
     else:
-        logger.info(f"No status change detected for {instance.work_order_number}")
\ No newline at end of file
+        logger.debug(f"No status change detected for {instance.work_order_number}")
+
+@receiver(post_delete, sender=WorkOrder)
+def workorder_post_delete(sender, instance, **kwargs):
+    stats.record_change(_state(instance), None)
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def customer_changed(sender, instance, **kwargs):
+    # customer totals and names are part of the cached dashboard
+    stats.bump_stats_version()
+
+@receiver(work_orders_bulk_updated, sender=WorkOrder)
+def workorders_bulk_updated(sender, ids, fields, **kwargs):
+    if fields & {"status", "technician_id", "total_cost"}:
+        stats.refresh_for_work_orders(ids)
+    elif "customer_id" in fields:
+        # the rollup has no customer column, but the cached per-customer totals do
+        stats.bump_stats_version()
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def product_image_changed(sender, instance, **kwargs):
+    # images are part of the work order's API representation (and its ETag)
+    WorkOrder.objects.filter(pk=instance.work_order_id).update(updated_at=timezone.now())
+
+@receiver(setting_changed)
+def async_views_toggled(setting, **kwargs):
+    # urls.py picks sync or async views at import; rebuild it under override_settings(ASYNC_VIEWS=...)
+    if setting == "ASYNC_VIEWS":
+        from . import urls
+        importlib.reload(urls)
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))  # it holds the included resolver
+        clear_url_caches()
@@ -0,0 +1,163 @@
+# workshop/sla.py
+"""
+SLA evaluation (``manage.py evaluate_sla``).
+
+An open work order is overdue once its ``estimated_completion_date`` has
+passed. Instead of every admin page and dashboard computing that with a range
+filter, the evaluator materializes it: each run finds the open orders past
+their due date that are not yet marked and sets ``overdue_since`` to the start of the day
+after the due date. Orders whose due date was pushed back are unmarked.
+Completed orders keep the mark as a record that they were finished late.
+
+Marking and unmarking send ``work_orders_bulk_updated``, which keeps
+``Technician.overdue_jobs`` current (see ``workshop.scheduling``). Newly
+overdue orders are announced in one digest email per run to SLA_ALERT_EMAILS,
+plus one per technician, through the outbox.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import stats
+from .models import Technician, WorkOrder
+from .outbox import enqueue_email
+from .scheduling import OPEN_STATUSES
+from .signals import work_orders_bulk_updated
+
+ALERT_MAX_LINES = 50
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def overdue_orders(queryset=None):
+    """Orders currently overdue, as marked by the last evaluation."""
+    queryset = WorkOrder.objects.all() if queryset is None else queryset
+    return queryset.filter(status__in=OPEN_STATUSES, overdue_since__isnull=False, is_active=True)
+
+
+def on_time_orders(queryset=None):
+    """The rest of the orders ``overdue_orders()`` looks at: active, open and not marked (with or without a due date)."""
+    queryset = WorkOrder.objects.all() if queryset is None else queryset
+    return queryset.filter(status__in=OPEN_STATUSES, overdue_since__isnull=True, is_active=True)
+
+
+def newly_overdue(today):
+    """Open orders past their due date that are not marked yet (a range scan on wo_status_due_idx)."""
+    return WorkOrder.objects.filter(
+        status__in=OPEN_STATUSES, estimated_completion_date__lt=today, overdue_since__isnull=True, is_active=True
+    ).order_by()
+
+
+def overdue_from(due_date):
+    """An order due on ``due_date`` is overdue from the following midnight (local time)."""
+    return timezone.make_aware(datetime.combine(due_date + timedelta(days=1), time.min))
+
+
+# ─────────────────────────────
+# Evaluation
+# ─────────────────────────────
+def _mark(orders, now):
+    """Set ``overdue_since`` on ``orders`` (``(pk, due date)`` pairs): one UPDATE per due date, one signal."""
+    by_due = defaultdict(list)
+    for pk, due in orders:
+        by_due[due].append(pk)
+    ids = [pk for pk, _ in orders]
+    with transaction.atomic():
+        for due, due_ids in by_due.items():
+            WorkOrder._base_manager.filter(pk__in=due_ids, overdue_since__isnull=True).update(
+                overdue_since=overdue_from(due), updated_at=now
+            )
+        work_orders_bulk_updated.send(
+            sender=WorkOrder, ids=ids, fields={"overdue_since", "updated_at"},
+            previous={"overdue_since": dict.fromkeys(ids)},
+        )
+
+
+def evaluate(now=None, batch_size=500, alert=True):
+    """
+    Mark newly overdue orders and unmark the ones no longer late. Returns
+    ``{"overdue": newly marked, "cleared": unmarked, "alerts": emails queued}``.
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    counts = {"overdue": 0, "cleared": 0, "alerts": 0}
+
+    pending = newly_overdue(today)
+    marked = []
+    while batch := list(pending.values_list("pk", "estimated_completion_date")[:batch_size]):
+        _mark(batch, now)
+        marked.extend(pk for pk, _ in batch)
+
+    # due date moved to today or later (or removed) while the order is still open
+    stale = WorkOrder.objects.filter(overdue_since__isnull=False, status__in=OPEN_STATUSES).filter(
+        Q(estimated_completion_date__gte=today) | Q(estimated_completion_date__isnull=True)
+    )
+    counts["cleared"] = stale.bulk_change(overdue_since=None)
+
+    counts["overdue"] = len(marked)
+    if marked or counts["cleared"]:
+        stats.bump_stats_version()  # the dashboard shows overdue counts
+    if alert and marked:
+        counts["alerts"] = send_alerts(marked)
+    return counts
+
+
+# ─────────────────────────────
+# Alerts
+# ─────────────────────────────
+def _digest(orders):
+    lines = [
+        f"{order.work_order_number}  due {order.estimated_completion_date}  "
+        f"{order.product_brand} {order.product_model}  ({order.technician or 'unassigned'})"
+        for order in orders[:ALERT_MAX_LINES]
+    ]
+    if len(orders) > ALERT_MAX_LINES:
+        lines.append(f"... and {len(orders) - ALERT_MAX_LINES} more")
+    return "\n".join(lines)
+
+
+def send_alerts(ids):
+    """Queue one digest for SLA_ALERT_EMAILS and one per technician. Returns the number of emails."""
+    orders = []
+    for start in range(0, len(ids), 500):
+        orders.extend(
+            WorkOrder.objects.filter(pk__in=ids[start:start + 500]).select_related("technician")
+        )
+    orders.sort(key=lambda order: (order.estimated_completion_date, order.work_order_number))
+
+    sent = 0
+    subject = f"{len(orders)} work order(s) are now overdue"
+    for recipient in _setting("SLA_ALERT_EMAILS", []):
+        enqueue_email(recipient, subject, _digest(orders))
+        sent += 1
+    if _setting("SLA_ALERT_TECHNICIANS", True):
+        by_technician = defaultdict(list)
+        for order in orders:
+            if order.technician_id:
+                by_technician[order.technician].append(order)
+        for technician, assigned in by_technician.items():
+            enqueue_email(technician.email, f"{len(assigned)} of your work orders are now overdue", _digest(assigned))
+            sent += 1
+    return sent
+
+
+# ─────────────────────────────
+# Reading
+# ─────────────────────────────
+def overdue_summary():
+    """Overdue counts for the dashboard: total, unassigned and per technician (from the maintained counters)."""
+    by_technician = dict(
+        Technician.objects.filter(overdue_jobs__gt=0).order_by("pk").values_list("pk", "overdue_jobs")
+    )
+    unassigned = overdue_orders().filter(technician__isnull=True).count()
+    return {
+        "total": sum(by_technician.values()) + unassigned,
+        "unassigned": unassigned,
+        "by_technician": by_technician,
+    }
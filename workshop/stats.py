@@ -0,0 +1,164 @@
+# workshop/stats.py
+"""
+Daily rollup behind ``dashboard_summary``.
+
+Single saves adjust one or two buckets with ``F()`` increments; bulk updates
+recompute the days they touched. Every change bumps a cache version so cached
+dashboard responses are never served stale.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyWorkOrderStats, WorkOrder
+
+STATS_VERSION_KEY = "dashboard_stats_version"
+
+
+# ─────────────────────────────
+# Cache version
+# ─────────────────────────────
+def stats_version():
+    return cache.get_or_set(STATS_VERSION_KEY, 1, timeout=None)
+
+
+def bump_stats_version():
+    try:
+        cache.incr(STATS_VERSION_KEY)
+    except ValueError:
+        cache.set(STATS_VERSION_KEY, 1, timeout=None)
+
+
+# ─────────────────────────────
+# Incremental maintenance
+# ─────────────────────────────
+def bucket(created_at, status, technician_id):
+    return (timezone.localdate(created_at), status, technician_id or 0)
+
+
+def apply_deltas(deltas):
+    """
+    ``deltas`` maps ``bucket(...)`` to ``(order_count_delta, revenue_delta)``.
+    """
+    with transaction.atomic():
+        for (day, status, technician_id), (count, revenue) in deltas.items():
+            if not count and not revenue:
+                continue
+            rows = DailyWorkOrderStats.objects.filter(day=day, status=status, technician_id=technician_id)
+            changes = {"order_count": F("order_count") + count, "revenue": F("revenue") + revenue}
+            if rows.update(**changes):
+                continue
+            try:
+                with transaction.atomic():
+                    DailyWorkOrderStats.objects.create(
+                        day=day, status=status, technician_id=technician_id, order_count=count, revenue=revenue
+                    )
+            except IntegrityError:
+                rows.update(**changes)
+    bump_stats_version()
+
+
+def record_change(before, after):
+    """
+    Move one work order between buckets. ``before`` / ``after`` are dicts with
+    created_at, status, technician_id and total_cost, or None for create/delete.
+    """
+    deltas = defaultdict(lambda: [0, Decimal("0")])
+    for state, sign in ((before, -1), (after, 1)):
+        if state is None:
+            continue
+        key = bucket(state["created_at"], state["status"], state["technician_id"])
+        deltas[key][0] += sign
+        deltas[key][1] += sign * (state["total_cost"] or 0)
+    apply_deltas({key: tuple(value) for key, value in deltas.items()})
+
+
+# ─────────────────────────────
+# Rebuild
+# ─────────────────────────────
+def rebuild_days(days=None):
+    """Recompute the rollup for ``days`` (all days when None) from WorkOrder."""
+    orders = WorkOrder.objects.annotate(day=TruncDate("created_at"))
+    existing = DailyWorkOrderStats.objects.all()
+    if days is not None:
+        days = sorted(set(days))
+        if not days:
+            return 0
+        orders = orders.filter(day__in=days)
+        existing = existing.filter(day__in=days)
+
+    rows = (
+        orders.order_by()
+        .values("day", "status", "technician_id")
+        .annotate(order_count=Count("id"), revenue=Sum("total_cost"))
+    )
+    with transaction.atomic():
+        existing.delete()
+        created = DailyWorkOrderStats.objects.bulk_create(
+            (
+                DailyWorkOrderStats(
+                    day=row["day"],
+                    status=row["status"],
+                    technician_id=row["technician_id"] or 0,
+                    order_count=row["order_count"],
+                    revenue=row["revenue"] or 0,
+                )
+                for row in rows.iterator()
+            ),
+            batch_size=1000,
+        )
+    bump_stats_version()
+    return len(created)
+
+
+def refresh_for_work_orders(ids):
+    """Rebuild the days of the given work orders after a bulk ``update()``."""
+    days = set()
+    for start in range(0, len(ids), 500):
+        days.update(
+            WorkOrder.objects.filter(pk__in=ids[start:start + 500])
+            .annotate(day=TruncDate("created_at"))
+            .values_list("day", flat=True)
+            .distinct()
+        )
+    return rebuild_days(days)
+
+
+# ─────────────────────────────
+# Reading
+# ─────────────────────────────
+def summarize(start_date=None, end_date=None):
+    """Totals per status and per technician for work orders created in the range."""
+    rows = DailyWorkOrderStats.objects.all()
+    if start_date:
+        rows = rows.filter(day__gte=start_date)
+    if end_date:
+        rows = rows.filter(day__lte=end_date)
+
+    by_status = {}
+    by_technician = defaultdict(lambda: {"total_orders": 0, "total_revenue": Decimal("0")})
+    grouped = (
+        rows.order_by()
+        .values("status", "technician_id")
+        .annotate(total_orders=Sum("order_count"), total_revenue=Sum("revenue"))
+    )
+    for row in grouped:
+        if not row["total_orders"]:
+            continue
+        status = by_status.setdefault(row["status"], {"total_orders": 0, "total_revenue": Decimal("0")})
+        tech = by_technician[row["technician_id"] or None]
+        for target in (status, tech):
+            target["total_orders"] += row["total_orders"]
+            target["total_revenue"] += row["total_revenue"] or 0
+
+    return {
+        "total_orders": sum(s["total_orders"] for s in by_status.values()),
+        "total_revenue": sum((s["total_revenue"] for s in by_status.values()), Decimal("0")),
+        "by_status": by_status,
+        "by_technician": dict(by_technician),
+    }
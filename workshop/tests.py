@@ -1,3 +1,1686 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection, connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+from . import analytics, cutover, events, outbox, transitions
+from .admin import OverdueFilter, RemoteRequestAdmin, custom_admin_site
+from .exporting import stream_work_orders
+from .imaging import process_batch
+from .importing import WorkOrderImporter, read_rows
+from .metrics import registry as metrics_registry
+from .middleware import ReplicaRoutingMiddleware
+from .models import (
+    WORK_ORDER_NUMBER_MAX,
+    ChunkedUpload,
+    Customer,
+    DailyWorkOrderStats,
+    OutboundMessage,
+    ProductImage,
+    RemoteRequest,
+    Technician,
+    WorkOrder,
+    WorkOrderEvent,
+    WorkOrderSequence,
+    WorkOrderTransition,
+    format_work_order_number,
+)
+from .routers import ReplicaRouter
+from .scheduling import auto_assign, plan, rebuild_workloads
+from .search import search_work_orders
+from .sla import evaluate as evaluate_sla, newly_overdue, overdue_from
+from .stats import rebuild_days, summarize
+from .uploads import purge_stale_uploads
+from .views import WorkOrderViewSet, customer_lookup
+
+
+# ─────────────────────────────
+# Query plans
+# ─────────────────────────────
+class QueryPlanTests(TestCase):
+    """
+    EXPLAIN the hot queries and fail if any of them falls back to a full table scan.
+    PostgreSQL is told to avoid sequential scans so the small test tables behave
+    like production-sized ones; SQLite assumes large tables when it has no stats.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.now().date()
+        tech = Technician.objects.create(first_name="Abebe", last_name="Kebede", email="abebe@example.com")
+        for i in range(20):
+            customer = Customer.objects.create(
+                first_name=f"Customer{i}",
+                last_name="Test",
+                email=f"customer{i}@example.com",
+                phone_number=f"+25191100{i:04d}",
+            )
+            WorkOrder.objects.create(
+                customer=customer,
+                technician=tech,
+                product_brand="Dell",
+                product_model="Latitude",
+                issue_description="Does not boot",
+                estimated_completion_date=today - timedelta(days=i - 10),
+                status=["pending", "in_progress", "completed"][i % 3],
+                is_active=i % 4 != 0,
+            )
+            RemoteRequest.objects.create(
+                customer_name=f"Customer{i} Test",
+                customer_email=f"customer{i}@example.com",
+                customer_phone=f"+25191100{i:04d}",
+                issue_description="Printer setup",
+                status=["pending", "approved"][i % 2],
+            )
+        evaluate_sla(alert=False)
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+
+    def assertNoSeqScan(self, queryset):
+        plan = queryset.explain()
+        if connection.vendor == "postgresql":
+            full_scans = re.findall(r"Seq Scan on (\w+)", plan)
+        else:
+            # "SCAN table" without "USING ... INDEX" reads every row
+            full_scans = re.findall(r"\bSCAN (\w+)\s*$", plan, re.MULTILINE)
+        self.assertEqual(full_scans, [], f"Sequential scan in plan:\n{plan}")
+
+    def test_workorder_api_list(self):
+        viewset = WorkOrderViewSet()
+        queryset = viewset.queryset.order_by(*viewset.ordering)[:10]
+        self.assertNoSeqScan(queryset)
+
+    def test_admin_overdue_filter(self):
+        overdue = OverdueFilter(None, {"overdue": ["yes"]}, WorkOrder, None)
+        queryset = overdue.queryset(None, WorkOrder.objects.all())
+        self.assertTrue(queryset.exists())
+        self.assertNoSeqScan(queryset)
+
+    def test_sla_evaluation(self):
+        self.assertNoSeqScan(newly_overdue(timezone.localdate()))
+
+    def test_admin_remote_request_list(self):
+        model_admin = RemoteRequestAdmin(RemoteRequest, custom_admin_site)
+        queryset = RemoteRequest.objects.filter(status="pending").order_by(*model_admin.ordering)
+        self.assertNoSeqScan(queryset)
+        self.assertNoSeqScan(RemoteRequest.objects.order_by(*model_admin.ordering)[:100])
+
+    def test_landing_search(self):
+        for q in ("0911000003", "+251911000003", "911000003", "Customer3@Example.com", "customer1"):
+            customers = Customer.objects.filter(customer_lookup(q)).values("pk")
+            queryset = WorkOrder.objects.filter(customer__in=customers).order_by("-created_at")
+            self.assertTrue(queryset.exists(), q)
+            self.assertNoSeqScan(queryset)
+
+
+# ─────────────────────────────
+# Work order numbers
+# ─────────────────────────────
+class WorkOrderSequenceTests(TestCase):
+    def test_single_and_block_allocation(self):
+        self.assertEqual(WorkOrderSequence.allocate(2030), [1001])
+        self.assertEqual(WorkOrderSequence.allocate(2030, count=3), [1002, 1003, 1004])
+        self.assertEqual(WorkOrderSequence.allocate(2031), [1001])
+        with self.assertRaises(ValueError):
+            WorkOrderSequence.allocate(2030, count=0)
+
+    def test_seeds_from_existing_numbers(self):
+        customer = Customer.objects.create(first_name="Sara", last_name="Tesfaye", email="sara@example.com")
+        order = WorkOrder.objects.create(customer=customer, product_brand="HP", product_model="X", issue_description="-")
+        WorkOrder.objects.filter(pk=order.pk).update(work_order_number="WO20301500")
+        self.assertEqual(WorkOrderSequence.allocate(2030), [1501])
+        self.assertEqual(format_work_order_number(2030, 1501), "WO2030-1501")
+
+    def test_overflow_does_not_advance_the_sequence(self):
+        WorkOrderSequence.objects.create(year=2030, last_number=WORK_ORDER_NUMBER_MAX - 1)
+        with self.assertRaises(ValueError):
+            WorkOrderSequence.allocate(2030, count=2)
+        self.assertEqual(WorkOrderSequence.objects.get(year=2030).last_number, WORK_ORDER_NUMBER_MAX - 1)
+        self.assertEqual(WorkOrderSequence.allocate(2030), [WORK_ORDER_NUMBER_MAX])
+
+    def test_numbers_of_a_rolled_back_transaction_are_reused(self):
+        WorkOrderSequence.allocate(2030)
+        try:
+            with transaction.atomic():
+                self.assertEqual(WorkOrderSequence.allocate(2030), [1002])
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(WorkOrderSequence.allocate(2030), [1002])
+
+
+# ─────────────────────────────
+# Field tracking
+# ─────────────────────────────
+class WorkOrderTrackingTests(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create(first_name="Sara", last_name="Tesfaye", email="sara@example.com")
+        self.workorder = WorkOrder.objects.create(
+            customer=customer, product_brand="HP", product_model="EliteBook", issue_description="No display"
+        )
+
+    def test_dirty_fields(self):
+        workorder = WorkOrder.objects.get(pk=self.workorder.pk)
+        self.assertEqual(workorder.get_dirty_fields(), {})
+        workorder.status = "in_progress"
+        self.assertTrue(workorder.has_changed("status"))
+        self.assertEqual(workorder.previous_value("status"), "pending")
+        workorder.save()
+        self.assertFalse(workorder.has_changed("status"))
+
+    def test_save_writes_only_changed_columns_without_reloading(self):
+        workorder = WorkOrder.objects.get(pk=self.workorder.pk)
+        workorder.is_repaired = True
+        with CaptureQueriesContext(connection) as ctx:
+            workorder.save()
+        self.assertEqual(len(ctx.captured_queries), 1)
+        sql = ctx.captured_queries[0]["sql"]
+        self.assertTrue(sql.startswith("UPDATE"))
+        self.assertIn('"is_repaired"', sql)
+        self.assertIn('"updated_at"', sql)
+        self.assertNotIn('"status"', sql)
+
+
+# ─────────────────────────────
+# Bulk status transitions
+# ─────────────────────────────
+class BulkTransitionTests(TestCase):
+    def setUp(self):
+        cache.clear()  # status email rate-limit keys
+
+    def create_orders(self, count, offset=0):
+        for i in range(offset, offset + count):
+            customer = Customer.objects.create(first_name="Bulk", last_name=str(i), email=f"bulk{i}@example.com")
+            WorkOrder.objects.create(
+                customer=customer, product_brand="Lenovo", product_model="T14", issue_description="Fan noise"
+            )
+
+    def test_transition_reports_previous_status_and_notifies(self):
+        self.create_orders(3)
+        WorkOrder.objects.filter(customer__email="bulk0@example.com").update(status="completed")
+
+        changed = WorkOrder.objects.all().transition_status("completed")
+
+        self.assertEqual(sorted(status for _, status in changed), ["pending", "pending"])
+        self.assertEqual(WorkOrder.objects.exclude(status="completed").count(), 0)
+        self.assertEqual(OutboundMessage.objects.filter(channel="email").count(), 2)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.create_orders(2)
+        with CaptureQueriesContext(connection) as small:
+            WorkOrder.objects.all().transition_status("in_progress")
+        self.create_orders(20, offset=2)
+        with CaptureQueriesContext(connection) as large:
+            WorkOrder.objects.all().transition_status("completed")
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_api_bulk_update_counts_matched_rows(self):
+        self.create_orders(3)
+        tech = Technician.objects.create(first_name="Abel", last_name="Tech", email="abel@example.com")
+        WorkOrder.objects.filter(customer__email="bulk0@example.com").update(status="completed")
+        ids = list(WorkOrder.objects.values_list("pk", flat=True))
+        for changes in ({"status": "completed"}, {"status": "completed", "technician_id": tech.pk}):
+            response = self.client.post(
+                "/api/workorders/bulk_update/", {"ids": ids, **changes}, content_type="application/json"
+            )
+            # one order was already completed; it still counts
+            self.assertEqual(response.data, {"updated_records": 3})
+        self.assertEqual(WorkOrder.objects.filter(status="completed", technician=tech).count(), 3)
+
+
+# ─────────────────────────────
+# Outbox worker
+# ─────────────────────────────
+@override_settings(OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_BASE_SECONDS=30, OUTBOX_RATE_LIMIT=2, OUTBOX_RATE_WINDOW=3600)
+class OutboxTests(TestCase):
+    def setUp(self):
+        cache.clear()  # rate-limit counters
+
+    def enqueue(self, count, recipient="hana@example.com"):
+        return [outbox.enqueue_email(recipient, f"Update {i}", "Body", "<p>Body</p>") for i in range(count)]
+
+    def failing_send(self, failures):
+        """EmailMultiAlternatives.send that raises for the first ``failures`` calls."""
+        real_send = EmailMultiAlternatives.send
+        calls = []
+
+        def send(message, *args, **kwargs):
+            calls.append(message)
+            if len(calls) <= failures:
+                raise SMTPException("421 try again later")
+            return real_send(message, *args, **kwargs)
+
+        return mock.patch.object(EmailMultiAlternatives, "send", send)
+
+    def test_batch_is_sent_over_one_connection(self):
+        self.enqueue(2)
+        outbox.enqueue_email("ruth@example.com", "Update", "Body")
+        with mock.patch("workshop.outbox.get_connection", wraps=get_connection) as connections_opened:
+            counts = outbox.process_batch()
+        self.assertEqual(counts, {"sent": 3, "retried": 0, "failed": 0, "deferred": 0})
+        self.assertEqual(connections_opened.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
+        self.assertEqual(set(OutboundMessage.objects.values_list("status", "attempts")), {("sent", 1)})
+
+    def test_failures_back_off_then_give_up(self):
+        self.assertEqual([outbox.retry_delay(n).total_seconds() for n in (1, 2, 3)], [30, 60, 120])
+        [message] = self.enqueue(1)
+        with self.failing_send(2):
+            self.assertEqual(outbox.process_batch()["retried"], 1)
+            message.refresh_from_db()
+            self.assertEqual((message.status, message.attempts), ("pending", 1))
+            self.assertIn("421", message.last_error)
+            self.assertAlmostEqual((message.next_attempt_at - timezone.now()).total_seconds(), 30, delta=5)
+            # not due again until the backoff has passed
+            self.assertEqual(outbox.process_batch(), {"sent": 0, "retried": 0, "failed": 0, "deferred": 0})
+
+            OutboundMessage.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(outbox.process_batch()["failed"], 1)
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ("failed", 2))
+        self.assertEqual(mail.outbox, [])
+
+    def test_rate_limit_defers_and_counts_only_sent_messages(self):
+        self.enqueue(4)
+        with self.failing_send(1):
+            counts = outbox.process_batch()
+        # the failed attempt did not use up quota: two of the other three went out
+        self.assertEqual(counts, {"sent": 2, "retried": 1, "failed": 0, "deferred": 1})
+        self.assertEqual(len(mail.outbox), 2)
+        deferred = OutboundMessage.objects.get(status="pending", attempts=0)
+        self.assertGreater(deferred.next_attempt_at, timezone.now() + timedelta(minutes=59))
+        # other recipients are not held back
+        outbox.enqueue_email("ruth@example.com", "Update", "Body")
+        self.assertEqual(outbox.process_batch()["sent"], 1)
+
+
+# ─────────────────────────────
+# Dashboard rollup
+# ─────────────────────────────
+class DashboardStatsTests(TestCase):
+    def rollup(self):
+        return sorted(
+            DailyWorkOrderStats.objects.filter(order_count__gt=0).values_list(
+                "day", "status", "technician_id", "order_count", "revenue"
+            )
+        )
+
+    def test_incremental_rollup_matches_rebuild(self):
+        tech = Technician.objects.create(first_name="Lidya", last_name="Haile", email="lidya@example.com")
+        customer = Customer.objects.create(first_name="Dawit", last_name="Alemu", email="dawit@example.com")
+        orders = [
+            WorkOrder.objects.create(
+                customer=customer, product_brand="Apple", product_model="iPhone", issue_description="Battery"
+            )
+            for _ in range(4)
+        ]
+        first = WorkOrder.objects.get(pk=orders[0].pk)
+        first.status = "completed"
+        first.total_cost = 120
+        first.technician = tech
+        first.save()
+        orders[1].delete()
+        WorkOrder.objects.filter(pk=orders[2].pk).transition_status("in_progress", notify=False)
+        WorkOrder.objects.filter(pk=orders[3].pk).bulk_change(technician=tech)
+
+        incremental = self.rollup()
+        rebuild_days()
+        self.assertEqual(incremental, self.rollup())
+
+    def test_dashboard_summary(self):
+        customer = Customer.objects.create(first_name="Dawit", last_name="Alemu", email="dawit@example.com")
+        WorkOrder.objects.create(
+            customer=customer, product_brand="Apple", product_model="iPhone", issue_description="Battery",
+            status="completed", total_cost=80,
+        )
+        self.assertEqual(self.client.get("/api/dashboard-summary/").status_code, 403)
+        self.client.force_login(User.objects.create_user("staff", password="pw", is_staff=True))
+        response = self.client.get("/api/dashboard-summary/", {"customer_limit": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_orders"], 1)
+        self.assertEqual(response.data["completed_orders"], 1)
+        self.assertEqual(response.data["total_revenue"], 80)
+        self.assertEqual(len(response.data["cost_per_customer"]), 1)
+        response = self.client.get("/api/dashboard-summary/", {"start_date": "2025-02-30"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("start_date", response.data["detail"])
+
+
+    def test_moving_an_order_to_another_customer_refreshes_the_summary(self):
+        cache.clear()
+        dawit = Customer.objects.create(first_name="Dawit", last_name="Alemu", email="dawit@example.com")
+        hana = Customer.objects.create(first_name="Hana", last_name="Girma", email="hana@example.com")
+        order = WorkOrder.objects.create(
+            customer=dawit, product_brand="Apple", product_model="iPhone", issue_description="Battery",
+        )
+        self.client.force_login(User.objects.create_user("staff", password="pw", is_staff=True))
+
+        def customers():
+            rows = self.client.get("/api/dashboard-summary/").data["cost_per_customer"]
+            return [row["customer_id"] for row in rows]
+
+        self.assertEqual(customers(), [dawit.pk])
+        order = WorkOrder.objects.get(pk=order.pk)
+        order.customer = hana
+        order.save()
+        self.assertEqual(customers(), [hana.pk])
+        WorkOrder.objects.filter(pk=order.pk).bulk_change(customer=dawit)
+        self.assertEqual(customers(), [dawit.pk])
+
+# ─────────────────────────────
+# Technician workload / auto-assignment
+# ─────────────────────────────
+class TechnicianWorkloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.techs = [
+            Technician.objects.create(first_name=name, last_name="Tech", email=f"{name}@example.com")
+            for name in ("abel", "bethel", "chala")
+        ]
+        self.customer = Customer.objects.create(first_name="Dawit", last_name="Alemu", email="dawit@example.com")
+
+    def create_order(self, **fields):
+        return WorkOrder.objects.create(
+            customer=self.customer, product_brand="Apple", product_model="iPhone", issue_description="Battery",
+            **fields,
+        )
+
+    def open_jobs(self):
+        return list(Technician.objects.order_by("pk").values_list("open_jobs", flat=True))
+
+    def test_counter_follows_saves_and_bulk_updates(self):
+        abel, bethel, _ = self.techs
+        orders = [self.create_order(technician=abel) for _ in range(3)]
+        self.create_order(technician=bethel, status="completed")
+        self.assertEqual(self.open_jobs(), [3, 0, 0])
+
+        first = WorkOrder.objects.get(pk=orders[0].pk)
+        first.technician = bethel
+        first.save()
+        orders[1].delete()
+        WorkOrder.objects.filter(pk=orders[2].pk).transition_status("completed", notify=False)
+        self.assertEqual(self.open_jobs(), [0, 1, 0])
+
+        WorkOrder.objects.filter(technician=bethel).bulk_change(is_active=False)
+        WorkOrder.objects.filter(pk=orders[2].pk).transition_status("in_progress", notify=False)
+        self.assertEqual(self.open_jobs(), [1, 0, 0])
+        rebuild_workloads()
+        self.assertEqual(self.open_jobs(), [1, 0, 0])
+
+    def test_auto_assign_balances_by_load_and_due_date(self):
+        abel, bethel, chala = self.techs
+        for _ in range(2):
+            self.create_order(technician=abel)
+        today = timezone.localdate()
+        urgent = self.create_order(estimated_completion_date=today)
+        later = self.create_order(estimated_completion_date=today + timedelta(days=5))
+        undated = [self.create_order() for _ in range(3)]
+        done = self.create_order(status="completed")
+
+        ids = [urgent.pk, later.pk, done.pk] + [order.pk for order in undated]
+        with CaptureQueriesContext(connection) as queries:
+            assignments = auto_assign(WorkOrder.objects.filter(pk__in=ids))
+
+        # bethel and chala start empty: the most urgent orders go to them, abel joins at load 2
+        self.assertEqual(assignments[bethel.pk][0], urgent.pk)
+        self.assertEqual(assignments[chala.pk][0], later.pk)
+        self.assertEqual(sum(len(order_ids) for order_ids in assignments.values()), 5)
+        self.assertIsNone(WorkOrder.objects.get(pk=done.pk).technician_id)
+        self.assertEqual(sorted(self.open_jobs()), [2, 2, 3])
+        self.assertLess(len(queries.captured_queries), 60)  # per technician, not per order
+
+    def test_plan_is_a_min_heap_by_load(self):
+        self.assertEqual(plan([1, 2, 3, 4], {10: 2, 20: 0, 30: 1}), {20: [1, 2], 30: [3], 10: [4]})
+        self.assertEqual(plan([1], {}), {})
+
+    def test_api_and_landing_bulk_actions(self):
+        orders = [self.create_order() for _ in range(4)]
+        response = self.client.post(
+            "/api/workorders/auto_assign/",
+            {"ids": [order.pk for order in orders[:3]], "technician_ids": [self.techs[0].pk, self.techs[1].pk]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["assigned_records"], 3)
+        self.assertEqual(self.open_jobs(), [2, 1, 0])
+        for technician_ids in (5, ["x"]):
+            response = self.client.post(
+                "/api/workorders/auto_assign/", {"ids": [orders[3].pk], "technician_ids": technician_ids},
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("technician_ids", response.data)
+
+        staff = User.objects.create_superuser("boss", "boss@example.com", "pw")
+        self.client.force_login(staff)
+        self.client.post("/bulk-update/", {"workorder_ids": [orders[3].pk], "bulk_action": "auto_assign"})
+        self.assertEqual(WorkOrder.objects.get(pk=orders[3].pk).technician_id, self.techs[2].pk)
+
+
+# ─────────────────────────────
+# SLA evaluation
+# ─────────────────────────────
+@override_settings(SLA_ALERT_EMAILS=["manager@example.com"], SLA_ALERT_TECHNICIANS=True)
+class SlaEvaluationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tech = Technician.objects.create(first_name="Abel", last_name="Tech", email="abel@example.com")
+        customer = Customer.objects.create(first_name="Dawit", last_name="Alemu", email="dawit@example.com")
+        self.today = timezone.localdate()
+
+        def order(days, **fields):
+            return WorkOrder.objects.create(
+                customer=customer, product_brand="HP", product_model="EliteBook", issue_description="No power",
+                estimated_completion_date=self.today + timedelta(days=days), **fields,
+            )
+
+        self.late = order(-3, technician=self.tech)
+        self.late_unassigned = order(-1)
+        self.due_today = order(0, technician=self.tech)
+        self.done = order(-5, technician=self.tech, status="completed")
+        self.archived = order(-5, technician=self.tech, is_active=False)
+
+    def overdue_jobs(self):
+        return Technician.objects.get(pk=self.tech.pk).overdue_jobs
+
+    def test_marks_only_newly_overdue_orders_and_alerts_once(self):
+        counts = evaluate_sla()
+        self.assertEqual(counts, {"overdue": 2, "cleared": 0, "alerts": 2})  # manager digest + Abel's
+        self.late.refresh_from_db()
+        self.assertEqual(self.late.overdue_since, overdue_from(self.late.estimated_completion_date))
+        marked = set(WorkOrder.objects.filter(overdue_since__isnull=False).values_list("pk", flat=True))
+        self.assertEqual(marked, {self.late.pk, self.late_unassigned.pk})
+        self.assertEqual(self.overdue_jobs(), 1)
+        digest = OutboundMessage.objects.get(recipient="manager@example.com")
+        self.assertIn(self.late_unassigned.work_order_number, digest.body)
+
+        self.assertEqual(evaluate_sla(), {"overdue": 0, "cleared": 0, "alerts": 0})
+        self.assertEqual(OutboundMessage.objects.count(), 2)
+
+    def test_counters_follow_changes_and_due_dates_moving(self):
+        evaluate_sla(alert=False)
+        WorkOrder.objects.filter(pk=self.late.pk).transition_status("completed", notify=False)
+        self.assertEqual(self.overdue_jobs(), 0)
+        WorkOrder.objects.filter(pk=self.late.pk).transition_status("in_progress", notify=False)
+        self.assertEqual(self.overdue_jobs(), 1)
+
+        order = WorkOrder.objects.get(pk=self.late.pk)
+        order.estimated_completion_date = self.today + timedelta(days=2)
+        order.save()
+        self.assertEqual(evaluate_sla(alert=False)["cleared"], 1)
+        self.assertEqual(self.overdue_jobs(), 0)
+        rebuild_workloads()
+        self.assertEqual(self.overdue_jobs(), 0)
+
+    def test_admin_filter_and_dashboard_read_the_marks(self):
+        overdue = OverdueFilter(None, {"overdue": ["yes"]}, WorkOrder, None)
+        self.assertFalse(overdue.queryset(None, WorkOrder.objects.all()).exists())
+        evaluate_sla(alert=False)
+        self.assertEqual(
+            set(overdue.queryset(None, WorkOrder.objects.all()).values_list("pk", flat=True)),
+            {self.late.pk, self.late_unassigned.pk},
+        )
+        # the same active, open orders; completed and archived ones are in neither list
+        on_time = OverdueFilter(None, {"overdue": ["no"]}, WorkOrder, None)
+        self.assertEqual(
+            set(on_time.queryset(None, WorkOrder.objects.all()).values_list("pk", flat=True)), {self.due_today.pk}
+        )
+        self.client.force_login(User.objects.create_user("staff", password="pw", is_staff=True))
+        data = self.client.get("/api/dashboard-summary/").data
+        self.assertEqual(data["overdue_orders"], 2)
+        self.assertEqual(data["overdue_unassigned"], 1)
+        self.assertEqual(data["overdue_by_technician"], [{"technician_id": self.tech.pk, "overdue_orders": 1}])
+
+
+# ─────────────────────────────
+# Work order history
+# ─────────────────────────────
+class WorkOrderTransitionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tech = Technician.objects.create(first_name="Abel", last_name="Tech", email="abel@example.com")
+        self.customer = Customer.objects.create(first_name="Dawit", last_name="Alemu", email="dawit@example.com")
+
+    def create_order(self, **fields):
+        return WorkOrder.objects.create(
+            customer=self.customer, product_brand="HP", product_model="EliteBook", issue_description="No power",
+            **fields,
+        )
+
+    def inserts(self, queries):
+        table = WorkOrderTransition._meta.db_table
+        return [q for q in queries.captured_queries if q["sql"].startswith(f'INSERT INTO "{table}"')]
+
+    def test_changes_are_encoded_and_written_once_per_transaction(self):
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                order = self.create_order(estimated_cost=Decimal("1500.50"))
+                order.status = "in_progress"
+                order.technician = self.tech
+                order.save()
+                order.total_cost = Decimal("1420")
+                order.status = "completed"
+                order.save()
+        self.assertEqual(len(self.inserts(queries)), 1)
+
+        row = WorkOrderTransition.objects.get(work_order_id=order.pk, field=transitions.ESTIMATED_COST)
+        self.assertEqual((row.old_value, row.new_value), (None, 150050))
+        self.assertEqual(
+            [(entry["field"], entry["old"], entry["new"], entry["actor"]) for entry in transitions.history(order.pk)],
+            [
+                ("status", None, "pending", "system"),
+                ("estimated_cost", None, Decimal("1500.50"), "system"),
+                ("status", "pending", "in_progress", "system"),
+                ("technician", None, self.tech.pk, "system"),
+                ("status", "in_progress", "completed", "system"),
+                ("total_cost", None, Decimal("1420"), "system"),
+            ],
+        )
+
+    def test_rolled_back_savepoint_is_not_logged(self):
+        order = self.create_order()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                WorkOrder.objects.filter(pk=order.pk).bulk_change(technician_id=self.tech.pk)
+                try:
+                    with transaction.atomic():
+                        WorkOrder.objects.filter(pk=order.pk).transition_status("cancelled", notify=False)
+                        raise ValueError
+                except ValueError:
+                    pass
+                WorkOrder.objects.filter(pk=order.pk).bulk_change(customer_collected=True)
+        fields = list(WorkOrderTransition.objects.filter(work_order_id=order.pk).values_list("field", flat=True))
+        self.assertEqual(fields, [transitions.TECHNICIAN, transitions.COLLECTED])
+
+    def test_changes_after_a_flush_start_a_new_batch(self):
+        for status in ("in_progress", "completed"):
+            with self.captureOnCommitCallbacks(execute=True):
+                WorkOrder.objects.filter(pk=self.create_order().pk).bulk_change(status=status)
+        statuses = WorkOrderTransition.objects.filter(field=transitions.STATUS).order_by("work_order_id", "id")
+        self.assertEqual(list(statuses.values_list("new_value", flat=True)), [1, 2, 1, 3])
+
+    def test_api_history_records_the_actor(self):
+        staff = User.objects.create_superuser("boss", "boss@example.com", "pw")
+        self.client.force_login(staff)
+        with self.captureOnCommitCallbacks(execute=True):
+            order = self.create_order()
+            self.client.post(f"/api/workorders/{order.pk}/mark_repaired/")
+        history = self.client.get(f"/api/workorders/{order.pk}/history/").data
+        self.assertEqual(history[-1]["new"], "completed")
+        self.assertEqual((history[-1]["actor"], history[-1]["user"]), ("api", staff.pk))
+
+    def test_metrics_from_one_pass(self):
+        start = timezone.now() - timedelta(days=3)
+        changes = []
+        for i, order in enumerate([self.create_order() for _ in range(2)]):
+            WorkOrderTransition.objects.filter(work_order_id=order.pk).delete()
+            changes += [
+                (order.pk, start, None, 1),
+                (order.pk, start + timedelta(hours=10), 1, 2),
+                (order.pk, start + timedelta(hours=10 + 20 * (i + 1)), 2, 3),
+            ]
+        WorkOrderTransition.objects.bulk_create(
+            WorkOrderTransition(
+                month=at.year * 100 + at.month, work_order_id=pk, field=transitions.STATUS, old_value=old,
+                new_value=new, at=at,
+            )
+            for pk, at, old, new in changes
+        )
+        metrics = transitions.transition_metrics()
+        self.assertEqual(metrics["turnaround"]["count"], 2)
+        self.assertEqual(metrics["turnaround"]["mean_hours"], 40)
+        self.assertEqual(metrics["time_in_status"]["pending"]["mean_hours"], 10)
+        self.assertEqual(metrics["time_in_status"]["in_progress"]["p90_hours"], 40)
+
+        out = io.StringIO()
+        call_command("work_order_metrics", stdout=out)
+        self.assertIn("turnaround", out.getvalue())
+
+
+# ─────────────────────────────
+# Analytics
+# ─────────────────────────────
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tech = Technician.objects.create(first_name="Abel", last_name="Tech", email="abel@example.com")
+        customer = Customer.objects.create(first_name="Dawit", last_name="Alemu", email="dawit@example.com")
+        self.finished = timezone.now() - timedelta(hours=10)
+
+        def order(brand, hours=0, **fields):
+            created = WorkOrder.objects.create(
+                customer=customer, product_brand=brand, product_model="X", issue_description="Broken",
+            )
+            # created_at / updated_at are automatic, so set them (and the rest) afterwards
+            WorkOrder.objects.filter(pk=created.pk).update(
+                created_at=self.finished - timedelta(hours=hours), updated_at=self.finished, **fields
+            )
+
+        # no completion in the history here: turnaround falls back to updated_at
+        with self.captureOnCommitCallbacks(execute=True):
+            order("HP", 20, technician=self.tech, status="completed", is_repaired=True,
+                  estimated_cost=Decimal("100"), total_cost=Decimal("120"))
+            order("hp ", 10, technician=self.tech, status="completed", is_repaired=True,
+                  estimated_cost=Decimal("200"), total_cost=Decimal("200"))
+            order("HP")
+            order("Apple", status="cancelled", estimated_cost=Decimal("50"))
+            order("Apple", technician=self.tech)
+
+    def test_grouped_figures_and_weekly_revenue(self):
+        result = analytics.compute()
+        overall = result["overall"]
+        self.assertEqual((overall["orders"], overall["completed"]), (5, 2))
+        self.assertEqual(overall["repair_success_rate"], 0.667)  # 2 of 3 closed orders
+        self.assertEqual(overall["turnaround_hours"], {"count": 2, "mean": 15.0, "p50": 20.0, "p90": 20.0})
+        accuracy = overall["estimate_accuracy"]
+        self.assertEqual((accuracy["estimated"], accuracy["actual"]), (Decimal("300.00"), Decimal("320.00")))
+        self.assertEqual((accuracy["count"], accuracy["mean"], accuracy["p50"]), (2, 1.1, 1.2))
+
+        self.assertEqual([row["brand"] for row in result["by_brand"]], ["HP", "Apple"])  # "hp " is HP
+        self.assertEqual(result["by_brand"][0]["completed"], 2)
+        self.assertEqual(
+            [(row["technician_id"], row["orders"]) for row in result["by_technician"]], [(None, 2), (self.tech.pk, 3)]
+        )
+        day = timezone.localdate(self.finished)
+        self.assertEqual(result["weekly_revenue"], [{
+            "week": (day - timedelta(days=day.weekday())).isoformat(),
+            "completed_orders": 2,
+            "revenue": Decimal("320.00"),
+        }])
+
+    def test_turnaround_ends_at_the_logged_completion(self):
+        order = WorkOrder.objects.get(product_brand="Apple", technician=self.tech)
+        order.status = "completed"
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+        # marked collected a day later: updated_at moves, the completion time does not
+        WorkOrder.objects.filter(pk=order.pk).update(
+            created_at=timezone.now() - timedelta(hours=5), updated_at=timezone.now() + timedelta(days=1),
+        )
+        columns = analytics.load_columns(WorkOrder.objects.filter(pk=order.pk))
+        self.assertAlmostEqual((columns.finished[0] - columns.created[0]) / 3600, 5, places=1)
+        turnaround = analytics.compute()["overall"]["turnaround_hours"]
+        self.assertEqual((turnaround["count"], turnaround["p90"]), (3, 20.0))
+
+    def test_endpoint_is_staff_only_and_cached(self):
+        self.assertEqual(self.client.get("/api/analytics/").status_code, 403)
+        staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get("/api/analytics/", {"end_date": "2026-02-30"}).status_code, 400)
+        response = self.client.get("/api/analytics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["work_orders"], 5)
+        with self.assertNumQueries(0):
+            analytics.summary()
+        start = (timezone.localdate() + timedelta(days=1)).isoformat()
+        self.assertEqual(self.client.get("/api/analytics/", {"start_date": start}).data["work_orders"], 0)
+
+    def test_benchmark_runs_on_synthetic_columns(self):
+        out = io.StringIO()
+        call_command("benchmark_analytics", rows=2000, repeat=1, database=True, stdout=out)
+        self.assertIn("synthetic: analyzed 2000 rows", out.getvalue())
+        self.assertIn("database: analyzed 5 rows", out.getvalue())
+
+
+# ─────────────────────────────
+# Cursor pagination / export
+# ─────────────────────────────
+class WorkOrderExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        customer = Customer.objects.create(first_name="Hana", last_name="Girma", email="hana@example.com")
+        for i in range(5):
+            WorkOrder.objects.create(
+                customer=customer, product_brand="Acer", product_model=f"Aspire {i}", issue_description="Keyboard",
+                status="completed" if i % 2 else "pending",
+            )
+
+    def test_cursor_pagination_walks_all_rows(self):
+        seen = []
+        url = "/api/workorders/?pagination=cursor&page_size=2"
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(row["id"] for row in data["results"])
+            url = data["next"]
+        self.assertEqual(seen, list(WorkOrder.objects.order_by("-created_at", "-id").values_list("id", flat=True)))
+
+    def test_export_honours_filters(self):
+        response = self.client.get("/api/workorders/export/", {"status": "completed"})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual({json.loads(line)["status"] for line in lines}, {"completed"})
+
+        response = self.client.get("/api/workorders/export/", {"export_format": "csv"})
+        rows = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(len(rows), 6)  # header + 5
+
+
+class WorkOrderImportTests(TestCase):
+    def import_text(self, text, import_format="csv", **kwargs):
+        errors = []
+        importer = WorkOrderImporter(on_error=lambda line, message: errors.append(line), **kwargs)
+        counts = importer.run(read_rows(io.StringIO(text), import_format))
+        return counts, errors
+
+    def test_export_round_trip(self):
+        customer = Customer.objects.create(first_name="Hana", last_name="Girma", email="hana@example.com")
+        for i in range(3):
+            WorkOrder.objects.create(
+                customer=customer, product_brand="Acer", product_model=f"Aspire {i}", issue_description="Keyboard",
+                status="completed", total_cost=100,
+            )
+        WorkOrder.objects.update(created_at=timezone.now() - timedelta(days=30))
+        exported = "".join(stream_work_orders(WorkOrder.objects.order_by("pk"), "csv"))
+        before = list(WorkOrder.objects.order_by("pk").values_list("work_order_number", "created_at", "product_model"))
+        WorkOrder.objects.all().delete()
+        Customer.objects.all().delete()
+        DailyWorkOrderStats.objects.all().delete()
+
+        counts, errors = self.import_text(exported, batch_size=2)
+
+        self.assertEqual((counts["imported"], counts["customers"], errors), (3, 1, []))
+        after = list(WorkOrder.objects.order_by("pk").values_list("work_order_number", "created_at", "product_model"))
+        self.assertEqual(after, before)
+        self.assertEqual(Customer.objects.get().email_normalized, "hana@example.com")
+        self.assertEqual(search_work_orders(WorkOrder.objects.all(), "aspire hana").count(), 3)
+        self.assertEqual(summarize()["total_revenue"], 300)
+
+        # importing the same file again only skips; a new order still gets a fresh number
+        counts, _ = self.import_text(exported)
+        self.assertEqual((counts["imported"], counts["skipped"]), (0, 3))
+        order = WorkOrder.objects.create(
+            customer=Customer.objects.get(), product_brand="HP", product_model="X", issue_description="-"
+        )
+        self.assertNotIn(order.work_order_number, [number for number, _, _ in before])
+
+    def test_ndjson_dedupes_customers_and_numbers_in_blocks(self):
+        rows = [
+            {"customer_email": "Abel@Example.com", "product_brand": "Dell", "product_model": "XPS", "status": "pending"},
+            {"customer_email": "abel@example.com", "product_brand": "Dell", "product_model": "XPS 2"},
+            {"customer_email": "ruth@example.com", "product_brand": "HP", "product_model": "Envy", "status": "lost"},
+            {"customer_email": "", "product_brand": "HP", "product_model": "Envy"},
+        ]
+        counts, errors = self.import_text("".join(json.dumps(row) + "\n" for row in rows), "ndjson")
+
+        self.assertEqual((counts["imported"], counts["customers"], errors), (2, 1, [3, 4]))
+        numbers = sorted(WorkOrder.objects.values_list("work_order_number", flat=True))
+        year = timezone.now().year
+        self.assertEqual(numbers, [f"WO{year}-1001", f"WO{year}-1002"])
+        self.assertFalse(Customer.objects.filter(email="ruth@example.com").exists())
+
+    def test_numbered_and_unnumbered_rows_never_collide(self):
+        def row(number=""):
+            return {"customer_email": "abel@example.com", "product_brand": "Dell", "product_model": "XPS",
+                    "work_order_number": number, "created_at": "2025-03-01T10:00:00"}
+
+        # unnumbered rows in the same batch as WO2025-1001 are numbered after it
+        counts, errors = self.import_text("".join(json.dumps(r) + "\n" for r in [row("WO2025-1001"), row()]), "ndjson")
+        self.assertEqual((counts["imported"], errors), (2, []))
+        self.assertEqual(
+            sorted(WorkOrder.objects.values_list("work_order_number", flat=True)), ["WO2025-1001", "WO2025-1002"]
+        )
+
+        # a later batch bringing a number an earlier batch handed out keeps it; the earlier row is renumbered
+        rows = [row(), row(), row("WO2025-1004"), row("WO2025-1003")]
+        counts, errors = self.import_text("".join(json.dumps(r) + "\n" for r in rows), "ndjson", batch_size=1)
+        self.assertEqual((counts["imported"], counts["skipped"], errors), (4, 0, []))
+        numbers = list(WorkOrder.objects.values_list("work_order_number", flat=True))
+        self.assertEqual(len(numbers), len(set(numbers)))
+        self.assertTrue({"WO2025-1003", "WO2025-1004"} <= set(numbers))
+        self.assertEqual(WorkOrder.objects.filter(work_order_number__startswith="WO2025").count(), 6)
+        self.assertEqual(search_work_orders(WorkOrder.objects.all(), "WO2025-1005").count(), 1)
+        self.assertEqual(WorkOrderSequence.objects.get(year=2025).last_number, 1006)
+
+
+# ─────────────────────────────
+# Replica routing
+# ─────────────────────────────
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaRoutingTests(SimpleTestCase):
+    """Routing decisions only; no replica database is opened."""
+
+    def run_request(self, method, view, **cookies):
+        request = getattr(RequestFactory(), method)("/")
+        request.COOKIES.update(cookies)
+        seen = []
+        response = ReplicaRoutingMiddleware(lambda request: view(seen) or HttpResponse())(request)
+        return seen, response
+
+    def test_reads_go_to_replica_until_first_write(self):
+        router = ReplicaRouter()
+
+        def view(seen):
+            seen.append(router.db_for_read(WorkOrder))
+            seen.append(router.db_for_write(WorkOrder))
+            seen.append(router.db_for_read(WorkOrder))
+
+        seen, response = self.run_request("get", view)
+        self.assertEqual(seen, ["replica1", "default", "default"])
+        self.assertIn("db_primary", response.cookies)
+        self.assertEqual(router.db_for_read(WorkOrder), "default")  # outside a request
+
+    def test_unsafe_methods_and_pinned_clients_use_primary(self):
+        router = ReplicaRouter()
+        view = lambda seen: seen.append(router.db_for_read(WorkOrder))
+        self.assertEqual(self.run_request("post", view)[0], ["default"])
+        self.assertEqual(self.run_request("get", view, db_primary="1")[0], ["default"])
+        seen, response = self.run_request("get", view)
+        self.assertEqual(seen, ["replica1"])
+        self.assertNotIn("db_primary", response.cookies)
+
+
+# ─────────────────────────────
+# List endpoint query counts
+# ─────────────────────────────
+class ListQueryCountTests(TestCase):
+    """List endpoints must cost the same number of queries however many rows a page holds."""
+
+    def create_orders(self, count):
+        tech = Technician.objects.create(first_name="Yonas", last_name="Bekele", email=f"yonas{count}@example.com")
+        for i in range(count):
+            customer = Customer.objects.create(first_name="Q", last_name=str(i), email=f"q{count}-{i}@example.com")
+            workorder = WorkOrder.objects.create(
+                customer=customer, technician=tech, product_brand="Asus", product_model="Zenbook",
+                issue_description="Hinge",
+            )
+            for n in range(2):
+                ProductImage.objects.create(work_order=workorder, image=f"workorder_images/{workorder.pk}-{n}.jpg")
+
+    def list_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assertConstantQueries(self, url, small=2, large=8):
+        self.create_orders(small)
+        baseline = self.list_queries(url)
+        self.create_orders(large - small)
+        self.assertEqual(self.list_queries(url), baseline)
+
+    def test_workorder_list(self):
+        self.assertConstantQueries("/api/workorders/")
+
+    def test_workorder_cursor_list(self):
+        self.assertConstantQueries("/api/workorders/?pagination=cursor&page_size=50")
+
+    def test_customer_list(self):
+        self.assertConstantQueries("/api/customers/")
+
+    def test_image_list(self):
+        self.assertConstantQueries("/api/images/")
+
+
+# ─────────────────────────────
+# Request metrics
+# ─────────────────────────────
+@override_settings(METRICS_TOKEN="scrape-me", METRICS_SERVER_TIMING=True)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        metrics_registry.reset()
+
+    def scrape(self):
+        response = self.client.get("/metrics/", HTTP_AUTHORIZATION="Bearer scrape-me")
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_records_queries_and_templates_per_view(self):
+        Customer.objects.create(first_name="Selam", last_name="Tadesse", email="selam@example.com")
+        response = self.client.get("/?q=Selam")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=', response["Server-Timing"])
+
+        body = self.scrape()
+        labels = 'view="workshop:landing",method="GET"'
+        self.assertIn(f'workshop_http_requests_total{{{labels},status="200"}} 1', body)
+        self.assertIn(f"workshop_http_request_duration_seconds_count{{{labels}}} 1", body)
+        queries = re.search(rf"workshop_db_queries_total{{{labels}}} (\d+)", body)
+        self.assertGreater(int(queries.group(1)), 0)
+        render = re.search(rf"workshop_template_render_seconds_total{{{labels}}} ([\d.]+)", body)
+        self.assertGreater(float(render.group(1)), 0)
+
+    def test_api_views_are_tagged_by_route_name(self):
+        self.client.get("/api/workorders/")
+        self.assertIn('view="workshop:workorder-list"', self.scrape())
+
+    def test_endpoint_requires_token_or_staff(self):
+        self.assertEqual(self.client.get("/metrics/").status_code, 403)
+        self.assertEqual(self.client.get("/metrics/", HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_recorded(self):
+        response = self.client.get("/")
+        self.assertNotIn("Server-Timing", response)
+        self.assertNotIn("workshop:landing", self.scrape())
+
+
+# ─────────────────────────────
+# Async views (ASYNC_VIEWS)
+# ─────────────────────────────
+@override_settings(ASYNC_VIEWS=True, METRICS_TOKEN="scrape-me")
+class AsyncViewTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        metrics_registry.reset()
+        self.tech = Technician.objects.create(first_name="Dawit", last_name="Alemu", email="dawit@example.com")
+        self.customer = Customer.objects.create(first_name="Selam", last_name="Tadesse", email="selam@example.com")
+        self.order = WorkOrder.objects.create(
+            customer=self.customer, technician=self.tech, product_brand="Dell", product_model="XPS",
+            issue_description="Fan noise", total_cost=Decimal("120.50"),
+        )
+
+    async def test_landing_and_detail(self):
+        response = await self.async_client.get("/?q=selam@")
+        self.assertContains(response, self.order.work_order_number)
+        self.assertContains(await self.async_client.get("/?q=selam@"), self.order.work_order_number)
+
+        response = await self.async_client.get(f"/workorder/{self.order.pk}/")
+        self.assertContains(response, "Dawit Alemu")
+        self.assertEqual((await self.async_client.get("/workorder/999999/")).status_code, 404)
+
+        body = (await self.async_client.get("/metrics/", headers={"Authorization": "Bearer scrape-me"})).content
+        self.assertIn(b'cache="landing_results",result="hit"} 1', body)
+        queries = re.search(rb'workshop_db_queries_total{view="workshop:workorder_detail",method="GET"} (\d+)', body)
+        self.assertGreater(int(queries.group(1)), 0)
+
+    def test_dashboard_matches_the_sync_view(self):
+        url = "/api/dashboard-summary/?customer_limit=5"
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(User.objects.create_user("clerk", password="pw"))
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(User.objects.create_user("staff", password="pw", is_staff=True))
+        response = self.client.get(url)
+        self.assertTrue(asyncio.iscoroutinefunction(response.resolver_match.func))
+        async_data = response.json()
+        self.assertEqual(async_data["total_customers"], 1)
+        self.assertEqual(async_data["cost_per_customer"][0]["total_cost"], 120.5)
+        self.assertEqual(self.client.get("/api/dashboard-summary/?customer_limit=x").status_code, 400)
+        self.assertEqual(self.client.post(url).status_code, 405)
+
+        cache.clear()
+        with override_settings(ASYNC_VIEWS=False):
+            self.assertEqual(self.client.get(url).json(), async_data)
+
+
+# ─────────────────────────────
+# Conditional requests
+# ─────────────────────────────
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(first_name="Selam", last_name="Tadesse", email="selam@example.com")
+        self.order = WorkOrder.objects.create(
+            customer=self.customer, product_brand="Dell", product_model="XPS", issue_description="Fan noise"
+        )
+        self.url = f"/api/workorders/{self.order.pk}/"
+
+    def test_unchanged_detail_is_not_modified_without_serializing(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        # nested customer and images are part of the representation
+        self.customer.first_name = "Selamawit"
+        self.customer.save(update_fields=["first_name"])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        ProductImage.objects.create(work_order=self.order, image="product_images/x.jpg")
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_etag_covers_filters_and_changes(self):
+        etag = self.client.get("/api/workorders/?search=dell")["ETag"]
+        self.assertNotEqual(etag, self.client.get("/api/workorders/")["ETag"])
+        self.assertEqual(self.client.get("/api/workorders/?search=dell", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        WorkOrder.objects.filter(pk=self.order.pk).bulk_change(is_active=False)
+        self.assertEqual(self.client.get("/api/workorders/?search=dell", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_match_prevents_lost_updates(self):
+        url = f"/api/customers/{self.customer.pk}/"
+        etag = self.client.get(url)["ETag"]
+        response = self.client.patch(url, {"last_name": "T."}, content_type="application/json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response["ETag"], self.client.get(url)["ETag"])
+
+        response = self.client.patch(url, {"last_name": "X"}, content_type="application/json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(self.client.delete(url, HTTP_IF_MATCH=etag).status_code, 412)
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.last_name, "T.")
+
+
+# ─────────────────────────────
+# Page cache
+# ─────────────────────────────
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics_registry.reset()
+        self.tech = Technician.objects.create(first_name="Dawit", last_name="Alemu", email="dawit@example.com")
+        self.customer = Customer.objects.create(
+            first_name="Selam", last_name="Tadesse", email="selam@example.com", phone_number="0911223344"
+        )
+        self.order = WorkOrder.objects.create(
+            customer=self.customer, technician=self.tech, product_brand="Dell", product_model="XPS",
+            issue_description="Fan noise",
+        )
+        self.url = f"/workorder/{self.order.pk}/"
+
+    def test_detail_is_served_from_cache_until_the_order_changes(self):
+        self.assertContains(self.client.get(self.url), "Pending")
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(self.url), "Dawit Alemu")
+
+        self.order.status = "in_progress"
+        self.order.save()
+        self.assertContains(self.client.get(self.url), "In Progress")
+
+        WorkOrder.objects.filter(pk=self.order.pk).transition_status("completed", notify=False)
+        self.assertContains(self.client.get(self.url), "Completed")
+
+        self.tech.first_name = "Dawitt"
+        self.tech.save()
+        self.assertContains(self.client.get(self.url), "Dawitt Alemu")
+        self.assertEqual(self.client.get("/workorder/999999/").status_code, 404)
+
+        body = metrics_registry.render_prometheus()
+        self.assertIn('workshop_cache_requests_total{cache="workorder_detail",result="hit"} 1', body)
+        self.assertIn('workshop_cache_requests_total{cache="workorder_detail",result="miss"} 5', body)
+
+    def test_landing_results_follow_the_customers_orders(self):
+        self.assertContains(self.client.get("/?q=selam@"), self.order.work_order_number)
+        with self.assertNumQueries(0):
+            self.client.get("/?q=selam@")
+
+        newer = WorkOrder.objects.create(
+            customer=self.customer, product_brand="HP", product_model="Envy", issue_description="Screen"
+        )
+        self.assertContains(self.client.get("/?q=selam@"), newer.work_order_number)
+        WorkOrder.objects.filter(pk=newer.pk).bulk_change(is_repaired=True, repair_details="New panel fitted")
+        self.assertContains(self.client.get("/?q=selam@"), "New panel fitted")
+
+        self.customer.email = "selam.t@example.com"
+        self.customer.save()
+        self.assertContains(self.client.get("/?q=selam.t@"), newer.work_order_number)
+
+    def test_staff_results_are_not_cached(self):
+        staff = User.objects.create_user("staff", password="x", is_staff=True)
+        self.client.force_login(staff)
+        self.assertContains(self.client.get("/?q=selam@"), 'name="workorder_ids"')
+        self.client.logout()
+        self.assertNotContains(self.client.get("/?q=selam@"), 'name="workorder_ids"')
+
+
+# ─────────────────────────────
+# Full-text search
+# ─────────────────────────────
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.tech = Technician.objects.create(first_name="Dawit", last_name="Alemu", email="dawit@example.com")
+        self.selam = Customer.objects.create(
+            first_name="Selam", last_name="Tadesse", email="selam@example.com", phone_number="0911 223 344"
+        )
+        self.laptop = WorkOrder.objects.create(
+            customer=self.selam, product_brand="Lenovo", product_model="ThinkPad T480",
+            serial_number="PF1ABCD", issue_description="Screen flickers after sleep",
+        )
+        other = Customer.objects.create(first_name="Abebe", last_name="Girma", email="abebe@example.com")
+        self.phone = WorkOrder.objects.create(
+            customer=other, technician=self.tech, product_brand="Samsung", product_model="Galaxy S21",
+            issue_description="Cracked screen, replace screen glass",
+        )
+
+    def search(self, query, **kwargs):
+        return list(search_work_orders(WorkOrder.objects.order_by("-id"), query, **kwargs))
+
+    def test_matches_every_word_as_prefix(self):
+        self.assertEqual(self.search("selam thinkp"), [self.laptop])
+        self.assertEqual(self.search("dawit"), [self.phone])
+        self.assertEqual(self.search(self.laptop.work_order_number), [self.laptop])
+        self.assertEqual(self.search("selam samsung"), [])
+
+    def test_phone_in_any_format(self):
+        for query in ("0911223344", "+251 911 223 344", "0911 22", "911223344"):
+            self.assertEqual(self.search(query), [self.laptop], query)
+
+    def test_ranked_by_relevance(self):
+        self.assertEqual(self.search("screen"), [self.phone, self.laptop])
+
+    def test_documents_follow_related_changes(self):
+        self.selam.last_name = "Worku"
+        self.selam.save()
+        self.assertEqual(self.search("worku"), [self.laptop])
+        self.assertEqual(self.search("tadesse"), [])
+
+        WorkOrder.objects.filter(pk=self.laptop.pk).bulk_change(technician=self.tech)
+        self.assertCountEqual(self.search("dawit"), [self.phone, self.laptop])
+
+        self.tech.delete()
+        self.assertEqual(self.search("dawit"), [])
+
+        self.laptop.delete()
+        self.assertEqual(self.search("selam"), [])
+
+    def test_api_and_html_views(self):
+        response = self.client.get("/api/workorders/", {"search": "galaxy"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.phone.pk])
+        response = self.client.get("/api/workorders/", {"search": "screen", "ordering": "created_at"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.laptop.pk, self.phone.pk])
+
+        for url in ("/workorders/", "/search/"):
+            response = self.client.get(url, {"q": "lenovo"})
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, self.laptop.work_order_number)
+            self.assertNotContains(response, self.phone.work_order_number)
+
+        response = self.client.get("/search/", {"q": str(self.phone.pk)})
+        self.assertContains(response, self.phone.work_order_number)
+
+
+# ─────────────────────────────
+# Image derivatives
+# ─────────────────────────────
+def jpeg_bytes(size, orientation=None):
+    image = Image.new("RGB", size, (200, 30, 30))
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        customer = Customer.objects.create(first_name="Hana", last_name="Mulu", email="hana@example.com")
+        self.workorder = WorkOrder.objects.create(
+            customer=customer, product_brand="Apple", product_model="iPhone 12", issue_description="Camera"
+        )
+
+    def upload(self, data, name="photo.jpg"):
+        return ProductImage.objects.create(work_order=self.workorder, image=SimpleUploadedFile(name, data))
+
+    def test_renders_upright_stripped_derivatives(self):
+        photo = self.upload(jpeg_bytes((2000, 1000), orientation=6))  # stored sideways
+        self.assertEqual(process_batch(), {"processed": 1, "failed": 0})
+
+        photo.refresh_from_db()
+        self.assertEqual((photo.width, photo.height), (1000, 2000))
+        self.assertTrue(photo.placeholder.startswith("data:image/webp;base64,"))
+        with Image.open(photo.display.path) as display:
+            self.assertEqual((display.format, display.size), ("WEBP", (640, 1280)))
+            self.assertNotIn(0x010F, display.getexif())
+        with Image.open(photo.thumbnail.path) as thumbnail:
+            self.assertEqual(thumbnail.size, (160, 320))
+
+        data = self.client.get(f"/api/images/{photo.pk}/").data
+        self.assertTrue(data["thumbnail"].endswith(f"{photo.pk}-thumbnail.webp"))
+        self.assertEqual(data["width"], 1000)
+
+    def test_broken_upload_is_recorded_not_retried(self):
+        broken = self.upload(b"not an image")
+        self.assertEqual(process_batch(), {"processed": 0, "failed": 1})
+        broken.refresh_from_db()
+        self.assertIsNotNone(broken.processing_error)
+        self.assertEqual(process_batch(), {"processed": 0, "failed": 0})
+
+    def test_new_upload_requeues(self):
+        photo = self.upload(jpeg_bytes((800, 600)))
+        process_batch()
+        photo = ProductImage.objects.get(pk=photo.pk)
+        photo.image = SimpleUploadedFile("other.jpg", jpeg_bytes((300, 300)))
+        photo.save()
+        photo.refresh_from_db()
+        self.assertIsNone(photo.processed_at)
+        self.assertIsNone(photo.width)
+
+    def test_process_pool(self):
+        for _ in range(3):
+            self.upload(jpeg_bytes((1500, 1500)))
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(process_batch(executor=executor), {"processed": 3, "failed": 0})
+
+
+# ─────────────────────────────
+# Chunked uploads
+# ─────────────────────────────
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=f"{tmp}/media", CHUNKED_UPLOAD_TEMP_DIR=f"{tmp}/partial")
+        override.enable()
+        self.addCleanup(override.disable)
+
+        customer = Customer.objects.create(first_name="Lulit", last_name="Haile", email="lulit@example.com")
+        self.workorder = WorkOrder.objects.create(
+            customer=customer, product_brand="Dell", product_model="XPS 13", issue_description="Battery"
+        )
+        self.photo = jpeg_bytes((1200, 900))
+
+    def start(self, data=None, **extra):
+        payload = {"work_order": self.workorder.pk, "filename": "photo.jpg", "size": len(data or self.photo)}
+        payload.update(extra)
+        response = self.client.post("/api/images/uploads/", payload, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        return response["Location"]
+
+    def patch(self, url, chunk, **headers):
+        return self.client.generic(
+            "PATCH", url, chunk, content_type="application/offset+octet-stream",
+            **{f"HTTP_{name.upper().replace('-', '_')}": value for name, value in headers.items()},
+        )
+
+    def test_resumable_upload_attaches_image(self):
+        url = self.start(sha256=hashlib.sha256(self.photo).hexdigest())
+        half = len(self.photo) // 2
+
+        response = self.patch(url, self.photo[:half], **{"Upload-Offset": "0"})
+        self.assertEqual(response["Upload-Offset"], str(half))
+
+        # a retried chunk from the wrong position is refused with the current offset
+        response = self.patch(url, self.photo[:half], **{"Upload-Offset": "0"})
+        self.assertEqual((response.status_code, response["Upload-Offset"]), (409, str(half)))
+
+        self.assertEqual(self.client.head(url)["Upload-Offset"], str(half))
+        checksum = base64.b64encode(hashlib.sha256(self.photo[half:]).digest()).decode()
+        response = self.patch(
+            url, self.photo[half:],
+            **{"Content-Range": f"bytes {half}-{len(self.photo) - 1}/{len(self.photo)}", "Upload-Checksum": f"sha256 {checksum}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], "complete")
+
+        image = self.workorder.images.get()
+        with image.image.open("rb") as stored:
+            self.assertEqual(stored.read(), self.photo)
+        self.assertIsNone(image.processed_at)  # queued for process_images
+        self.assertEqual(os.listdir(settings.CHUNKED_UPLOAD_TEMP_DIR), [])
+
+    def test_bad_chunk_checksum_is_not_kept(self):
+        url = self.start()
+        bogus = base64.b64encode(hashlib.sha256(b"other").digest()).decode()
+        response = self.patch(url, self.photo[:100], **{"Upload-Offset": "0", "Upload-Checksum": f"sha256 {bogus}"})
+        self.assertEqual((response.status_code, response["Upload-Offset"]), (400, "0"))
+
+    def test_whole_file_verification(self):
+        url = self.start(sha256="0" * 64)
+        response = self.patch(url, self.photo, **{"Upload-Offset": "0"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ChunkedUpload.objects.get().status, "failed")
+
+        url = self.start(data=b"x" * 50, size=50)
+        self.assertEqual(self.patch(url, b"x" * 50, **{"Upload-Offset": "0"}).status_code, 400)
+        self.assertFalse(self.workorder.images.exists())
+
+    def test_stale_uploads_are_purged(self):
+        url = self.start()
+        self.patch(url, self.photo[:10], **{"Upload-Offset": "0"})
+        ChunkedUpload.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(purge_stale_uploads(hours=24), 1)
+        self.assertEqual(os.listdir(settings.CHUNKED_UPLOAD_TEMP_DIR), [])
+
+
+# ─────────────────────────────
+# Live work order events
+# ─────────────────────────────
+class WorkOrderEventTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tech = Technician.objects.create(first_name="Dawit", last_name="Alemu", email="dawit@example.com")
+        self.customer = Customer.objects.create(first_name="Selam", last_name="Tadesse", email="selam@example.com")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order = WorkOrder.objects.create(
+                customer=self.customer, product_brand="Dell", product_model="XPS", issue_description="Fan noise"
+            )
+            self.other = WorkOrder.objects.create(
+                customer=self.customer, product_brand="HP", product_model="Envy", issue_description="No power"
+            )
+
+    def changes(self):
+        return list(WorkOrderEvent.objects.order_by("id").values_list("work_order_id", "kind", "old_value", "new_value"))
+
+    def test_saves_and_bulk_updates_are_recorded_with_old_values(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.status = "in_progress"
+            self.order.save()
+            self.order.repair_details = "Cleaned fan"
+            self.order.save()  # no status/technician change, no event
+            WorkOrder.objects.filter(pk=self.other.pk).transition_status("completed", notify=False)
+            WorkOrder.objects.all().bulk_change(technician=self.tech)
+
+        self.assertEqual(self.changes()[2:], [
+            (self.order.pk, "status", "pending", "in_progress"),
+            (self.other.pk, "status", "pending", "completed"),
+            (self.order.pk, "assignment", "", str(self.tech.pk)),
+            (self.other.pk, "assignment", "", str(self.tech.pk)),
+        ])
+        self.assertEqual(WorkOrderEvent.objects.filter(technician_id=self.tech.pk).count(), 2)
+
+    def test_polling_fallback_filters_and_resumes(self):
+        first = events.latest_event_id()
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkOrder.objects.all().transition_status("in_progress", notify=False)
+
+        url = f"/api/workorders/events/?work_order={self.order.pk}"
+        response = self.client.get(url)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertIn(f"id: {events.latest_event_id()}\n\n", response.content.decode())
+
+        body = self.client.get(url, headers={"Last-Event-ID": str(first)}).content.decode()
+        self.assertIn("event: status", body)
+        self.assertEqual(body.count("event:"), 1)
+        self.assertIn(f'"work_order": {self.order.pk}', body)
+        self.assertNotIn("customer", body)
+
+    def test_broad_filters_are_staff_only(self):
+        self.assertEqual(self.client.get("/api/workorders/events/").status_code, 403)
+        self.assertEqual(self.client.get(f"/api/workorders/events/?customer={self.customer.pk}").status_code, 403)
+        self.assertEqual(self.client.get("/api/workorders/events/?work_order=x").status_code, 400)
+
+        staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(f"/api/workorders/events/?customer={self.customer.pk}").status_code, 200)
+
+    def test_old_events_are_purged(self):
+        WorkOrderEvent.objects.filter(work_order=self.order).update(created_at=timezone.now() - timedelta(days=40))
+        self.assertEqual(events.purge_events(days=30), 1)
+        self.assertEqual(WorkOrderEvent.objects.count(), 1)
+
+
+@override_settings(EVENTS_POLL_INTERVAL=0.01)
+class WorkOrderEventStreamTests(TransactionTestCase):
+    async def test_stream_sends_backlog_then_live_events(self):
+        customer = await Customer.objects.acreate(first_name="Selam", last_name="Tadesse", email="selam@example.com")
+        order = await WorkOrder.objects.acreate(
+            customer=customer, product_brand="Dell", product_model="XPS", issue_description="Fan noise"
+        )
+        other = await WorkOrder.objects.acreate(
+            customer=customer, product_brand="HP", product_model="Envy", issue_description="No power"
+        )
+
+        response = await self.async_client.get(
+            f"/api/workorders/events/?work_order={order.pk}", headers={"Last-Event-ID": "0"}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = aiter(response.streaming_content)
+        try:
+            self.assertTrue((await anext(content)).startswith(b"retry:"))
+            self.assertIn(b"event: created", await anext(content))  # backlog
+
+            other.status = "in_progress"
+            await other.asave()  # filtered out
+            order.status = "completed"
+            await order.asave()
+            live = (await asyncio.wait_for(anext(content), 5)).decode()
+            self.assertIn("event: status", live)
+            self.assertIn('"old": "pending", "new": "completed"', live)
+        finally:
+            events.broadcaster.subscribers.clear()
+
+    async def test_clients_connecting_together_share_one_poller(self):
+        broadcaster = events.Broadcaster()
+        try:
+            queues = await asyncio.gather(*(broadcaster.subscribe() for _ in range(5)))
+            pollers = [task for task in asyncio.all_tasks() if task.get_coro().__qualname__ == "Broadcaster.run"]
+            self.assertEqual(len(pollers), 1)
+            self.assertEqual(broadcaster.subscribers, set(queues))
+        finally:
+            broadcaster.subscribers.clear()
+            await asyncio.wait_for(broadcaster.task, 5)
+
+    async def test_broadcaster_waits_for_skipped_ids_and_survives_failed_polls(self):
+        customer = await Customer.objects.acreate(first_name="Selam", last_name="Tadesse", email="selam@example.com")
+        order = await WorkOrder.objects.acreate(
+            customer=customer, product_brand="Dell", product_model="XPS", issue_description="Fan noise"
+        )
+        broadcaster = events.Broadcaster()
+        queue = await broadcaster.subscribe()
+        first = broadcaster.last_id
+
+        def event(offset):
+            return WorkOrderEvent(
+                id=first + offset, work_order=order, work_order_number=order.work_order_number,
+                customer_id=customer.pk, kind="status", old_value="pending", new_value="in_progress",
+            )
+
+        events_table, failed = WorkOrderEvent.objects.all, []
+
+        def flaky():
+            if not failed:
+                failed.append(True)
+                raise DatabaseError("connection lost")
+            return events_table()
+
+        try:
+            # first + 1 commits after first + 2, as concurrent inserts can on PostgreSQL
+            await event(2).asave()
+            self.assertEqual((await asyncio.wait_for(queue.get(), 5))["id"], first + 2)
+            with self.assertLogs("workshop.events", "ERROR"), mock.patch.object(WorkOrderEvent.objects, "all", flaky):
+                await event(1).asave()
+                self.assertEqual((await asyncio.wait_for(queue.get(), 5))["id"], first + 1)
+            self.assertEqual(broadcaster.skipped, {})
+        finally:
+            broadcaster.subscribers.clear()
+
+
+# ─────────────────────────────
+# Seed data and endpoint benchmarks
+# ─────────────────────────────
+class BenchmarkToolsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.tmp)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_seed_data(self):
+        call_command(
+            "seed_data", orders=120, customers=30, technicians=3, years=2, images=4, seed=5, stdout=io.StringIO(),
+            stderr=io.StringIO(),
+        )
+        self.assertEqual(WorkOrder.objects.count(), 120)
+        self.assertLessEqual(Customer.objects.count(), 30)
+        self.assertEqual(Technician.objects.count(), 3)
+        self.assertEqual(ProductImage.objects.filter(processed_at=None).count(), 4)
+        self.assertGreater(len({created.year for created in WorkOrder.objects.values_list("created_at", flat=True)}), 1)
+        self.assertGreater(WorkOrder.objects.values("status").distinct().count(), 2)
+        # every phone format written by the generator normalizes to +2519... / +2517...
+        for phone, normalized in Customer.objects.values_list("phone_number", "phone_normalized"):
+            self.assertRegex(normalized, r"^\+251[79]\d{8}$", phone)
+        self.assertEqual(summarize()["total_orders"], 120)  # the dashboard rollup was rebuilt
+
+    def test_benchmark_baseline_round_trip(self):
+        call_command("seed_data", orders=20, technicians=2, seed=1, stdout=io.StringIO(), stderr=io.StringIO())
+        baseline = os.path.join(self.tmp, "baseline.json")
+        User.objects.create_user("staff", password="pw", is_staff=True)  # the dashboard is staff only
+        endpoints = ["workorder_page", "api_workorder_detail", "dashboard_summary"]
+        options = {"endpoint": endpoints, "iterations": 3, "baseline": baseline}
+        call_command("benchmark_endpoints", save=True, stdout=io.StringIO(), **options)
+        with open(baseline) as stream:
+            saved = json.load(stream)
+        self.assertEqual(saved["mode"], "client")
+        self.assertEqual(saved["endpoints"]["api_workorder_detail"]["errors"], 0)
+        self.assertGreater(saved["endpoints"]["api_workorder_detail"]["queries"], 0)
+        self.assertEqual(saved["endpoints"]["dashboard_summary"]["errors"], 0)
+
+        out = io.StringIO()
+        call_command("benchmark_endpoints", fail_on_regression=True, tolerance=100, stdout=out, **options)
+        self.assertIn("No regressions", out.getvalue())
+
+        saved["endpoints"]["api_workorder_detail"]["queries"] -= 1
+        with open(baseline, "w") as stream:
+            json.dump(saved, stream)
+        with self.assertRaises(CommandError):
+            call_command("benchmark_endpoints", fail_on_regression=True, tolerance=100, stdout=io.StringIO(), **options)
+
+
+# ─────────────────────────────
+# PostgreSQL cutover
+# ─────────────────────────────
+class CutoverTests(TestCase):
+    """Rehearsed against a second SQLite file registered as the ``target`` alias."""
+
+    databases = "__all__"  # resolved when the class is set up, so it includes "target"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        connections.settings["target"] = connections.configure_settings({
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": os.path.join(cls.tmp, "target.sqlite3")},
+        })["default"]
+        call_command("migrate", database="target", verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["target"].close()
+        del connections["target"]
+        del connections.settings["target"]
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def setUp(self):
+        cutover.reset()
+        self.customer = Customer.objects.create(first_name="Dawit", last_name="Alemu", phone_number="0911223344")
+        for number in range(7):
+            WorkOrder.objects.create(
+                customer=self.customer, product_brand="HP", product_model=f"Pro {number}", issue_description="Broken",
+            )
+
+    def target_orders(self):
+        return dict(WorkOrder._base_manager.using("target").values_list("pk", "product_model"))
+
+    def test_copy_resumes_and_verifies(self):
+        orders = list(WorkOrder.objects.order_by("pk"))
+        out = io.StringIO()
+        call_command("migrate_to_postgres", batch_size=3, stdout=out)
+        self.assertIn("Verified", out.getvalue())
+        self.assertEqual(self.target_orders(), {order.pk: order.product_model for order in orders})
+        self.assertEqual(cutover.checkpoints()["workshop_workorder"], (str(orders[-1].pk), 7))
+
+        # a second run only copies what was added since
+        WorkOrder.objects.create(customer=self.customer, product_brand="HP", product_model="New", issue_description="x")
+        self.assertEqual(cutover.copy_table(WorkOrder, batch_size=3), 1)
+        self.assertEqual(cutover.copy_table(WorkOrder, batch_size=3), 0)
+        self.assertEqual(len(self.target_orders()), 8)
+
+    def test_repair_fixes_rows_changed_after_the_copy(self):
+        cutover.copy_all(batch_size=3)
+        changed, deleted = WorkOrder.objects.order_by("pk")[1:3]
+        WorkOrder.objects.filter(pk=changed.pk).update(product_model="Changed")
+        deleted.delete()
+
+        with self.assertRaises(CommandError):
+            call_command("migrate_to_postgres", verify_only=True, batch_size=3, stdout=io.StringIO())
+        call_command("migrate_to_postgres", verify_only=True, repair=True, batch_size=3, stdout=io.StringIO())
+        self.assertEqual(self.target_orders(), dict(WorkOrder.objects.values_list("pk", "product_model")))
+        report = cutover.verify_all(batch_size=3)
+        self.assertFalse(any(chunks for _, _, chunks, _ in report.values()))
+
+    @override_settings(DUAL_WRITE=True)
+    def test_dual_write_mirrors_committed_changes(self):
+        cutover.copy_all()
+        order = WorkOrder.objects.order_by("pk").first()
+        with self.captureOnCommitCallbacks(execute=True):
+            order.product_model = "Mirrored"
+            order.save()
+        self.assertEqual(self.target_orders()[order.pk], "Mirrored")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new = WorkOrder.objects.create(
+                customer=self.customer, product_brand="HP", product_model="Fresh", issue_description="x",
+            )
+        self.assertEqual(self.target_orders()[new.pk], "Fresh")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkOrder.objects.filter(pk=new.pk).transition_status("in_progress", notify=False)
+        self.assertEqual(WorkOrder._base_manager.using("target").get(pk=new.pk).status, "in_progress")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new.delete()
+        self.assertNotIn(new.pk, self.target_orders())
+
+    @override_settings(DUAL_WRITE=True)
+    def test_sequences_are_reset_once_at_the_switch_not_per_write(self):
+        cutover.copy_all()
+        with mock.patch.object(cutover, "_reset_sequences", return_value=0) as reset:
+            with self.captureOnCommitCallbacks(execute=True):
+                WorkOrder.objects.create(
+                    customer=self.customer, product_brand="HP", product_model="Fresh", issue_description="x",
+                )
+            reset.assert_not_called()
+            out = io.StringIO()
+            call_command("migrate_to_postgres", reset_sequences=True, stdout=out)
+        reset.assert_called_once()
+        self.assertIn("Reset 0 sequence(s)", out.getvalue())
+
+    @override_settings(DUAL_WRITE=True)
+    def test_dual_write_keeps_the_number_counter_ahead_after_the_final_repair(self):
+        cutover.copy_all()
+        cutover.verify_all(repair=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            order = WorkOrder.objects.create(
+                customer=self.customer, product_brand="HP", product_model="Late", issue_description="x",
+            )
+        year = timezone.now().year
+        source_last = WorkOrderSequence.objects.get(year=year).last_number
+        target = WorkOrderSequence._base_manager.using("target")
+        self.assertEqual(target.get(year=year).last_number, source_last)
+        # after the switch the next number handed out is new on the target too
+        target_numbers = set(WorkOrder._base_manager.using("target").values_list("work_order_number", flat=True))
+        self.assertIn(order.work_order_number, target_numbers)
+        self.assertNotIn(format_work_order_number(year, source_last + 1), target_numbers)
+
+        # a callback that runs late never moves the counter back
+        target.filter(year=year).update(last_number=source_last + 5)
+        cutover.mirror_sequence(year)
+        self.assertEqual(target.get(year=year).last_number, source_last + 5)
+
+    def test_requires_migrated_target(self):
+        with self.assertRaises(CommandError):
+            call_command("migrate_to_postgres", database="missing", stdout=io.StringIO())
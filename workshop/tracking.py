@@ -0,0 +1,93 @@
+# workshop/tracking.py
+from django.db.models.fields.files import FieldFile
+
+# Placeholder for "value was never loaded" (deferred field assigned later)
+NOT_LOADED = object()
+
+
+class TrackedFieldsMixin:
+    """
+    Remember the column values a model instance was loaded with, so callers can
+    ask what changed without re-reading the row.
+
+    Instances built by the ORM (``from_db``) are tracked; instances created in
+    Python are not until their first save. ``save()`` on a tracked instance
+    writes only the changed columns (plus ``auto_now`` fields) unless the caller
+    passes ``update_fields`` itself. Fields modified by ``pre_save`` receivers
+    must therefore already be dirty, or be listed in ``update_fields``.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._tracked_snapshot()
+        return instance
+
+    def _tracked_value(self, field):
+        value = self.__dict__.get(field.attname, NOT_LOADED)
+        if isinstance(value, FieldFile):
+            return value.name
+        return value
+
+    def _tracked_snapshot(self):
+        return {
+            field.attname: self._tracked_value(field)
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    @property
+    def is_tracked(self):
+        return "_loaded_values" in self.__dict__
+
+    def _attname(self, name):
+        return self._meta.get_field(name).attname
+
+    def get_dirty_fields(self):
+        """Map of attname -> loaded value for every field that differs from the database."""
+        if not self.is_tracked:
+            return {}
+        dirty = {}
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue  # still deferred, so untouched
+            old = self._loaded_values.get(field.attname, NOT_LOADED)
+            if old is NOT_LOADED or old != self._tracked_value(field):
+                dirty[field.attname] = old
+        return dirty
+
+    def has_changed(self, name):
+        return self._attname(name) in self.get_dirty_fields()
+
+    def previous_value(self, name):
+        """Value ``name`` had when loaded; ``NOT_LOADED`` for untracked or deferred fields."""
+        if not self.is_tracked:
+            return NOT_LOADED
+        return self._loaded_values.get(self._attname(name), NOT_LOADED)
+
+    def save(self, *args, **kwargs):
+        if (
+            self.is_tracked
+            and not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+            and not args  # positional force_insert/using/update_fields
+        ):
+            dirty = self.get_dirty_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and (field.attname in dirty or getattr(field, "auto_now", False))
+            ]
+        super().save(*args, **kwargs)
+        self._loaded_values = self._tracked_snapshot()
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        snapshot = self._tracked_snapshot()
+        if fields is None or not self.is_tracked:
+            self._loaded_values = snapshot
+        else:
+            refreshed = {self._attname(name) for name in fields}
+            self._loaded_values.update({k: v for k, v in snapshot.items() if k in refreshed})
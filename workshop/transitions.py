@@ -0,0 +1,262 @@
+# workshop/transitions.py
+"""
+Work order history (``WorkOrderTransition``).
+
+Every change to a work order's status, technician, estimated / total cost or
+collection flag is appended as one compact row: a field code, old and new
+values as integers, a small actor code and the user, when there is one.
+Saves and bulk updates both record. Rows are buffered until the transaction
+commits and inserted with one ``bulk_create`` per batch; a nested
+``atomic()`` starts a new batch, so rolling it back takes its rows with it.
+
+``TransitionActorMiddleware`` makes the current request available to the
+receivers, which classify it as web, API or admin; anything outside a request
+(commands, workers) is "system".
+
+``transition_metrics()`` reads the status rows once, in id order, and derives
+turnaround (first status to ``completed``) and time spent in each status.
+"""
+import threading
+import weakref
+from collections import defaultdict
+from contextvars import ContextVar
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import WorkOrder, WorkOrderTransition
+from .signals import work_orders_bulk_updated
+from .utils import percentile
+
+STATUS, TECHNICIAN, ESTIMATED_COST, TOTAL_COST, COLLECTED = 1, 2, 3, 4, 5
+ACTOR_SYSTEM, ACTOR_WEB, ACTOR_API, ACTOR_ADMIN = 0, 1, 2, 3
+
+STATUS_CODES = {"pending": 1, "in_progress": 2, "completed": 3, "cancelled": 4, "ready_for_pickup": 5}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+# attname -> field code for everything the log follows
+TRACKED_FIELDS = {
+    "status": STATUS,
+    "technician_id": TECHNICIAN,
+    "estimated_cost": ESTIMATED_COST,
+    "total_cost": TOTAL_COST,
+    "customer_collected": COLLECTED,
+}
+FIELD_NAMES = dict(WorkOrderTransition.FIELD_CHOICES)
+ACTOR_NAMES = dict(WorkOrderTransition.ACTOR_CHOICES)
+
+# Request being handled, set by TransitionActorMiddleware
+current_request = ContextVar("workshop_transition_request", default=None)
+
+
+# ─────────────────────────────
+# Encoding
+# ─────────────────────────────
+def encode(field, value):
+    if value is None:
+        return None
+    if field == STATUS:
+        return STATUS_CODES.get(value, 0)
+    if field in (ESTIMATED_COST, TOTAL_COST):
+        return int(Decimal(value) * 100)
+    return int(value)
+
+
+def decode(field, value):
+    if value is None:
+        return None
+    if field == STATUS:
+        return STATUS_NAMES.get(value, "unknown")
+    if field in (ESTIMATED_COST, TOTAL_COST):
+        return Decimal(value) / 100
+    if field == COLLECTED:
+        return bool(value)
+    return value
+
+
+def current_actor():
+    """``(actor code, user id)`` for the request being handled, or system outside one."""
+    request = current_request.get()
+    if request is None:
+        return ACTOR_SYSTEM, None
+    match = getattr(request, "resolver_match", None)
+    if match and "admin" in match.app_names:
+        actor = ACTOR_ADMIN
+    elif match and match.route.startswith("api/"):
+        actor = ACTOR_API
+    else:
+        actor = ACTOR_WEB
+    user = getattr(request, "user", None)
+    return actor, user.pk if user is not None and user.is_authenticated else None
+
+
+# ─────────────────────────────
+# Recording
+# ─────────────────────────────
+class _Batch:
+    """Rows waiting for their transaction (or savepoint) to commit; inserted as one batch."""
+
+    def __init__(self, key):
+        self.key = key
+        self.rows = []
+
+    def __call__(self):
+        if _pending.batches.get(self.key) is self:
+            del _pending.batches[self.key]
+        WorkOrderTransition.objects.using(self.key[0]).bulk_create(self.rows, batch_size=1000)
+
+
+class _Pending(threading.local):
+    def __init__(self):
+        # (alias, savepoint ids) -> batch. Only the on_commit registration keeps a
+        # batch alive, so one dropped by a rollback leaves this mapping with it.
+        self.batches = weakref.WeakValueDictionary()
+
+
+_pending = _Pending()
+
+
+def _batch(using):
+    """The batch of the current transaction or savepoint, registered with ``on_commit`` when first needed."""
+    key = (using, tuple(connections[using].savepoint_ids))
+    batch = _pending.batches.get(key)
+    if batch is None:
+        batch = _pending.batches[key] = _Batch(key)
+        transaction.on_commit(batch, using=using)
+    return batch
+
+
+def record(changes, at=None):
+    """
+    Append ``(work_order_id, field code, old, new)`` changes (raw model values)
+    for the current actor. Inside a transaction they are written when it
+    commits, together with every other change recorded in it.
+    """
+    at = at or timezone.now()
+    local = timezone.localtime(at)
+    month = local.year * 100 + local.month
+    actor, user_id = current_actor()
+    rows = [
+        WorkOrderTransition(
+            month=month, work_order_id=work_order_id, field=field, old_value=encode(field, old),
+            new_value=encode(field, new), actor=actor, user_id=user_id, at=at,
+        )
+        for work_order_id, field, old, new in changes
+    ]
+    if not rows:
+        return
+    using = router.db_for_write(WorkOrderTransition)
+    if connections[using].in_atomic_block:
+        _batch(using).rows.extend(rows)
+    else:
+        WorkOrderTransition.objects.using(using).bulk_create(rows, batch_size=1000)
+
+
+@receiver(post_save, sender=WorkOrder)
+def workorder_saved(sender, instance, created, **kwargs):
+    if created:
+        changes = [(instance.pk, STATUS, None, instance.status)]
+        changes += [
+            (instance.pk, code, None, getattr(instance, name))
+            for name, code in TRACKED_FIELDS.items()
+            if code != STATUS and getattr(instance, name) is not None and getattr(instance, name) is not False
+        ]
+        record(changes)
+        return
+    before = getattr(instance, "_previous_state", None)
+    if before:
+        record(
+            (instance.pk, code, before[name], getattr(instance, name))
+            for name, code in TRACKED_FIELDS.items()
+            if before[name] != getattr(instance, name)
+        )
+
+
+@receiver(work_orders_bulk_updated, sender=WorkOrder)
+def workorders_bulk_updated(sender, ids, fields, previous=None, **kwargs):
+    names = [name for name in TRACKED_FIELDS if name in fields]
+    if not names:
+        return
+    previous = previous or {}
+    changes = []
+    for start in range(0, len(ids), 500):
+        for order in WorkOrder.objects.filter(pk__in=ids[start:start + 500]).values("pk", *names):
+            for name in names:
+                old = previous.get(name, {}).get(order["pk"], order[name])
+                if old != order[name]:
+                    changes.append((order["pk"], TRACKED_FIELDS[name], old, order[name]))
+    record(changes)
+
+
+# ─────────────────────────────
+# Reading
+# ─────────────────────────────
+def history(work_order_id):
+    """Decoded transitions of one work order, oldest first (uses wotransition_order_idx)."""
+    rows = WorkOrderTransition.objects.filter(work_order_id=work_order_id).order_by("id")
+    return [
+        {
+            "at": row.at,
+            "field": FIELD_NAMES[row.field],
+            "old": decode(row.field, row.old_value),
+            "new": decode(row.field, row.new_value),
+            "actor": ACTOR_NAMES.get(row.actor, "unknown"),
+            "user": row.user_id,
+        }
+        for row in rows
+    ]
+
+
+def _hours(durations):
+    if not durations:
+        return {"count": 0, "mean_hours": None, "p50_hours": None, "p90_hours": None}
+    return {
+        "count": len(durations),
+        "mean_hours": round(sum(durations) / len(durations) / 3600, 2),
+        "p50_hours": round(percentile(durations, 50) / 3600, 2),
+        "p90_hours": round(percentile(durations, 90) / 3600, 2),
+    }
+
+
+def transition_metrics(since_month=None, until_month=None, chunk_size=5000):
+    """
+    Turnaround and time-in-status from one pass over the status rows in id
+    (commit) order, keeping only each open order's current status and when it
+    started. ``since_month`` / ``until_month`` (YYYYMM) limit the months read;
+    a status entered before ``since_month`` has no known start and is skipped.
+    """
+    rows = WorkOrderTransition.objects.filter(field=STATUS)
+    if since_month:
+        rows = rows.filter(month__gte=since_month)
+    if until_month:
+        rows = rows.filter(month__lte=until_month)
+
+    opened = {}  # work order -> first status time
+    current = {}  # work order -> (status code, entered at)
+    in_status = defaultdict(list)
+    turnaround = []
+    read = 0
+    for work_order_id, old, new, at in rows.order_by("id").values_list(
+        "work_order_id", "old_value", "new_value", "at"
+    ).iterator(chunk_size=chunk_size):
+        read += 1
+        if old is None:
+            opened[work_order_id] = at
+        state = current.get(work_order_id)
+        if state and state[0] == old:
+            in_status[old].append((at - state[1]).total_seconds())
+        current[work_order_id] = (new, at)
+        if new == STATUS_CODES["completed"] and work_order_id in opened:
+            turnaround.append((at - opened.pop(work_order_id)).total_seconds())
+
+    return {
+        "transitions": read,
+        "work_orders": len(current),
+        "turnaround": _hours(turnaround),
+        "time_in_status": {
+            STATUS_NAMES.get(code, "unknown"): _hours(durations) for code, durations in sorted(in_status.items())
+        },
+    }
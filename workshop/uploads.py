@@ -0,0 +1,204 @@
+# workshop/uploads.py
+"""
+Resumable, chunked image uploads (a small subset of the tus protocol).
+
+1. ``POST /api/images/uploads/`` declares work order, filename, size and an
+   optional sha256, and returns the upload id.
+2. ``PATCH /api/images/uploads/<id>/`` sends the next bytes, with the position
+   given by ``Upload-Offset: <n>`` or ``Content-Range: bytes <n>-<m>/<size>``.
+   An optional ``Upload-Checksum: sha256 <base64>`` covers just that chunk.
+3. ``HEAD`` / ``GET`` on the same URL reports the current offset, so a client
+   whose connection dropped resumes from there instead of starting over.
+
+Request bodies are streamed in BLOCK_SIZE pieces and ``pwrite``-n into a
+single partial file at their offset, so nothing is accumulated in memory
+and there is no assembly step. When the last byte arrives the file is
+verified and renamed into MEDIA_ROOT as a new ProductImage.
+"""
+import base64
+import hashlib
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from .models import ChunkedUpload, ProductImage
+
+BLOCK_SIZE = 64 * 1024
+CONTENT_RANGE_RE = re.compile(r"^bytes (?P<start>\d+)-(?P<end>\d+)/(?P<total>\d+)$")
+
+
+class UploadError(Exception):
+    """Request can never succeed as sent (bad headers, size, checksum...)."""
+
+
+class OffsetMismatch(Exception):
+    """Chunk does not start at the current offset; the client should ask for it and resume."""
+
+    def __init__(self, offset):
+        super().__init__(f"Upload is at offset {offset}.")
+        self.offset = offset
+
+
+class PartialFile(File):
+    """Lets FileSystemStorage move the finished file into place instead of copying it."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def create_upload(work_order, filename, size, sha256=""):
+    if size <= 0:
+        raise UploadError("size must be positive.")
+    if size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError(f"size exceeds the {settings.CHUNKED_UPLOAD_MAX_SIZE} byte limit.")
+    os.makedirs(settings.CHUNKED_UPLOAD_TEMP_DIR, exist_ok=True)
+    upload = ChunkedUpload.objects.create(
+        work_order=work_order, filename=os.path.basename(filename), size=size, sha256=sha256.lower()
+    )
+    open(upload.temp_path, "wb").close()
+    return upload
+
+
+def chunk_position(headers, size):
+    """Offset and length of a PATCH body, from Upload-Offset or Content-Range."""
+    try:
+        length = int(headers.get("Content-Length") or 0)
+        if "Upload-Offset" in headers:
+            return int(headers["Upload-Offset"]), length
+        match = CONTENT_RANGE_RE.match(headers.get("Content-Range", ""))
+        if match and int(match["total"]) == size and int(match["end"]) - int(match["start"]) + 1 == length:
+            return int(match["start"]), length
+    except ValueError:
+        pass
+    raise UploadError("Send Upload-Offset, or a Content-Range matching the body and upload size.")
+
+
+def parse_checksum(header):
+    """``Upload-Checksum: sha256 <base64 digest>`` -> raw digest (or None)."""
+    if not header:
+        return None
+    algorithm, _, value = header.partition(" ")
+    if algorithm.lower() != "sha256":
+        raise UploadError("Only sha256 chunk checksums are supported.")
+    try:
+        return base64.b64decode(value.strip(), validate=True)
+    except ValueError:
+        raise UploadError("Upload-Checksum is not valid base64.")
+
+
+def write_chunk(upload, stream, offset, length, checksum=None):
+    """
+    Copy ``length`` bytes from ``stream`` into the partial file at ``offset``.
+    A connection that drops mid-chunk keeps the bytes that arrived (unless a
+    checksum was sent), so the client resumes from the new offset. Returns the
+    new offset and finishes the upload when it reaches ``size``.
+    """
+    if upload.status != "uploading":
+        raise UploadError(f"Upload is {upload.status}.")
+    if offset != upload.offset:
+        raise OffsetMismatch(upload.offset)
+    if length < 0 or offset + length > upload.size:
+        raise UploadError("Chunk runs past the declared upload size.")
+
+    digest = hashlib.sha256() if checksum is not None else None
+    position, interrupted = offset, None
+    fd = os.open(upload.temp_path, os.O_WRONLY)
+    try:
+        while position < offset + length:
+            try:
+                block = stream.read(min(BLOCK_SIZE, offset + length - position))
+            except OSError as exc:  # client went away mid-chunk
+                interrupted = exc
+                break
+            if not block:
+                break
+            view = memoryview(block)
+            while view:
+                written = os.pwrite(fd, view, position)
+                position += written
+                view = view[written:]
+            if digest is not None:
+                digest.update(block)
+    finally:
+        os.close(fd)
+
+    if digest is not None and (position != offset + length or digest.digest() != checksum):
+        raise UploadError("Chunk checksum mismatch; resend it.")
+
+    # the offset check makes two clients racing on the same upload fail cleanly
+    if not ChunkedUpload.objects.filter(pk=upload.pk, offset=offset).update(
+        offset=position, updated_at=timezone.now()
+    ):
+        raise OffsetMismatch(ChunkedUpload.objects.values_list("offset", flat=True).get(pk=upload.pk))
+    upload.offset = position
+
+    if interrupted is not None:
+        raise interrupted
+    if position == upload.size:
+        finish_upload(upload)
+    return position
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as partial:
+        while block := partial.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fail(upload, message):
+    upload.status = "failed"
+    upload.error = message
+    upload.save(update_fields=["status", "error", "updated_at"])
+    discard_file(upload)
+    raise UploadError(message)
+
+
+def finish_upload(upload):
+    """Verify the assembled file and attach it to the work order as a ProductImage."""
+    path = upload.temp_path
+    if upload.sha256 and file_sha256(path) != upload.sha256:
+        _fail(upload, "sha256 of the uploaded file does not match.")
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception:
+        _fail(upload, "Uploaded file is not an image.")
+
+    with transaction.atomic():
+        image = ProductImage(work_order_id=upload.work_order_id)
+        with open(path, "rb") as partial:
+            image.image.save(upload.filename, PartialFile(partial), save=False)
+        image.save()
+        upload.status = "complete"
+        upload.product_image = image
+        upload.save(update_fields=["status", "product_image", "updated_at"])
+    return image
+
+
+def discard_file(upload):
+    try:
+        os.remove(upload.temp_path)
+    except FileNotFoundError:
+        pass
+
+
+def purge_stale_uploads(hours=None):
+    """Delete unfinished uploads idle for longer than ``hours``. Returns the count."""
+    hours = settings.CHUNKED_UPLOAD_EXPIRY_HOURS if hours is None else hours
+    stale = ChunkedUpload.objects.exclude(status="complete").filter(
+        updated_at__lt=timezone.now() - timedelta(hours=hours)
+    )
+    count = 0
+    for upload in stale.iterator():
+        discard_file(upload)
+        upload.delete()
+        count += 1
+    return count
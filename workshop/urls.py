@@ -1,10 +1,17 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import CustomerViewSet, TechnicianViewSet, WorkOrderViewSet, ProductImageViewSet
-from . import views
+from . import views, api_views
 
 app_name = "workshop"
 
+
+def hot_view(sync_view, async_view):
+    # ASYNC_VIEWS=True (for repair_shop.asgi) serves the busiest read pages without a thread hop
+    return async_view if settings.ASYNC_VIEWS else sync_view
+
+
 router = DefaultRouter()
 router.register(r"customers", CustomerViewSet)
 router.register(r"technicians", TechnicianViewSet)
@@ -12,12 +19,20 @@ router.register(r"workorders", WorkOrderViewSet)
 router.register(r"images", ProductImageViewSet)
 
 urlpatterns = [
-    path("", views.landing, name="landing"),
+    path("", hot_view(views.landing, views.landing_async), name="landing"),
     path("bulk-update/", views.landing_bulk_update, name="landing_bulk_update"),
     path("search/", views.search, name="search"),
     path("workorders/", views.workorder_list, name="workorder_list"),
-    path("workorder/<int:pk>/", views.workorder_detail, name="workorder_detail"),
+    path("workorder/<int:pk>/", hot_view(views.workorder_detail, views.workorder_detail_async), name="workorder_detail"),
+    path(
+        "api/dashboard-summary/",
+        hot_view(api_views.dashboard_summary, api_views.dashboard_summary_async),
+        name="dashboard-summary",
+    ),
+    path("api/analytics/", api_views.analytics_summary, name="analytics"),
+    path("api/workorders/events/", views.workorder_events, name="workorder_events"),
     path("api/", include(router.urls)),
+    path("metrics/", views.metrics, name="metrics"),
     path("remote-request/", views.remote_request_submit, name="remote_request"),
     path("remote-requests/", views.remote_request_list, name="remote_request_list"),
     path("remote-request/", views.remote_request_create, name="remote_request_create"),
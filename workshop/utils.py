@@ -1,23 +1,58 @@
 # workshop/utils.py
-from django.core.mail import EmailMultiAlternatives
+import re
+
 from django.template.loader import render_to_string
-from django.conf import settings
 from django.core.cache import cache
 
-def send_status_update_email(workorder):
+
+PHONE_QUERY_RE = re.compile(r"^[\d\s()+-]+$")
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile (``pct`` 0-100) of a non-empty sequence."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def normalize_phone(phone: str) -> str:
+    if not phone:
+        return ""
+    digits = re.sub(r"\D", "", phone)
+    if digits.startswith("0"):
+        return "+251" + digits[1:]
+    elif digits.startswith("251"):
+        return "+" + digits
+    elif digits.startswith("9") and len(digits) == 9:
+        return "+251" + digits
+    return phone
+
+
+def phone_lookup_key(phone: str) -> str:
     """
-    Send status update notification to the customer via email.
+    Canonical form stored in Customer.phone_normalized: E.164 for Ethiopian
+    numbers, otherwise the digits with a leading + kept if one was given.
     """
-     # Rate limiting: only send one email per workorder per 5 minutes
-    cache_key = f"email_sent_{workorder.id}_{workorder.status}"
-    if cache.get(cache_key):
-        print(f"⏸️  Email already sent recently for {workorder.work_order_number}")
-        return False
+    normalized = normalize_phone(phone)
+    if not normalized:
+        return ""
+    digits = re.sub(r"\D", "", normalized)
+    if not digits:
+        return ""
+    return "+" + digits if normalized.lstrip().startswith("+") else digits
+
+
+def build_status_update_message(workorder):
+    """
+    Unsaved OutboundMessage telling the customer about the work order's current
+    status, or None if the customer has no email.
+    """
+    from .models import OutboundMessage
+
     # Ensure customer has a valid email
     customer_email = workorder.customer.email if workorder.customer else None
     if not customer_email:
         print(f"No customer email for WorkOrder {workorder.work_order_number}")
-        return False
+        return None
 
     # Build full name
     customer_name = f"{workorder.customer.first_name} {workorder.customer.last_name}"
@@ -28,30 +63,71 @@ def send_status_update_email(workorder):
         "status": workorder.status,
     }
 
-    subject = f"Update on Your Service Request #{workorder.work_order_number}"
-    html_content = render_to_string("workshop/email/status_update.html", context)
-
-    msg = EmailMultiAlternatives(
-        subject,
-        f"Your service request {workorder.work_order_number} status has changed to {workorder.status}.",
-        settings.DEFAULT_FROM_EMAIL,
-        [customer_email],
+    return OutboundMessage(
+        channel="email",
+        recipient=customer_email,
+        subject=f"Update on Your Service Request #{workorder.work_order_number}",
+        body=f"Your service request {workorder.work_order_number} status has changed to {workorder.status}.",
+        html_body=render_to_string("workshop/email/status_update.html", context),
     )
-    msg.attach_alternative(html_content, "text/html")
-
-    try:
-        msg.send()
-        print(f"✅ Status update email sent to {customer_email}")
-        return True
-    except Exception as e:
-        print(f"❌ Failed to send status email: {e}")
+
+
+def _status_email_cache_key(workorder):
+    return f"email_sent_{workorder.id}_{workorder.status}"
+
+
+def send_status_update_email(workorder):
+    """
+    Queue a status update notification to the customer via email.
+    """
+     # Rate limiting: only send one email per workorder per 5 minutes
+    cache_key = _status_email_cache_key(workorder)
+    if cache.get(cache_key):
+        print(f"⏸️  Email already sent recently for {workorder.work_order_number}")
         return False
 
+    message = build_status_update_message(workorder)
+    if message is None:
+        return False
+
+    # Queued for the outbox worker; the request never waits on SMTP
+    message.save()
+    cache.set(cache_key, True, timeout=5 * 60)
+    print(f"✅ Status update email queued for {message.recipient}")
+    return True
+
+
+def send_status_update_emails(workorders):
+    """
+    Bulk version of ``send_status_update_email``: one cache round trip and one
+    INSERT for the whole batch. ``workorders`` should have ``customer`` selected.
+    Returns the number of emails queued.
+    """
+    from .models import OutboundMessage
+
+    workorders = list(workorders)
+    keys = {_status_email_cache_key(wo): wo for wo in workorders}
+    recently_sent = cache.get_many(list(keys))
+
+    messages, queued_keys = [], []
+    for key, workorder in keys.items():
+        if key in recently_sent:
+            continue
+        message = build_status_update_message(workorder)
+        if message is not None:
+            messages.append(message)
+            queued_keys.append(key)
+
+    OutboundMessage.objects.bulk_create(messages)
+    cache.set_many(dict.fromkeys(queued_keys, True), timeout=5 * 60)
+    return len(messages)
 
 
 def send_sms(to, message):
     """
-    SMS sending is currently disabled.
-    This is a safe stub that just logs to console.
+    Queue an SMS for the outbox worker (delivery itself is still a stub,
+    see ``outbox.deliver_sms``).
     """
-    print(f"[SMS DISABLED] Would send SMS to {to}: {message}")
+    from .outbox import enqueue_sms
+
+    return enqueue_sms(to, message)
@@ -1,5 +1,9 @@
 import re
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import aget_object_or_404, render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
 from django.db.models import Q
 from django.utils.dateparse import parse_date
 from django.core.paginator import Paginator
@@ -10,10 +14,15 @@ from django.contrib.auth.decorators import login_required, permission_required
 from rest_framework import viewsets, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.template.loader import render_to_string
 from django.utils import timezone
+from . import caching, events, scheduling, transitions
+from .asyncdb import aiterate
 from .forms import RemoteRequestForm
-from .models import Customer, RemoteRequest, Technician, WorkOrder, ProductImage
+from .models import ChunkedUpload, Customer, RemoteRequest, Technician, WorkOrder, ProductImage
 from .serializers import (
+    AutoAssignSerializer,
+    ChunkedUploadSerializer,
     CustomerSerializer,
     TechnicianSerializer,
     WorkOrderSerializer,
@@ -21,13 +30,27 @@ from .serializers import (
 )
 from django_filters.rest_framework import DjangoFilterBackend
 from .filters import WorkOrderFilter
+from .exporting import EXPORT_FORMATS, stream_work_orders
+from .metrics import registry as metrics_registry
+from .mixins import ConditionalRequestMixin, EagerLoadingMixin
+from .pagination import OptionalCursorPagination
+from .search import FullTextSearchFilter, search_work_orders
+from .uploads import (
+    OffsetMismatch,
+    UploadError,
+    chunk_position,
+    create_upload,
+    discard_file,
+    parse_checksum,
+    write_chunk,
+)
 from django.urls import reverse
-from django.db import transaction
+from django.db import connection, transaction
 from django.core.mail import send_mail
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
-from .utils import send_sms
+from .outbox import enqueue_email
+from .utils import PHONE_QUERY_RE, phone_lookup_key, send_sms
 
 
 def remote_service_request(request):
@@ -58,18 +81,12 @@ def remote_request_submit(request):
 
             # --- Customer Email ---
             if remote_request.customer_email:
-                customer_subject = "We Received Your Remote Service Request"
-                customer_html = render_to_string(
-                    "workshop/email/remote_request_customer.html", context
-                )
-                customer_msg = EmailMultiAlternatives(
-                    customer_subject,
+                enqueue_email(
+                    remote_request.customer_email,
+                    "We Received Your Remote Service Request",
                     "Plain text fallback for clients that don’t render HTML.",
-                    settings.DEFAULT_FROM_EMAIL,
-                    [remote_request.customer_email],
+                    render_to_string("workshop/email/remote_request_customer.html", context),
                 )
-                customer_msg.attach_alternative(customer_html, "text/html")
-                customer_msg.send()
             elif remote_request.customer_phone:
                 # SMS fallback if email is not provided
                 sms_message = (
@@ -84,14 +101,8 @@ def remote_request_submit(request):
             admin_html = render_to_string(
                 "workshop/email/remote_request_admin.html", context
             )
-            admin_msg = EmailMultiAlternatives(
-                admin_subject,
-                "New request submitted.",
-                settings.DEFAULT_FROM_EMAIL,
-                ["yourgmail@gmail.com"],  # TODO: replace with actual admin/staff email
-            )
-            admin_msg.attach_alternative(admin_html, "text/html")
-            admin_msg.send()
+            for admin_email in settings.ADMIN_NOTIFICATION_EMAILS:
+                enqueue_email(admin_email, admin_subject, "New request submitted.", admin_html)
 
             # Feedback to user
             messages.success(
@@ -164,25 +175,69 @@ def convert_remote_request(request, pk):
 # ─────────────────────────────
 # Utility
 # ─────────────────────────────
-def normalize_phone(phone: str) -> str:
-    if not phone:
-        return ""
-    digits = re.sub(r"\D", "", phone)
-    if digits.startswith("0"):
-        return "+251" + digits[1:]
-    elif digits.startswith("251"):
-        return "+" + digits
-    elif digits.startswith("9") and len(digits) == 9:
-        return "+251" + digits
-    return phone
+def prefix_lookup(field, prefix):
+    """
+    Index-friendly "starts with" filter. SQLite cannot use an index for LIKE on
+    a case-sensitive column, so it gets an equivalent range instead; PostgreSQL
+    uses the varchar_pattern_ops index Django creates for db_index fields.
+    """
+    if connection.vendor == "sqlite":
+        return Q(**{f"{field}__gte": prefix, f"{field}__lt": prefix + "\U0010ffff"})
+    return Q(**{f"{field}__startswith": prefix})
+
+
+def customer_lookup(q: str) -> Q:
+    """
+    Match customers by email or phone prefix using the normalized lookup
+    columns, e.g. "0911" finds +251911..., "abebe@" finds abebe@example.com.
+    """
+    lookup = prefix_lookup("email_normalized", q.lower())
+
+    phone_key = phone_lookup_key(q) if PHONE_QUERY_RE.match(q) else ""
+    if phone_key:
+        lookup |= prefix_lookup("phone_normalized", phone_key)
+        if not phone_key.startswith("+") and phone_key[0] in "79":
+            # local number typed without the leading 0
+            lookup |= prefix_lookup("phone_normalized", "+251" + phone_key)
+    return lookup
 
 
 # ─────────────────────────────
 # Landing Page / Customer Search
 # ─────────────────────────────
+def landing_search(q):
+    customers = Customer.objects.filter(customer_lookup(q)).values("pk")
+    return (
+        WorkOrder.objects.select_related("customer", "technician")
+        .filter(customer__in=customers)
+        .order_by("-created_at")
+    )
+
+
+def cached_landing_results(q):
+    """
+    Rendered results card for anonymous/customer visitors, keyed by the
+    versions of the matched customers (so any change to one of their orders
+    re-renders it). Staff pages carry a CSRF token and are never cached.
+    """
+    customer_ids = caching.cached(
+        "landing_lookup",
+        caching.lookup_key("landing_lookup", q.lower()),
+        lambda: list(Customer.objects.filter(customer_lookup(q)).values_list("pk", flat=True)),
+    )
+    return caching.cached(
+        "landing_results",
+        caching.customers_key("landing_results", customer_ids, q),
+        lambda: render_to_string(
+            "workshop/_landing_results.html", {"query": q, "results": list(landing_search(q))}
+        ),
+    )
+
+
 def landing(request):
     q = request.GET.get("q", "").strip()
     results = []
+    results_html = None
     searched = False
 
     form = RemoteRequestForm(request.POST or None)
@@ -194,32 +249,49 @@ def landing(request):
 
     if q:
         searched = True
-        normalized_phone = normalize_phone(q)
+        if request.user.is_staff:
+            results = landing_search(q)
+        else:
+            results_html = cached_landing_results(q)
 
-        qs = WorkOrder.objects.select_related("customer", "technician").order_by("-created_at")
+    return render(
+        request,
+        "workshop/landing.html",
+        {
+            "query": q,
+            "searched": searched,
+            "results": results,
+            "results_html": results_html,
+            "form": form,
+        },
+    )
 
-        # Build phone variants
-        phone_variants = [q]
-        if normalized_phone:
-            phone_variants.append(normalized_phone)
-        if q.startswith("+251") and len(q) == 13:
-            phone_variants.append("0" + q[4:])
 
-        phone_filter = Q()
-        for p in phone_variants:
-            phone_filter |= Q(customer__phone_number__icontains=p)
+async def landing_async(request):
+    """``landing`` for ASGI (``ASYNC_VIEWS``). The remote request form posts still go through the sync view."""
+    if request.method != "GET":
+        return await sync_to_async(landing)(request)
 
-        filters_combined = Q(customer__email__icontains=q) | phone_filter
-        results = qs.filter(filters_combined)
+    q = request.GET.get("q", "").strip()
+    results = []
+    results_html = None
+    # resolved here so the template's user/perms lookups don't query from the event loop
+    request.user = user = await request.auser()
+    if q:
+        if user.is_staff:
+            results = [workorder async for workorder in landing_search(q)]
+        else:
+            results_html = await sync_to_async(cached_landing_results)(q)
 
     return render(
         request,
         "workshop/landing.html",
         {
             "query": q,
-            "searched": searched,
+            "searched": bool(q),
             "results": results,
-            "form": form,
+            "results_html": results_html,
+            "form": RemoteRequestForm(),
         },
     )
 
@@ -233,7 +305,8 @@ def landing_bulk_update(request):
     """
     Staff-only endpoint to perform bulk actions on selected work orders.
     Accepts checkbox inputs named either "workorder_ids" or "workorder_ids[]".
-    Allowed actions: mark_completed, mark_ready, archive, assign_technician (with technician_id).
+    Allowed actions: mark_completed, mark_ready, archive, assign_technician (with technician_id),
+    auto_assign (spread over the least busy technicians).
     """
 
     # Resolve redirect target (referer or landing page)
@@ -274,13 +347,13 @@ def landing_bulk_update(request):
     try:
         with transaction.atomic():
             if action == "mark_completed":
-                updated = qs.update(status="completed")
+                updated = len(qs.transition_status("completed"))
                 messages.success(request, f"{updated} work order(s) marked as Completed.")
             elif action == "mark_ready":
-                updated = qs.update(status="ready_for_pickup")
+                updated = len(qs.transition_status("ready_for_pickup"))
                 messages.success(request, f"{updated} work order(s) marked as Ready for Pickup.")
             elif action == "archive":
-                updated = qs.update(is_active=False)
+                updated = qs.bulk_change(is_active=False)
                 messages.success(request, f"{updated} work order(s) archived.")
             elif action == "assign_technician":
                 # expects a technician_id in POST
@@ -294,8 +367,14 @@ def landing_bulk_update(request):
                 except ValueError:
                     messages.error(request, "Invalid technician id.")
                     return redirect(redirect_to)
-                updated = qs.update(technician_id=tech_id_int)
+                updated = qs.bulk_change(technician_id=tech_id_int)
                 messages.success(request, f"{updated} work order(s) assigned to technician (id: {tech_id_int}).")
+            elif action == "auto_assign":
+                assignments = scheduling.auto_assign(qs)
+                updated = sum(len(ids) for ids in assignments.values())
+                messages.success(
+                    request, f"{updated} work order(s) assigned across {len(assignments)} technician(s)."
+                )
             else:
                 messages.error(request, "Invalid bulk action.")
                 return redirect(redirect_to)
@@ -312,11 +391,10 @@ def search(request):
     query = request.GET.get("q", "").strip()
     workorders = WorkOrder.objects.none()
     if query:
-        workorders = (
-            WorkOrder.objects.filter(id__iexact=query)
-            | WorkOrder.objects.filter(customer__phone_number__icontains=query)
-            | WorkOrder.objects.filter(customer__email__icontains=query)
-        )
+        workorders = WorkOrder.objects.select_related("customer", "technician").order_by("-created_at")
+        # a work order's id finds it directly, ahead of the text matches
+        exact = list(workorders.filter(pk=int(query))) if query.isdigit() else []
+        workorders = exact + [order for order in search_work_orders(workorders, query) if order not in exact]
     return render(request, "workshop/search.html", {"workorders": workorders, "query": query})
 
 
@@ -324,8 +402,22 @@ def search(request):
 # WorkOrder Detail
 # ─────────────────────────────
 def workorder_detail(request, pk):
-    workorder = get_object_or_404(WorkOrder, pk=pk)
-    return render(request, "workshop/workorder_detail.html", {"workorder": workorder})
+    # The public status page; served from cache until the order (or its customer/technician) changes
+    def render_page():
+        workorder = get_object_or_404(WorkOrder.objects.select_related("customer", "technician"), pk=pk)
+        return render_to_string("workshop/workorder_detail.html", {"workorder": workorder})
+
+    return HttpResponse(caching.cached("workorder_detail", caching.work_order_key("workorder_detail", pk), render_page))
+
+
+async def workorder_detail_async(request, pk):
+    """``workorder_detail`` for ASGI (``ASYNC_VIEWS``)."""
+    async def render_page():
+        workorder = await aget_object_or_404(WorkOrder.objects.select_related("customer", "technician"), pk=pk)
+        return render_to_string("workshop/workorder_detail.html", {"workorder": workorder})
+
+    key = await sync_to_async(caching.work_order_key)("workorder_detail", pk)
+    return HttpResponse(await caching.acached("workorder_detail", key, render_page))
 
 
 # ─────────────────────────────
@@ -340,14 +432,6 @@ def workorder_list(request):
     start_date = request.GET.get("start_date")
     end_date = request.GET.get("end_date")
 
-    if q:
-        qs = qs.filter(
-            Q(work_order_number__icontains=q)
-            | Q(customer__first_name__icontains=q)
-            | Q(customer__last_name__icontains=q)
-            | Q(customer__email__icontains=q)
-            | Q(customer__phone_number__icontains=q)
-        )
     if status:
         qs = qs.filter(status=status)
     if customer:
@@ -356,26 +440,94 @@ def workorder_list(request):
             | Q(customer__last_name__icontains=customer)
         )
     if start_date:
-        qs = qs.filter(date_received__gte=parse_date(start_date))
+        qs = qs.filter(created_at__date__gte=parse_date(start_date))
     if end_date:
-        qs = qs.filter(date_received__lte=parse_date(end_date))
+        qs = qs.filter(created_at__date__lte=parse_date(end_date))
+
+    qs = qs.order_by("-created_at", "-id")
+    if q:
+        qs = search_work_orders(qs, q)
 
-    paginator = Paginator(qs.order_by("-date_received"), 10)
+    paginator = Paginator(qs, 10)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
     context = {
         "workorders": page_obj,
-        "status_choices": WorkOrder.STATUS_CHOICES,
+        "status_choices": WorkOrder._meta.get_field("status").choices,
         "page_obj": page_obj,
     }
     return render(request, "workshop/search.html", context)
 
 
+# ─────────────────────────────
+# Request metrics (Prometheus text format)
+# ─────────────────────────────
+def metrics(request):
+    """Scrape endpoint; needs ``Authorization: Bearer <METRICS_TOKEN>`` or a staff session."""
+    token = getattr(settings, "METRICS_TOKEN", "")
+    header = request.headers.get("Authorization", "")
+    authorized = bool(token) and constant_time_compare(header, f"Bearer {token}")
+    if not (authorized or request.user.is_staff):
+        return HttpResponseForbidden()
+    body = metrics_registry.render_prometheus(getattr(settings, "METRICS_SAMPLE_RATE", 1.0))
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# ─────────────────────────────
+# Live work order events (server-sent events)
+# ─────────────────────────────
+def _id_list(value):
+    return [int(part) for part in (value or "").split(",") if part.strip()]
+
+
+async def workorder_events(request):
+    """
+    ``text/event-stream`` of status/assignment changes, filtered by
+    ``?work_order=``, ``?customer=`` and/or ``?technician=`` (comma-separated ids).
+    Anyone may follow specific work orders; the other filters and the
+    unfiltered feed are staff-only. Resumes after ``Last-Event-ID`` (or
+    ``?last_event_id=`` for the first connection).
+
+    Under ASGI the response stays open and is fed by ``events.broadcaster``.
+    Under WSGI, where each open stream would hold a worker thread, it returns
+    what is already there and the browser's EventSource polls again after
+    ``EVENTS_RETRY_MS``.
+    """
+    try:
+        event_filter = events.EventFilter(
+            _id_list(request.GET.get("work_order")),
+            _id_list(request.GET.get("customer")),
+            _id_list(request.GET.get("technician")),
+        )
+        last_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        return JsonResponse({"detail": "Ids must be comma-separated integers."}, status=400)
+
+    user = await request.auser()
+    if not user.is_staff and (event_filter.customers or event_filter.technicians or not event_filter.work_orders):
+        return JsonResponse({"detail": "Only staff can follow customers, technicians or all work orders."}, status=403)
+
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(events.stream(event_filter, last_id), content_type="text/event-stream")
+    else:
+        body = [f"retry: {int(getattr(settings, 'EVENTS_RETRY_MS', 3000))}\n\n"]
+        if last_id is None:
+            body.append(f"id: {await sync_to_async(events.latest_event_id)()}\n\n")
+        else:
+            backlog = await sync_to_async(events.events_after)(last_id, event_filter)
+            body.extend(events.format_event(event) for event in backlog)
+        response = HttpResponse("".join(body), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: pass events through unbuffered
+    return response
+
+
 # ─────────────────────────────
 # DRF ViewSets
 # ─────────────────────────────
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -383,7 +535,7 @@ class CustomerViewSet(viewsets.ModelViewSet):
     ordering_fields = ["first_name", "last_name"]
 
 
-class TechnicianViewSet(viewsets.ModelViewSet):
+class TechnicianViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
     queryset = Technician.objects.all()
     serializer_class = TechnicianSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -391,25 +543,44 @@ class TechnicianViewSet(viewsets.ModelViewSet):
     ordering_fields = ["first_name", "last_name"]
 
 
-class WorkOrderViewSet(viewsets.ModelViewSet):
-    queryset = WorkOrder.objects.filter(is_active=True).select_related("customer", "technician")
+class WorkOrderViewSet(ConditionalRequestMixin, EagerLoadingMixin, viewsets.ModelViewSet):
+    queryset = WorkOrder.objects.filter(is_active=True)
     serializer_class = WorkOrderSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # nested objects, for ETag / Last-Modified (image changes bump the order's updated_at)
+    conditional_timestamps = ("updated_at", "customer__updated_at", "technician__updated_at")
+    # ?search= is full-text (see workshop.search); it must come after OrderingFilter
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_class = WorkOrderFilter
-    search_fields = [
-        "work_order_number",
-        "customer__first_name",
-        "customer__last_name",
-        "customer__email",
-        "customer__phone_number",
-        "technician__first_name",
-        "technician__last_name",
-        "product_type",
-        "product_brand",
-        "serial_number",
-    ]
     ordering_fields = ["created_at", "status", "product_brand", "total_cost"]
-    ordering = ["-created_at"]
+    ordering = ["-created_at", "-id"]
+    pagination_class = OptionalCursorPagination
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream every matching work order as NDJSON (default) or CSV
+        (``?export_format=csv``). Accepts the same filters as the list endpoint.
+        """
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"detail": f"export_format must be one of: {', '.join(EXPORT_FORMATS)}."}, status=400
+            )
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        content = stream_work_orders(queryset, export_format)
+        if isinstance(request._request, ASGIRequest):
+            # under ASGI Django would read a sync iterator into memory before sending it
+            content = aiterate(content)
+        response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format])
+        filename = f"workorders-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=True, methods=["get"])
+    def history(self, request, pk=None):
+        """Status, technician, cost and collection changes of one work order, oldest first."""
+        work_order = self.get_object()
+        return Response(transitions.history(work_order.pk))
 
     @action(detail=True, methods=["post"])
     def mark_repaired(self, request, pk=None):
@@ -433,19 +604,38 @@ class WorkOrderViewSet(viewsets.ModelViewSet):
         status = request.data.get("status")
         technician_id = request.data.get("technician_id")
         qs = WorkOrder.objects.filter(id__in=ids, is_active=True)
-        updates = {}
-        if status:
-            updates["status"] = status
-        if technician_id:
-            updates["technician_id"] = technician_id
-        count = qs.update(**updates)
+        count = 0
+        with transaction.atomic():
+            if status or technician_id:
+                # matched rows, including those that already had the new values
+                count = qs.count()
+            if technician_id:
+                qs.bulk_change(technician_id=technician_id)
+            if status:
+                # goes through transition_status so customers are notified
+                qs.transition_status(status)
         return Response({"updated_records": count})
 
+    @action(detail=False, methods=["post"])
+    def auto_assign(self, request):
+        """
+        Assign the open orders in ``ids`` to the least busy technicians, soonest
+        due first. ``technician_ids`` limits who can be picked.
+        """
+        serializer = AutoAssignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        qs = WorkOrder.objects.filter(id__in=serializer.validated_data["ids"], is_active=True)
+        assignments = scheduling.auto_assign(qs, serializer.validated_data.get("technician_ids"))
+        return Response({
+            "assigned_records": sum(len(order_ids) for order_ids in assignments.values()),
+            "assignments": {str(technician_id): order_ids for technician_id, order_ids in assignments.items()},
+        })
+
     @action(detail=False, methods=["post"])
     def bulk_archive(self, request):
         ids = request.data.get("ids", [])
         qs = WorkOrder.objects.filter(id__in=ids, is_active=True)
-        count = qs.update(is_active=False)
+        count = qs.bulk_change(is_active=False)
         return Response({"archived_records": count})
 
 
@@ -454,3 +644,46 @@ class ProductImageViewSet(viewsets.ModelViewSet):
     serializer_class = ProductImageSerializer
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ["uploaded_at"]
+
+    # Resumable uploads; the protocol is described in workshop/uploads.py
+    @action(detail=False, methods=["post"], url_path="uploads")
+    def start_upload(self, request):
+        serializer = ChunkedUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            upload = create_upload(data["work_order"], data["filename"], data["size"], data.get("sha256", ""))
+        except UploadError as exc:
+            return Response({"detail": str(exc)}, status=400)
+        location = reverse("workshop:productimage-upload", kwargs={"upload_id": upload.pk})
+        return Response(
+            ChunkedUploadSerializer(upload, context={"request": request}).data,
+            status=201,
+            headers={"Location": location, "Upload-Offset": "0"},
+        )
+
+    @action(
+        detail=False,
+        methods=["get", "patch", "delete"],
+        url_path=r"uploads/(?P<upload_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})",
+        url_name="upload",
+    )
+    def upload(self, request, upload_id=None):
+        upload = get_object_or_404(ChunkedUpload, pk=upload_id)
+        if request.method == "DELETE":
+            discard_file(upload)
+            upload.delete()
+            return Response(status=204)
+        if request.method == "PATCH":
+            try:
+                offset, length = chunk_position(request.headers, upload.size)
+                write_chunk(
+                    upload, request.stream, offset, length, parse_checksum(request.headers.get("Upload-Checksum"))
+                )
+            except OffsetMismatch as exc:
+                return Response({"detail": str(exc)}, status=409, headers={"Upload-Offset": str(exc.offset)})
+            except UploadError as exc:
+                return Response({"detail": str(exc)}, status=400, headers={"Upload-Offset": str(upload.offset)})
+        data = ChunkedUploadSerializer(upload, context={"request": request}).data
+        return Response(data, headers={"Upload-Offset": str(upload.offset), "Cache-Control": "no-store"})
+